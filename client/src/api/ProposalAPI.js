@@ -13,10 +13,10 @@ const ProposalAPI = {
         }
     },
     
-    // Get all proposals for the current user
-    get_proposals: async () => {
+    // Get one page of the current user's proposals (params: cursor, limit, status, style, created_after, created_before)
+    get_proposals: async (params = {}) => {
         try {
-            const response = await axiosInstance.get('/proposals/');
+            const response = await axiosInstance.get('/proposals/', { params });
             return response.data;
         } catch (error) {
             console.error('API Error:', error);
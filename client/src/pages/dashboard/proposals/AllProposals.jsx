@@ -16,6 +16,8 @@ const AllProposals = () => {
   const [showFilters, setShowFilters] = useState(false);
   const [loading, setLoading] = useState(false);
   const [refreshing, setRefreshing] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const { proposals, last_updated } = useSelector((state) => state.proposals);
   
@@ -52,7 +54,7 @@ const AllProposals = () => {
       if (response.status === 'success' && response.proposals) {
         // Update Redux store with fresh data from the API
         dispatch(setProposals(response.proposals));
-        console.log(response.proposals);
+        setNextCursor(response.next_cursor || null);
         
         if (forceRefresh) {
           toast.success('Proposals refreshed successfully');
@@ -74,6 +76,24 @@ const AllProposals = () => {
     fetchProposals();
   }, []);
   
+  // Append the next page of proposals
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await ProposalAPI.get_proposals({ cursor: nextCursor });
+      if (response.status === 'success' && response.proposals) {
+        dispatch(setProposals([...proposalsArray, ...response.proposals]));
+        setNextCursor(response.next_cursor || null);
+      }
+    } catch (error) {
+      console.error('Error fetching proposals:', error);
+      toast.error(error.message || 'Failed to load proposals');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
   // Manual refresh handler
   const handleRefresh = () => {
     fetchProposals(true);
@@ -391,7 +411,9 @@ const AllProposals = () => {
                         {proposal.job_description ? proposal.job_description.substring(0, 100) + '...' : 'No description'}
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
-                        {proposal.proposal_text ? getWordCount(proposal.proposal_text) + ' words' : 'N/A'}
+                        {proposal.word_count != null
+                          ? proposal.word_count + ' words'
+                          : (proposal.proposal_text ? getWordCount(proposal.proposal_text) + ' words' : 'N/A')}
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
                         <div className="flex items-center justify-end space-x-2">
@@ -451,9 +473,11 @@ const AllProposals = () => {
                   1
                 </button>
                 <button
-                  className="relative inline-flex items-center px-2 py-2 rounded-r-md border border-gray-300 bg-white text-sm font-medium text-gray-500 hover:bg-gray-50"
+                  onClick={loadMore}
+                  disabled={!nextCursor || loadingMore}
+                  className="relative inline-flex items-center px-2 py-2 rounded-r-md border border-gray-300 bg-white text-sm font-medium text-gray-500 hover:bg-gray-50 disabled:opacity-50"
                 >
-                  <span className="sr-only">Next</span>
+                  <span className="sr-only">Load more</span>
                   <svg className="h-5 w-5" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 20 20" fill="currentColor" aria-hidden="true">
                     <path fillRule="evenodd" d="M7.293 14.707a1 1 0 010-1.414L10.586 10 7.293 6.707a1 1 0 011.414-1.414l4 4a1 1 0 010 1.414l-4 4a1 1 0 01-1.414 0z" clipRule="evenodd" />
                   </svg>
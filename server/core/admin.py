@@ -1,7 +1,14 @@
 from django.contrib import admin
-from .models import FreelancerProfile, Experience, Projects
+from .models import FreelancerProfile, Experience, Projects, LLMCacheEntry, LLMTask, LLMInFlight, RateLimitBucket, UserStats, DailyProposalRollup, DailyRevenueRollup
 
 # Register your models here.
 admin.site.register(FreelancerProfile)
 admin.site.register(Experience)
 admin.site.register(Projects)
+admin.site.register(LLMCacheEntry)
+admin.site.register(LLMTask)
+admin.site.register(LLMInFlight)
+admin.site.register(RateLimitBucket)
+admin.site.register(UserStats)
+admin.site.register(DailyProposalRollup)
+admin.site.register(DailyRevenueRollup)
@@ -0,0 +1,99 @@
+"""
+Plumbing for async (ASGI-native) API views.
+
+DRF's ``api_view``, authentication and parsers are synchronous, so a DRF
+view served over ASGI still occupies a thread for the whole LLM call. The
+async endpoints are plain Django coroutine views instead; ``async_api_view``
+gives them the parts of DRF the API relies on: JWT authentication (same
+tokens and error bodies), the request body as ``request.data`` and CSRF
+exemption. Under ASGI (``uvicorn server.asgi:application``) one worker then
+serves many concurrent LLM-bound requests from a single event loop.
+"""
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+def _error(detail, status, headers=None):
+    response = JsonResponse({'detail': str(detail)}, status=status)
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def _parse_body(request):
+    """JSON bodies as a dict, form bodies as a QueryDict, anything else as text"""
+    if not request.body:
+        return {}
+    if request.content_type == 'application/json':
+        return json.loads(request.body)
+    if request.content_type in ('application/x-www-form-urlencoded', 'multipart/form-data'):
+        return request.POST
+    return request.body.decode(request.encoding or 'utf-8')
+
+
+def async_api_view(methods):
+    """
+    Decorator for async API views
+
+    Args:
+        methods: Allowed HTTP methods, e.g. ['POST']
+
+    The view receives an authenticated ``request.user`` and ``request.data``;
+    unauthenticated requests get DRF's 401 body.
+    """
+    def decorator(view):
+        authenticator = JWTAuthentication()
+
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return _error(f'Method "{request.method}" not allowed.', 405, {'Allow': ', '.join(methods)})
+
+            try:
+                # Token validation is CPU-only, but loading the user hits the database
+                result = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.AuthenticationFailed as e:
+                return _error(e.detail, 401, {'WWW-Authenticate': authenticator.authenticate_header(request)})
+            if result is None:
+                return _error(
+                    exceptions.NotAuthenticated.default_detail, 401,
+                    {'WWW-Authenticate': authenticator.authenticate_header(request)}
+                )
+            request.user, request.auth = result
+
+            try:
+                request.data = _parse_body(request)
+            except (ValueError, UnicodeDecodeError) as e:
+                return _error(f'JSON parse error - {str(e)}', 400)
+
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def throttled_json_response(error):
+    """Async-view counterpart of rate_limit.throttled_response"""
+    response = JsonResponse(
+        {'status': 'error', 'message': str(error), 'retry_after': error.retry_after},
+        status=429,
+    )
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def unavailable_json_response(error):
+    """Async-view counterpart of circuit_breaker.unavailable_response"""
+    response = JsonResponse(
+        {'status': 'error', 'message': str(error), 'retry_after': error.retry_after},
+        status=503,
+    )
+    response['Retry-After'] = str(error.retry_after)
+    return response
@@ -0,0 +1,36 @@
+"""Async (ASGI-native) variant of the profile import endpoint (see core/async_api.py)"""
+from django.http import JsonResponse
+
+from .async_api import async_api_view, throttled_json_response, unavailable_json_response
+from .circuit_breaker import LLMUnavailableError
+from .profile_import import aimport_freelancer_profile, ProfileImportError
+from .rate_limit import LLMRateLimitError
+
+
+@async_api_view(['POST'])
+async def create_freelancer_profile_async(request):
+    """Extract a freelancer profile from the submitted text and save it (same body as create_freelancer_profile)"""
+    try:
+        extracted_data = await aimport_freelancer_profile(request.user, request.data)
+
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Freelancer profile created/updated successfully',
+            'data': extracted_data
+        })
+
+    except ProfileImportError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': e.message,
+            **e.extra
+        }, status=400)
+    except LLMRateLimitError as e:
+        return throttled_json_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_json_response(e)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=500)
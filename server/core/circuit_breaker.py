@@ -0,0 +1,173 @@
+"""
+Circuit breaker for LLM calls, one per model.
+
+When OpenAI is down or overloaded, every request otherwise waits out its
+timeout and retries before failing, tying up web workers for a minute each.
+After FAILURE_THRESHOLD consecutive failed attempts (timeouts, connection
+errors, 5xx, 429) the breaker opens and calls fail immediately with
+``LLMUnavailableError``, which views answer with a 503 and Retry-After
+(``unavailable_response``). A call that succeeds but uses more than
+SLOW_CALL_FRACTION of its own timeout (streams: until the stream opens)
+counts as a failure too, so a degraded service trips the breaker before it
+times out. The threshold follows the call: routed calls get their task's
+LATENCY_BUDGET as timeout (core/model_routing.py), so a long generation
+within its budget never counts against a fast analysis. After
+RESET_TIMEOUT seconds one trial call is let through (half-open); a fast
+success closes the breaker, a failure or slow call opens it again.
+
+State is per process. Configuration lives in ``settings.LLM_CIRCUIT_BREAKER``.
+"""
+import threading
+import time
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import metrics
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'FAILURE_THRESHOLD': 5,
+    'RESET_TIMEOUT': 30,
+    # Share of the call's timeout after which a success counts as a failure; None disables it
+    'SLOW_CALL_FRACTION': 0.9,
+}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+CIRCUIT_OPENED = metrics.Counter(
+    'llm_circuit_opened_total',
+    'Times the circuit breaker opened for a model',
+    ['model'],
+)
+CIRCUIT_REJECTED = metrics.Counter(
+    'llm_circuit_rejected_total',
+    'LLM calls rejected without being sent because the circuit was open',
+    ['model'],
+)
+CIRCUIT_SLOW_CALLS = metrics.Counter(
+    'llm_circuit_slow_calls_total',
+    'Successful LLM calls counted as failures for using more than SLOW_CALL_FRACTION of their timeout',
+    ['model'],
+)
+
+
+class LLMUnavailableError(Exception):
+    """Raised instead of calling OpenAI while the circuit for a model is open"""
+
+    def __init__(self, model, retry_after):
+        self.model = model
+        self.retry_after = max(int(retry_after + 0.999), 1)
+        super().__init__(
+            f'The AI service is temporarily unavailable ({model}); please try again in {self.retry_after}s'
+        )
+
+
+def get_config():
+    """Return the circuit breaker configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'LLM_CIRCUIT_BREAKER', {}))
+    return config
+
+
+class CircuitBreaker:
+    def __init__(self, name):
+        self.name = name
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise LLMUnavailableError if the call must not be sent"""
+        config = get_config()
+        if not config['ENABLED']:
+            return
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            elapsed = time.monotonic() - self.opened_at
+            if self.state == OPEN and elapsed >= config['RESET_TIMEOUT']:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                # Let exactly one trial call through
+                self._trial_in_flight = True
+                return
+            retry_after = max(config['RESET_TIMEOUT'] - elapsed, 1)
+        CIRCUIT_REJECTED.inc(model=self.name)
+        raise LLMUnavailableError(self.name, retry_after)
+
+    def record_success(self, duration=None, timeout=None):
+        """The call was answered, after duration seconds of the timeout it was given, if known"""
+        slow_call_fraction = get_config()['SLOW_CALL_FRACTION']
+        if duration is not None and timeout and slow_call_fraction and duration >= slow_call_fraction * timeout:
+            CIRCUIT_SLOW_CALLS.inc(model=self.name)
+            self.record_failure()
+            return
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        config = get_config()
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= config['FAILURE_THRESHOLD']:
+                if self.state != OPEN:
+                    CIRCUIT_OPENED.inc(model=self.name)
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def record_other(self):
+        """The call ended for a reason that says nothing about availability; free the trial slot"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(model):
+    """Return the breaker for a model, creating it on first use"""
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = CircuitBreaker(model)
+        return breaker
+
+
+def get_states():
+    """Current state of every breaker, for diagnostics"""
+    with _breakers_lock:
+        return {model: breaker.state for model, breaker in _breakers.items()}
+
+
+def reset_all():
+    with _breakers_lock:
+        for breaker in _breakers.values():
+            breaker.reset()
+
+
+def unavailable_response(error):
+    """The 503 response for an LLMUnavailableError raised while handling a request"""
+    return Response(
+        {'status': 'error', 'message': str(error), 'retry_after': error.retry_after},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(error.retry_after)},
+    )
@@ -0,0 +1,259 @@
+"""
+Dashboard statistics read from one incrementally maintained row per user.
+
+The dashboard used to count and sum the user's whole proposal and project
+history on every load (about eight queries, each growing with history).
+``UserStats`` keeps the answer instead:
+
+    total_proposals, accepted_proposals, total_revenue   lifetime counters
+    daily    {"YYYY-MM-DD": {"proposals", "accepted", "revenue"}} for the
+             last WINDOW_DAYS days (proposals by creation day, revenue of
+             completed projects by end date)
+
+Signals on Proposal and Projects (core/signals.py) apply the difference
+each write makes, inside the same transaction as the write. The dashboard
+then reads one row and sums at most WINDOW_DAYS small buckets. A missing
+row is rebuilt from the tables on first read; bulk writes that bypass
+signals call ``rebuild_stats``.
+
+``compute_stats`` is the fallback used when ``DASHBOARD_STATS['INCREMENTAL']``
+is off or the row can't be read: one conditional aggregation per table over
+the same day-aligned windows, so both paths return identical numbers.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from proposals.models import Proposal
+from .models import Projects, UserStats
+
+
+DEFAULTS = {
+    'INCREMENTAL': True,
+}
+
+# Days of per-day buckets kept: this month plus the previous month
+WINDOW_DAYS = 60
+
+STAT_KEYS = (
+    'total_proposals', 'proposals_this_week', 'accepted_proposals',
+    'prev_month_proposals', 'prev_month_accepted',
+    'total_revenue', 'revenue_this_month', 'revenue_last_month',
+)
+
+
+def get_config():
+    """Return the dashboard stats configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'DASHBOARD_STATS', {}))
+    return config
+
+
+def _windows(today):
+    """First day of this week, this month and the previous month (last 7, 30 and 30 before that)"""
+    return {
+        'week': today - timedelta(days=6),
+        'month': today - timedelta(days=29),
+        'prev_month': today - timedelta(days=WINDOW_DAYS - 1),
+    }
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _as_date(value):
+    return parse_date(value) if isinstance(value, str) else value
+
+
+def proposal_contribution(user_id, status, created_at):
+    """What one proposal adds to its owner's stats"""
+    accepted = int(status == 'accepted')
+    return user_id, {
+        'total_proposals': 1,
+        'accepted_proposals': accepted,
+        'daily': {timezone.localdate(created_at).isoformat(): {'proposals': 1, 'accepted': accepted}},
+    }
+
+
+def project_contribution(user_id, status, budget, end_date):
+    """What one project adds to its owner's stats: revenue once it is completed"""
+    if status != 'completed' or not budget or not end_date:
+        return user_id, {}
+    budget = int(budget)
+    return user_id, {
+        'total_revenue': budget,
+        'daily': {_as_date(end_date).isoformat(): {'revenue': budget}},
+    }
+
+
+def _apply_delta(row, delta, sign, today):
+    for field in ('total_proposals', 'accepted_proposals', 'total_revenue'):
+        setattr(row, field, getattr(row, field) + sign * delta.get(field, 0))
+
+    oldest = _windows(today)['prev_month'].isoformat()
+    daily = {day: counts for day, counts in row.daily.items() if day >= oldest}
+    for day, counts in delta.get('daily', {}).items():
+        if day < oldest:
+            continue
+        bucket = dict(daily.get(day, {}))
+        for key, value in counts.items():
+            bucket[key] = bucket.get(key, 0) + sign * value
+        bucket = {key: value for key, value in bucket.items() if value}
+        if bucket:
+            daily[day] = bucket
+        else:
+            daily.pop(day, None)
+    row.daily = daily
+
+
+def apply_changes(changes, create_missing=True):
+    """
+    Apply stats differences to the owners' rows
+
+    Args:
+        changes: List of (sign, (user_id, delta)) where delta comes from
+                 proposal_contribution / project_contribution
+        create_missing: Rebuild the row of a user who has none yet (the
+                        rebuild already reflects the write being applied)
+    """
+    today = timezone.localdate()
+    by_user = {}
+    for sign, (user_id, delta) in changes:
+        if delta:
+            by_user.setdefault(user_id, []).append((sign, delta))
+
+    for user_id, deltas in by_user.items():
+        try:
+            # A savepoint, so a failure here never breaks the caller's transaction
+            with transaction.atomic():
+                row = UserStats.objects.select_for_update().filter(user_id=user_id).first()
+                if row is None:
+                    if create_missing:
+                        rebuild_stats(user_id)
+                    continue
+                for sign, delta in deltas:
+                    _apply_delta(row, delta, sign, today)
+                row.save()
+        except DatabaseError as e:
+            print(f"Error updating dashboard stats: {str(e)}")
+            # Drop the row so the next read rebuilds it instead of showing drifted numbers
+            try:
+                with transaction.atomic():
+                    UserStats.objects.filter(user_id=user_id).delete()
+            except DatabaseError:
+                pass
+
+
+def rebuild_stats(user_id):
+    """
+    Recompute a user's stats row from the proposal and project tables
+
+    Returns:
+        UserStats: The saved row
+    """
+    today = timezone.localdate()
+    oldest = _windows(today)['prev_month']
+    proposals = Proposal.objects.filter(user_id=user_id)
+    completed = Projects.objects.filter(user_id=user_id, status='completed')
+
+    totals = proposals.aggregate(
+        total=Count('pk'),
+        accepted=Count('pk', filter=Q(status='accepted')),
+    )
+    daily = {}
+    recent = (
+        proposals.filter(created_at__gte=_day_start(oldest))
+        .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+        .values('day')
+        .annotate(proposals=Count('pk'), accepted=Count('pk', filter=Q(status='accepted')))
+        .order_by()
+    )
+    for bucket in recent:
+        counts = {key: bucket[key] for key in ('proposals', 'accepted') if bucket[key]}
+        daily[bucket['day'].isoformat()] = counts
+    revenue = completed.filter(end_date__gte=oldest).values('end_date').annotate(revenue=Sum('budget')).order_by()
+    for bucket in revenue:
+        if bucket['revenue']:
+            daily.setdefault(bucket['end_date'].isoformat(), {})['revenue'] = bucket['revenue']
+
+    row, _ = UserStats.objects.update_or_create(user_id=user_id, defaults={
+        'total_proposals': totals['total'],
+        'accepted_proposals': totals['accepted'],
+        'total_revenue': completed.aggregate(total=Sum('budget'))['total'] or 0,
+        'daily': daily,
+    })
+    return row
+
+
+def _summarize(row, today):
+    windows = {name: start.isoformat() for name, start in _windows(today).items()}
+    stats = dict.fromkeys(STAT_KEYS, 0)
+    stats.update(
+        total_proposals=row.total_proposals,
+        accepted_proposals=row.accepted_proposals,
+        total_revenue=row.total_revenue,
+    )
+    for day, counts in row.daily.items():
+        if day >= windows['week']:
+            stats['proposals_this_week'] += counts.get('proposals', 0)
+        if day >= windows['month']:
+            stats['revenue_this_month'] += counts.get('revenue', 0)
+        elif day >= windows['prev_month']:
+            stats['prev_month_proposals'] += counts.get('proposals', 0)
+            stats['prev_month_accepted'] += counts.get('accepted', 0)
+            stats['revenue_last_month'] += counts.get('revenue', 0)
+    return stats
+
+
+def compute_stats(user):
+    """
+    Compute the dashboard numbers straight from the tables
+
+    One conditional aggregation over the user's proposals and one over
+    their completed projects, using the (user, ...) composite indexes.
+
+    Returns:
+        dict: The STAT_KEYS numbers
+    """
+    windows = {name: _day_start(start) for name, start in _windows(timezone.localdate()).items()}
+    prev_month = Q(created_at__gte=windows['prev_month'], created_at__lt=windows['month'])
+    stats = Proposal.objects.filter(user=user).aggregate(
+        total_proposals=Count('pk'),
+        proposals_this_week=Count('pk', filter=Q(created_at__gte=windows['week'])),
+        accepted_proposals=Count('pk', filter=Q(status='accepted')),
+        prev_month_proposals=Count('pk', filter=prev_month),
+        prev_month_accepted=Count('pk', filter=prev_month & Q(status='accepted')),
+    )
+    stats.update(Projects.objects.filter(user=user, status='completed').aggregate(
+        total_revenue=Sum('budget'),
+        revenue_this_month=Sum('budget', filter=Q(end_date__gte=windows['month'].date())),
+        revenue_last_month=Sum('budget', filter=Q(
+            end_date__gte=windows['prev_month'].date(), end_date__lt=windows['month'].date()
+        )),
+    ))
+    return {key: stats[key] or 0 for key in STAT_KEYS}
+
+
+def get_stats(user):
+    """
+    The dashboard numbers for a user
+
+    Returns:
+        dict: total_proposals, proposals_this_week, accepted_proposals,
+              prev_month_proposals, prev_month_accepted, total_revenue,
+              revenue_this_month and revenue_last_month
+    """
+    if not get_config()['INCREMENTAL']:
+        return compute_stats(user)
+    try:
+        row = UserStats.objects.filter(user=user).first() or rebuild_stats(user.pk)
+    except DatabaseError as e:
+        print(f"Error reading dashboard stats: {str(e)}")
+        return compute_stats(user)
+    return _summarize(row, timezone.localdate())
@@ -1,85 +1,51 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Count, Sum, Avg, Q
-from datetime import datetime, timedelta
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from django.db.models.functions import Substr
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
 
-from proposals.models import Proposal
-from core.models import Projects, FreelancerProfile
+from proposals.models import Proposal, PROPOSAL_STATUS, PROPOSAL_STYLES
+from core.models import FreelancerProfile
+from core.dashboard_stats import get_stats
+from core.rollups import INTERVALS, MAX_DAYS, get_timeseries
+from core.response_cache import versioned_response
 # Credit model not implemented yet, using placeholders
 
+_NOT_LOADED = object()
+
 # Helper functions to get data for dashboard
 def _get_stats_data(user):
     """
     Get dashboard statistics for a user
     """
-    now = timezone.now()
-    week_ago = now - timedelta(days=7)
-    month_ago = now - timedelta(days=30)
-    
     # Placeholder for credit information
     credits_remaining = 25  # Placeholder value
     credits_this_week = 5   # Placeholder value
     
-    # Get proposal statistics
-    total_proposals = Proposal.objects.filter(user=user).count()
-    proposals_this_week = Proposal.objects.filter(
-        user=user, 
-        created_at__gte=week_ago
-    ).count()
+    # One precomputed row (see core/dashboard_stats.py)
+    stats = get_stats(user)
+    total_proposals = stats['total_proposals']
+    proposals_this_week = stats['proposals_this_week']
     
     # Calculate success rate (proposals with 'accepted' status)
-    accepted_proposals = Proposal.objects.filter(
-        user=user, 
-        status='accepted'
-    ).count()
-    
     success_rate = 0
     if total_proposals > 0:
-        success_rate = round((accepted_proposals / total_proposals) * 100)
+        success_rate = round((stats['accepted_proposals'] / total_proposals) * 100)
     
     # Calculate previous month's success rate for comparison
-    prev_month_proposals = Proposal.objects.filter(
-        user=user,
-        created_at__gte=month_ago - timedelta(days=30),
-        created_at__lt=month_ago
-    ).count()
-    
-    prev_month_accepted = Proposal.objects.filter(
-        user=user,
-        status='accepted',
-        created_at__gte=month_ago - timedelta(days=30),
-        created_at__lt=month_ago
-    ).count()
-    
     prev_success_rate = 0
-    if prev_month_proposals > 0:
-        prev_success_rate = round((prev_month_accepted / prev_month_proposals) * 100)
+    if stats['prev_month_proposals'] > 0:
+        prev_success_rate = round((stats['prev_month_accepted'] / stats['prev_month_proposals']) * 100)
     
     success_rate_change = success_rate - prev_success_rate
     
-    # Calculate revenue (from completed projects)
-    completed_projects = Projects.objects.filter(
-        user=user,
-        status='completed'
-    )
-    
-    total_revenue = completed_projects.aggregate(Sum('budget'))['budget__sum'] or 0
-    
-    # Revenue this month
-    revenue_this_month = completed_projects.filter(
-        end_date__gte=month_ago
-    ).aggregate(Sum('budget'))['budget__sum'] or 0
-    
-    # Revenue last month
-    revenue_last_month = completed_projects.filter(
-        end_date__gte=month_ago - timedelta(days=30),
-        end_date__lt=month_ago
-    ).aggregate(Sum('budget'))['budget__sum'] or 0
-    
-    revenue_change = revenue_this_month - revenue_last_month
+    # Revenue from completed projects
+    total_revenue = stats['total_revenue']
+    revenue_change = stats['revenue_this_month'] - stats['revenue_last_month']
     
     return [
         {
@@ -116,17 +82,22 @@ def _get_proposals_data(user):
     """
     Get recent proposals for a user
     """
-    recent_proposals = Proposal.objects.filter(user=user).order_by('-created_at')[:5]
+    recent_proposals = (
+        Proposal.objects.filter(user=user)
+        .only('id', 'job_details', 'status', 'style', 'created_at')
+        .annotate(job_description_preview=Substr('job__preview', 1, 200))
+        .order_by('-created_at')[:5]
+    )
     
     proposals_data = []
     for proposal in recent_proposals:
         # Extract job title from job_description or job_details
         title = "Untitled Proposal"
         
-        if proposal.job_description:
+        if proposal.job_description_preview:
             # Extract a title from the job description
             # First try to find a line that starts with 'Title:' or similar
-            lines = proposal.job_description.strip()[:200]
+            lines = proposal.job_description_preview.strip()[:200]
             title = lines + '...'
         
         # Determine platform if available in job_details
@@ -172,16 +143,20 @@ def _get_proposals_data(user):
     
     return proposals_data
 
-def _get_opportunities_data(user):
+def _get_opportunities_data(user, profile=_NOT_LOADED):
     """
     Get relevant job opportunities for a user
     This is a placeholder that would normally connect to job APIs or scrapers
+
+    Args:
+        profile: (optional) The user's FreelancerProfile (None if they have none), if already loaded
     """
     # Try to get user's skills from profile to make sample data more relevant
-    try:
-        profile = FreelancerProfile.objects.get(user=user)
+    if profile is _NOT_LOADED:
+        profile = FreelancerProfile.objects.filter(user=user).only('skills').first()
+    if profile is not None:
         skills = profile.skills if profile.skills else []
-    except FreelancerProfile.DoesNotExist:
+    else:
         skills = ["React", "JavaScript", "Python"]  # Default skills
     
     # Generate sample job opportunities based on user skills
@@ -246,7 +221,9 @@ def _get_opportunities_data(user):
     return job_opportunities[:5]
 
 @api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
 @permission_classes([IsAuthenticated])
+@versioned_response('dashboard_stats')
 def get_dashboard_stats(request):
     """
     Get dashboard statistics for the current user
@@ -255,7 +232,9 @@ def get_dashboard_stats(request):
     return Response({"stats": stats}, status=status.HTTP_200_OK)
 
 @api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
 @permission_classes([IsAuthenticated])
+@versioned_response('dashboard_proposals')
 def get_recent_proposals(request):
     """
     Get recent proposals for the current user
@@ -274,24 +253,79 @@ def get_job_opportunities(request):
     return Response({"opportunities": job_opportunities}, status=status.HTTP_200_OK)
 
 @api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
 @permission_classes([IsAuthenticated])
+@versioned_response('dashboard_timeseries')
+def get_dashboard_timeseries(request):
+    """
+    Proposals and revenue over a date range, from the daily rollups
+
+    Query parameters:
+        start: (optional) First day, YYYY-MM-DD (default: 29 days before end)
+        end: (optional) Last day, YYYY-MM-DD (default: today)
+        interval: (optional) day, week or month (default: day)
+        status: (optional) Comma-separated proposal statuses to count
+        style: (optional) Comma-separated proposal styles to count
+    """
+    params = request.query_params
+    try:
+        end = parse_date(params['end']) if params.get('end') else timezone.localdate()
+        start = parse_date(params['start']) if params.get('start') else end and end - timedelta(days=29)
+    except ValueError:
+        # Well formed but not a real date, e.g. 2024-02-30
+        start = end = None
+    interval = params.get('interval', 'day')
+    statuses = [value for value in params.get('status', '').split(',') if value]
+    styles = [value for value in params.get('style', '').split(',') if value]
+
+    if start is None or end is None:
+        message = 'start and end must be dates (YYYY-MM-DD)'
+    elif start > end:
+        message = 'start must not be after end'
+    elif (end - start).days >= MAX_DAYS:
+        message = f'The range may span at most {MAX_DAYS} days'
+    elif interval not in INTERVALS:
+        message = f"interval must be one of: {', '.join(INTERVALS)}"
+    elif not set(statuses) <= {choice for choice, _ in PROPOSAL_STATUS}:
+        message = 'Invalid status'
+    elif not set(styles) <= {choice for choice, _ in PROPOSAL_STYLES}:
+        message = 'Invalid style'
+    else:
+        message = None
+    if message:
+        return Response({'status': 'error', 'message': message}, status=status.HTTP_400_BAD_REQUEST)
+
+    timeseries = get_timeseries(request.user, start, end, interval, statuses, styles)
+    return Response({
+        "status": "success",
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "interval": interval,
+        "series": timeseries['series'],
+        "totals": timeseries['totals']
+    }, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
+@permission_classes([IsAuthenticated])
+@versioned_response('dashboard_data')
 def get_dashboard_data(request):
     """
     Get all dashboard data for the current user in a single request
     """
     user = request.user
     
-    # Get user name from profile if available
-    try:
-        profile = FreelancerProfile.objects.get(user=user)
-        user_name = profile.full_name if profile.full_name else user.username
-    except FreelancerProfile.DoesNotExist:
+    # Get user name from profile if available (loaded once, also used for opportunities)
+    profile = FreelancerProfile.objects.filter(user=user).only('full_name', 'skills').first()
+    if profile is not None and profile.full_name:
+        user_name = profile.full_name
+    else:
         user_name = user.username
     
     # Get all dashboard data using helper functions
     stats = _get_stats_data(user)
     proposals = _get_proposals_data(user)
-    opportunities = _get_opportunities_data(user)
+    opportunities = _get_opportunities_data(user, profile)
     
     # Get tips (static for now)
     tips = [
@@ -0,0 +1,95 @@
+"""
+Local stand-in for the OpenAI chat completions API, for benchmarks.
+
+Answers every POST (i.e. ``/v1/chat/completions``) with a fixed job-match style
+answer after ``latency`` seconds, like a slow model, on a single asyncio
+loop so it never becomes the bottleneck itself. It has no Django imports,
+so it can run in its own process (``benchmark_asgi`` does this) or be
+started by hand and targeted with ``OPENAI_BASE_URL``:
+
+    python -m core.fake_llm --port 8900 --latency 0.5
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 uvicorn server.asgi:application
+"""
+import argparse
+import asyncio
+import json
+import time
+
+
+FAKE_ANSWER = json.dumps({
+    'match_score': 80,
+    'strengths': ['Django'],
+    'gaps': [],
+    'recommendation': 'Recommended',
+    'strategy': 'Lead with the API work.',
+})
+
+
+def _response_body():
+    return json.dumps({
+        'id': 'chatcmpl-benchmark',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': 'gpt-4o',
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': FAKE_ANSWER},
+            'finish_reason': 'stop',
+        }],
+        'usage': {'prompt_tokens': 500, 'completion_tokens': 50, 'total_tokens': 550},
+    }).encode()
+
+
+async def _handle(reader, writer, latency):
+    """Serve keep-alive HTTP/1.1 requests on one connection"""
+    try:
+        while True:
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = 0
+            for line in head.split(b'\r\n')[1:]:
+                name, _, value = line.partition(b':')
+                if name.strip().lower() == b'content-length':
+                    length = int(value.strip())
+            await reader.readexactly(length)
+            await asyncio.sleep(latency)
+            body = _response_body()
+            writer.write(
+                b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                + f'Content-Length: {len(body)}\r\n\r\n'.encode() + body
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def serve(latency=0.5, ready=None, port=0):
+    """
+    Serve the fake LLM until interrupted
+
+    Args:
+        latency: Seconds to wait before answering each call
+        ready: (optional) Queue that receives the bound port once listening
+        port: (optional) Port to listen on, 0 for any free port
+    """
+    async def main():
+        server = await asyncio.start_server(
+            lambda reader, writer: _handle(reader, writer, latency), '127.0.0.1', port, backlog=1024
+        )
+        if ready is not None:
+            ready.put(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.5)
+    arguments = parser.parse_args()
+    try:
+        serve(arguments.latency, port=arguments.port)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,294 @@
+"""
+Content-addressed cache for deterministic LLM analyses.
+
+Responses are keyed on a SHA-256 of (model, temperature, messages,
+response_format), so re-submitting the same job post or re-saving the
+same project description is answered without calling OpenAI.
+
+Two tiers:
+    1. An in-process LRU (bounded by ``MEMORY_MAX_ENTRIES``)
+    2. The ``LLMCacheEntry`` table, shared by all workers (bounded by ``DB_MAX_ENTRIES``)
+
+Both tiers honour a TTL. Configuration lives in ``settings.LLM_CACHE``.
+
+Concurrent misses for the same key are coalesced into one OpenAI call
+(core/single_flight.py). ``acached_completion`` is the async variant.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+
+from . import metrics, single_flight
+from .models import LLMCacheEntry
+from .model_routing import arouted_completion, get_policy, routed_completion
+from .openai_service import achat_completion, chat_completion
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TTL': 60 * 60 * 24 * 7,
+    'MEMORY_MAX_ENTRIES': 512,
+    'DB_MAX_ENTRIES': 20000,
+    # Expired/overflow rows are pruned once every N database writes
+    'PRUNE_EVERY': 100,
+}
+
+
+def get_config():
+    """Return the cache configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'LLM_CACHE', {}))
+    return config
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU with per-entry expiry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_memory = LRUCache(get_config()['MEMORY_MAX_ENTRIES'])
+_stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0, 'writes': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def make_key(model, temperature, messages, response_format=None):
+    """
+    Build the content address for a completion request
+
+    Args:
+        model: The model name
+        temperature: The sampling temperature (None when not set)
+        messages: The chat messages (system and user prompts)
+        response_format: (optional) The response_format argument
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    payload = json.dumps({
+        'model': model,
+        'temperature': temperature,
+        'messages': messages,
+        'response_format': response_format,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def lookup(key):
+    """Look a key up in memory, then in the database. Returns None on miss."""
+    value = _memory.get(key)
+    if value is not None:
+        _count('memory_hits')
+        return value
+
+    try:
+        entry = LLMCacheEntry.objects.filter(key=key, expires_at__gt=timezone.now()).first()
+        if entry is not None:
+            LLMCacheEntry.objects.filter(pk=entry.pk).update(hits=F('hits') + 1)
+    except DatabaseError as e:
+        print(f"Error reading LLM cache: {str(e)}")
+        entry = None
+
+    if entry is None:
+        _count('misses')
+        return None
+
+    _count('db_hits')
+    remaining = (entry.expires_at - timezone.now()).total_seconds()
+    _memory.set(key, entry.response, max(remaining, 1))
+    return entry.response
+
+
+def peek(key):
+    """Like lookup, but without touching the hit/miss counters (for polling)"""
+    value = _memory.get(key)
+    if value is not None:
+        return value
+    try:
+        entry = LLMCacheEntry.objects.filter(key=key, expires_at__gt=timezone.now()).only('response').first()
+    except DatabaseError:
+        return None
+    return entry.response if entry is not None else None
+
+
+def store(key, value, model='', ttl=None):
+    """Store a response in both tiers"""
+    config = get_config()
+    ttl = ttl or config['TTL']
+    _memory.set(key, value, ttl)
+
+    try:
+        LLMCacheEntry.objects.update_or_create(
+            key=key,
+            defaults={
+                'model': model,
+                'response': value,
+                'expires_at': timezone.now() + timedelta(seconds=ttl),
+            }
+        )
+    except DatabaseError as e:
+        print(f"Error writing LLM cache: {str(e)}")
+        return
+
+    _count('writes')
+    if _stats['writes'] % config['PRUNE_EVERY'] == 0:
+        prune()
+
+
+def prune():
+    """Delete expired rows and trim the table down to DB_MAX_ENTRIES (oldest first)"""
+    try:
+        LLMCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+        max_entries = get_config()['DB_MAX_ENTRIES']
+        cutoff = (
+            LLMCacheEntry.objects.order_by('-created_at')
+            .values_list('created_at', flat=True)[max_entries:max_entries + 1]
+        )
+        cutoff = list(cutoff)
+        if cutoff:
+            LLMCacheEntry.objects.filter(created_at__lte=cutoff[0]).delete()
+    except DatabaseError as e:
+        print(f"Error pruning LLM cache: {str(e)}")
+
+
+def clear():
+    """Empty both tiers"""
+    _memory.clear()
+    LLMCacheEntry.objects.all().delete()
+
+
+def get_stats():
+    """Return hit/miss counters for this process"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['memory_hits'] + stats['db_hits'] + stats['misses']
+    stats['hit_rate'] = round((stats['memory_hits'] + stats['db_hits']) / lookups, 4) if lookups else 0
+    stats['memory_entries'] = len(_memory)
+    return stats
+
+
+def _prepare(model, temperature, task, kwargs):
+    """Resolve the cache model and completion kwargs shared by both variants"""
+    if temperature is not None:
+        kwargs['temperature'] = temperature
+    if task is not None:
+        # Keyed on the primary model; a fallback answer is reused like any other
+        model = get_policy(task)['MODEL']
+        kwargs.setdefault('call_site', task)
+    return model, kwargs
+
+
+def cached_completion(messages, model=None, temperature=None, ttl=None, task=None, **kwargs):
+    """
+    Return the content of a chat completion, served from cache when possible
+
+    Only use this for deterministic analyses where re-using an earlier answer
+    for identical input is acceptable. Accepts the same arguments as
+    ``openai_service.chat_completion``; pass ``task`` instead of ``model`` to
+    route the call through the task's policy (core/model_routing.py).
+
+    Returns:
+        str: The message content of the first choice
+    """
+    model, kwargs = _prepare(model, temperature, task, kwargs)
+
+    def complete():
+        if task is not None:
+            response = routed_completion(task, messages, **kwargs)
+        else:
+            response = chat_completion(messages, model, **kwargs)
+        return response.choices[0].message.content
+
+    if not get_config()['ENABLED']:
+        return complete()
+
+    key = make_key(model, temperature, messages, kwargs.get('response_format'))
+    content = lookup(key)
+    call_site = kwargs.get('call_site') or 'unknown'
+    if content is not None:
+        metrics.LLM_CACHE_LOOKUPS.inc(call_site=call_site, result='hit')
+        return content
+    metrics.LLM_CACHE_LOOKUPS.inc(call_site=call_site, result='miss')
+
+    def complete_and_store():
+        content = complete()
+        if content:
+            store(key, content, model=model, ttl=ttl)
+        return content
+
+    # Identical requests already in flight (here or in another process) are awaited, not repeated
+    return single_flight.do(key, complete_and_store, poll=lambda: peek(key))
+
+
+async def acached_completion(messages, model=None, temperature=None, ttl=None, task=None, **kwargs):
+    """Async variant of ``cached_completion`` (same arguments and return value)"""
+    model, kwargs = _prepare(model, temperature, task, kwargs)
+
+    async def complete():
+        if task is not None:
+            response = await arouted_completion(task, messages, **kwargs)
+        else:
+            response = await achat_completion(messages, model, **kwargs)
+        return response.choices[0].message.content
+
+    if not get_config()['ENABLED']:
+        return await complete()
+
+    key = make_key(model, temperature, messages, kwargs.get('response_format'))
+    content = await sync_to_async(lookup)(key)
+    call_site = kwargs.get('call_site') or 'unknown'
+    if content is not None:
+        metrics.LLM_CACHE_LOOKUPS.inc(call_site=call_site, result='hit')
+        return content
+    metrics.LLM_CACHE_LOOKUPS.inc(call_site=call_site, result='miss')
+
+    async def complete_and_store():
+        content = await complete()
+        if content:
+            await sync_to_async(store)(key, content, model=model, ttl=ttl)
+        return content
+
+    return await single_flight.ado(key, complete_and_store, poll=lambda: peek(key))
@@ -0,0 +1,156 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import openai_service
+from core.fake_llm import serve as serve_fake_llm
+from core.models import FreelancerProfile
+
+
+ENDPOINTS = {
+    'job-match': ('/api/proposals/job-match/analyze/', '/api/proposals/async/job-match/analyze/'),
+    'proposal': ('/api/proposals/create/', '/api/proposals/async/create/'),
+}
+
+def _summary(mode, latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'mode': mode,
+        'requests': count + errors,
+        'errors': errors,
+        'seconds': round(elapsed, 2),
+        'rps': round((count + errors) / elapsed, 1) if elapsed else 0,
+        'p50': round(latencies[count // 2], 3) if count else None,
+        'p95': round(latencies[int(0.95 * (count - 1))], 3) if count else None,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare WSGI (sync views, thread pool) and ASGI (async views, one event loop) throughput against a local fake LLM'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='job-match')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per mode')
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent clients')
+        parser.add_argument('--wsgi-threads', type=int, default=8, help='Request threads of the WSGI server (e.g. gunicorn --threads)')
+        parser.add_argument('--latency', type=float, default=0.5, help='Seconds the fake LLM takes per call')
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context('spawn')
+        ready = context.Queue()
+        fake_llm = context.Process(target=serve_fake_llm, args=(options['latency'], ready), daemon=True)
+        fake_llm.start()
+        base_url = f'http://127.0.0.1:{ready.get(timeout=30)}/v1'
+
+        # Runs against a throwaway test database, never the real one
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        pool_size = max(options['concurrency'], options['wsgi_threads'])
+        try:
+            with override_settings(
+                LLM_CLIENT={'API_KEY': 'benchmark', 'BASE_URL': base_url, 'MAX_RETRIES': 0,
+                            'MAX_CONNECTIONS': pool_size, 'MAX_KEEPALIVE_CONNECTIONS': pool_size},
+                LLM_CACHE={'ENABLED': False},
+                LLM_RATE_LIMIT={'ENABLED': False},
+                MATCH_PREFILTER={'ENABLED': False},
+                LLM_ROUTING={'job_match': {'HEDGE': False}},
+            ):
+                openai_service.reset_client()
+                results = self._run(options)
+        finally:
+            openai_service.reset_client()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            fake_llm.terminate()
+
+        self.stdout.write(
+            f"{options['requests']} requests to {options['endpoint']}, {options['concurrency']} concurrent clients, "
+            f"fake LLM latency {options['latency']}s, {options['wsgi_threads']} WSGI threads"
+        )
+        self.stdout.write(f"{'mode':<6}{'errors':>8}{'seconds':>10}{'req/s':>10}{'p50':>9}{'p95':>9}")
+        for row in results:
+            self.stdout.write(
+                f"{row['mode']:<6}{row['errors']:>8}{row['seconds']:>10}{row['rps']:>10}{row['p50']!s:>9}{row['p95']!s:>9}"
+            )
+        wsgi, asgi = results
+        if wsgi['rps']:
+            self.stdout.write(self.style.SUCCESS(f"ASGI/WSGI throughput: {asgi['rps'] / wsgi['rps']:.1f}x"))
+
+    def _run(self, options):
+        user = User.objects.create_user('benchmark', 'benchmark@example.com', 'benchmark')
+        FreelancerProfile.objects.create(
+            user=user,
+            full_name='Bench Mark',
+            tagline='Python / Django developer',
+            about='I build REST APIs with Django and PostgreSQL.',
+            skills=['Python', 'Django', 'PostgreSQL'],
+        )
+        token = str(RefreshToken.for_user(user).access_token)
+        body = {
+            'job_description': 'We need a Django developer to build a REST API backed by PostgreSQL.',
+            'prefilter': False,
+        }
+        sync_path, async_path = ENDPOINTS[options['endpoint']]
+        return [
+            self._run_wsgi(sync_path, body, token, options),
+            self._run_asgi(async_path, body, token, options),
+        ]
+
+    def _run_wsgi(self, path, body, token, options):
+        """Concurrent clients queue (FIFO) for a fixed pool of request threads, as on a threaded WSGI server"""
+        local = threading.local()
+        latencies, errors = [], 0
+
+        def handle():
+            if not hasattr(local, 'client'):
+                local.client = Client(headers={'Authorization': f'Bearer {token}'})
+            return local.client.post(path, body, content_type='application/json').status_code
+
+        with ThreadPoolExecutor(max_workers=options['wsgi_threads']) as server_threads:
+            def request(_):
+                # Latency is measured from the client's side, including the wait for a free server thread
+                started = time.monotonic()
+                status_code = server_threads.submit(handle).result()
+                return status_code, time.monotonic() - started
+
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as clients:
+                for status_code, seconds in clients.map(request, range(options['requests'])):
+                    if status_code < 400:
+                        latencies.append(seconds)
+                    else:
+                        errors += 1
+            elapsed = time.monotonic() - started
+        return _summary('wsgi', latencies, errors, elapsed)
+
+    def _run_asgi(self, path, body, token, options):
+        """Concurrent clients served by async views on a single event loop"""
+        async def run():
+            client = AsyncClient()
+            headers = {'Authorization': f'Bearer {token}'}
+            semaphore = asyncio.Semaphore(options['concurrency'])
+
+            async def request():
+                async with semaphore:
+                    started = time.monotonic()
+                    response = await client.post(path, body, content_type='application/json', headers=headers)
+                    return response.status_code, time.monotonic() - started
+
+            started = time.monotonic()
+            outcomes = await asyncio.gather(*[request() for _ in range(options['requests'])])
+            return outcomes, time.monotonic() - started
+
+        outcomes, elapsed = asyncio.run(run())
+        latencies = [seconds for status_code, seconds in outcomes if status_code < 400]
+        return _summary('asgi', latencies, len(outcomes) - len(latencies), elapsed)
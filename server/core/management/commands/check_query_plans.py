@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Projects
+from proposals.listing import encode_cursor, page_query
+from proposals.models import Proposal
+
+
+def _hot_queries():
+    """(label, queryset, indexes any of which the plan must use) for the dashboard and listing queries"""
+    user = User(pk=1)
+    now = timezone.now()
+    month_ago = now - timedelta(days=30)
+    cursor = encode_cursor(Proposal(created_at=now, id='0' * 32))
+    return [
+        ('dashboard stats: recent proposals by day',
+         Proposal.objects.filter(user=user, created_at__gte=month_ago - timedelta(days=30)),
+         ['proposal_user_created_idx']),
+        ('dashboard stats: accepted proposals',
+         Proposal.objects.filter(user=user, status='accepted'),
+         ['proposal_user_status_idx']),
+        ('dashboard stats: completed projects',
+         Projects.objects.filter(user=user, status='completed'),
+         ['project_user_status_end_idx']),
+        ('dashboard stats: recent revenue',
+         Projects.objects.filter(user=user, status='completed', end_date__gte=month_ago.date()),
+         ['project_user_status_end_idx']),
+        ('dashboard: recent proposals',
+         Proposal.objects.filter(user=user).only('id', 'status', 'created_at').order_by('-created_at')[:5],
+         ['proposal_user_created_idx']),
+        ('listing: first page', page_query(user, {})[0], ['proposal_user_created_idx']),
+        ('listing: next page', page_query(user, {'cursor': cursor})[0], ['proposal_user_created_idx']),
+        ('listing: status filter', page_query(user, {'status': 'accepted,rejected'})[0],
+         ['proposal_user_created_idx', 'proposal_user_status_idx']),
+    ]
+
+
+def _problems(plan, indexes):
+    """Why a plan doesn't use the expected access path, if it doesn't"""
+    problems = []
+    if not any(index in plan for index in indexes):
+        problems.append(f"uses none of {', '.join(indexes)}")
+    # A sort step means the index didn't deliver the rows in order
+    if 'TEMP B-TREE' in plan or '\nSort' in plan or '->  Sort' in plan:
+        problems.append('sorts the rows')
+    return problems
+
+
+class Command(BaseCommand):
+    help = 'Assert that the dashboard and proposal listing queries use their composite indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every query plan')
+
+    def handle(self, *args, **options):
+        failures = 0
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small tables make a sequential scan cheapest; judge the plan the planner would pick at scale
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for label, queryset, indexes in _hot_queries():
+                plan = queryset.explain()
+                problems = _problems(plan, indexes)
+                if problems:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f"FAIL {label}: {'; '.join(problems)}"))
+                else:
+                    self.stdout.write(f"ok   {label}")
+                if problems or options['verbose_plans']:
+                    self.stdout.write('\n'.join(f'       {line}' for line in plan.splitlines()))
+
+        if failures:
+            raise CommandError(f'{failures} queries do not use their indexes (migrations applied?)')
+        self.stdout.write(self.style.SUCCESS('All hot queries use their indexes'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.rollups import rebuild_proposal_rollups, rebuild_revenue_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily proposal and revenue rollups from the proposals and projects tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, default=None, help='Only rebuild this user id (default: all users)')
+
+    def handle(self, *args, **options):
+        proposals = rebuild_proposal_rollups(options['user'])
+        revenue = rebuild_revenue_rollups(options['user'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {proposals} proposal rollup row(s) and {revenue} revenue rollup row(s)'
+        ))
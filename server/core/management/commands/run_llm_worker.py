@@ -0,0 +1,57 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+
+
+def _worker_process(index, poll_interval, max_tasks, burst):
+    """Entry point for spawned worker processes (Django is set up again in the child)"""
+    import django
+    django.setup()
+
+    from core.task_queue import run_worker, default_worker_name
+    try:
+        run_worker(default_worker_name(index), poll_interval, max_tasks, burst)
+    except KeyboardInterrupt:
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Run background workers that execute queued LLM tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Number of worker processes')
+        parser.add_argument('--poll-interval', type=float, default=None, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--max-tasks', type=int, default=None, help='Exit after each worker processed this many tasks')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        processes = max(options['processes'], 1)
+        worker_args = (options['poll_interval'], options['max_tasks'], options['burst'])
+
+        if processes == 1:
+            from core.task_queue import run_worker, default_worker_name
+            self.stdout.write('Starting LLM worker')
+            try:
+                processed = run_worker(default_worker_name(), *worker_args)
+            except KeyboardInterrupt:
+                return
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} task(s)'))
+            return
+
+        # spawn works on every platform and gives each worker its own DB connections
+        context = multiprocessing.get_context('spawn')
+        workers = [
+            context.Process(target=_worker_process, args=(index,) + worker_args, daemon=True)
+            for index in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f'Started {processes} LLM worker processes')
+
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+        self.stdout.write(self.style.SUCCESS('LLM workers stopped'))
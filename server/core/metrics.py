@@ -0,0 +1,198 @@
+"""
+Prometheus metrics for LLM calls.
+
+Every request that goes through ``core.openai_service`` records its latency,
+token usage, retries and outcome, labelled by call site and model. The
+metrics are rendered in the Prometheus text exposition format by the
+``/metrics`` view (core/metrics_views.py); the format is small enough that
+it is produced here without a client library.
+
+Latency percentiles per call site come from the histogram buckets, e.g.:
+
+    histogram_quantile(0.95, sum by (call_site, le) (rate(llm_request_duration_seconds_bucket[5m])))
+
+Note: values live in process memory, so each web or worker process exposes
+its own numbers and they reset on restart. Scrape every process (Prometheus
+sums across instances) rather than a load-balanced address.
+"""
+import threading
+from django.conf import settings
+
+
+DEFAULTS = {
+    # Bearer token required by /metrics; leave empty to serve it without auth
+    'TOKEN': None,
+}
+
+# Seconds; covers quick cache-warm analyses up to slow full proposal generations
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+
+_registry = []
+
+
+def get_config():
+    """Return the metrics configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'METRICS', {}))
+    return config
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base class for a labelled metric registered for exposition"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        missing = set(self.labelnames) - set(labels)
+        if missing:
+            raise ValueError(f'Missing labels for {self.name}: {sorted(missing)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing value"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self, items):
+        for key, value in items:
+            yield f'{self.name}{_format_labels(zip(self.labelnames, key))} {_format_value(value)}'
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, plus their sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][index] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def get_count(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state['count'] if state else 0
+
+    def _render_samples(self, items):
+        for key, state in items:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state['buckets']):
+                cumulative += count
+                bucket_labels = _format_labels(labels + [('le', _format_value(bound))])
+                yield f'{self.name}_bucket{bucket_labels} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(labels)} {_format_value(state["sum"])}'
+            yield f'{self.name}_count{_format_labels(labels)} {state["count"]}'
+
+
+def render():
+    """Render every registered metric in the Prometheus text format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Clear all recorded values (for tests and benchmarks)"""
+    for metric in _registry:
+        metric.clear()
+
+
+LLM_REQUEST_SECONDS = Histogram(
+    'llm_request_duration_seconds',
+    'Wall time of LLM calls including retries (streams: until the last chunk)',
+    ['call_site', 'model', 'outcome'],
+)
+LLM_FIRST_TOKEN_SECONDS = Histogram(
+    'llm_stream_first_token_seconds',
+    'Time until the first content chunk of a streamed LLM call',
+    ['call_site', 'model'],
+)
+LLM_REQUESTS = Counter(
+    'llm_requests_total',
+    'LLM calls by outcome (success, error, cancelled, rejected, throttled)',
+    ['call_site', 'model', 'outcome'],
+)
+LLM_TOKENS = Counter(
+    'llm_tokens_total',
+    'Tokens reported by the provider; type is prompt, completion or cached (prompt tokens served from cache)',
+    ['call_site', 'model', 'type'],
+)
+LLM_RETRIES = Counter(
+    'llm_retries_total',
+    'Retried LLM attempts by the error that caused the retry',
+    ['call_site', 'model', 'error'],
+)
+LLM_ERRORS = Counter(
+    'llm_errors_total',
+    'LLM calls that failed after retries, by error type',
+    ['call_site', 'model', 'error'],
+)
+LLM_CACHE_LOOKUPS = Counter(
+    'llm_cache_lookups_total',
+    'Response cache lookups in core/llm_cache.py (hit or miss)',
+    ['call_site', 'result'],
+)
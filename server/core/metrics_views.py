@@ -0,0 +1,26 @@
+import hmac
+
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from . import metrics
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@require_GET
+def prometheus_metrics(request):
+    """
+    Prometheus scrape endpoint for the LLM call metrics
+
+    Open by default so a scraper on the internal network needs no JWT. When
+    METRICS['TOKEN'] is set, requests must send ``Authorization: Bearer <token>``.
+    """
+    token = metrics.get_config()['TOKEN']
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+            return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+
+    return HttpResponse(metrics.render(), content_type=CONTENT_TYPE)
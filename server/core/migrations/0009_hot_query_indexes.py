@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-17 19:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_ratelimitbucket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projects',
+            index=models.Index(fields=['user', 'status', 'end_date'], name='project_user_status_end_idx'),
+        ),
+    ]
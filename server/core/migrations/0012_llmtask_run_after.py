@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:22
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_daily_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='llmtask',
+            name='core_llmtas_status_9c5989_idx',
+        ),
+        migrations.AddField(
+            model_name='llmtask',
+            name='run_after',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='llmtask',
+            index=models.Index(fields=['status', 'run_after', 'created_at'], name='core_llmtas_status_8334ba_idx'),
+        ),
+    ]
@@ -0,0 +1,320 @@
+"""
+Per-task model routing for LLM calls.
+
+Each task has a declarative policy: the primary model, a faster fallback
+model, the maximum output tokens and a latency budget in seconds. Defaults
+live in DEFAULT_POLICIES; ``settings.LLM_ROUTING`` overrides any key per
+task, e.g.:
+
+    LLM_ROUTING = {
+        'generate': {'MODEL': 'gpt-4.1', 'LATENCY_BUDGET': 40},
+    }
+
+The primary model gets the latency budget as its timeout and no retries of
+its own; if it times out or fails with a retryable error, the call is
+repeated once on the fallback model (with the normal gateway timeout and
+retries). Without a fallback the primary keeps the normal retry policy.
+An open circuit breaker on the primary, or its exhausted rate limit, also
+sends calls to the fallback.
+
+Tasks with HEDGE enabled (short analyses) send a second, identical request
+if the first hasn't answered within the task's recent p95 latency, and use
+whichever answers first. Until HEDGE_MIN_SAMPLES latencies have been seen,
+HEDGE_AFTER seconds is used instead. Hedging costs at most ~5% extra calls.
+
+``arouted_completion`` applies the same policy (fallback and hedging) on
+the event loop for ASGI views.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connection
+
+from . import metrics
+from .circuit_breaker import LLMUnavailableError
+from .openai_service import RETRYABLE_ERRORS, achat_completion, chat_completion, stream_chat_completion
+from .rate_limit import LLMRateLimitError
+
+
+DEFAULT_POLICIES = {
+    'job_match': {
+        'MODEL': 'gpt-4o',
+        'FALLBACK_MODEL': 'gpt-4o-mini',
+        'MAX_TOKENS': 800,
+        'LATENCY_BUDGET': 30,
+        'HEDGE': False,
+        'HEDGE_AFTER': 8,
+    },
+    'pain_points': {
+        'MODEL': 'gpt-4o',
+        'FALLBACK_MODEL': 'gpt-4o-mini',
+        'MAX_TOKENS': 400,
+        'LATENCY_BUDGET': 30,
+        'HEDGE': False,
+        'HEDGE_AFTER': 6,
+    },
+    'generate': {
+        'MODEL': 'gpt-4o',
+        'FALLBACK_MODEL': 'gpt-4o-mini',
+        'MAX_TOKENS': 1500,
+        'LATENCY_BUDGET': 60,
+    },
+    'humanize': {
+        'MODEL': 'gpt-4o',
+        'FALLBACK_MODEL': 'gpt-4o-mini',
+        'MAX_TOKENS': 1500,
+        'LATENCY_BUDGET': 60,
+    },
+    'extract_profile': {
+        'MODEL': 'gpt-4o',
+        'FALLBACK_MODEL': 'gpt-4o-mini',
+        'MAX_TOKENS': 4000,
+        'LATENCY_BUDGET': 90,
+    },
+    'summarize': {
+        'MODEL': 'gpt-4o-mini',
+        'FALLBACK_MODEL': None,
+        'MAX_TOKENS': 300,
+        'LATENCY_BUDGET': 15,
+    },
+}
+
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200
+
+# Errors that move a call to the fallback model
+FALLBACK_ERRORS = RETRYABLE_ERRORS + (LLMUnavailableError, LLMRateLimitError)
+
+_latencies = {}
+_latencies_lock = threading.Lock()
+_hedge_executor = None
+_hedge_executor_lock = threading.Lock()
+
+LLM_HEDGED = metrics.Counter(
+    'llm_hedged_total',
+    'Hedged requests sent after the p95 delay, by which attempt answered first',
+    ['task', 'winner'],
+)
+LLM_FALLBACKS = metrics.Counter(
+    'llm_fallbacks_total',
+    'Calls moved to the fallback model after the primary timed out or failed',
+    ['task', 'model', 'fallback_model', 'error'],
+)
+
+
+def get_policy(task):
+    """
+    Return the routing policy for a task
+
+    Args:
+        task: One of DEFAULT_POLICIES (or a task only defined in settings.LLM_ROUTING)
+
+    Returns:
+        dict: MODEL, FALLBACK_MODEL, MAX_TOKENS, LATENCY_BUDGET (and HEDGE, HEDGE_AFTER)
+    """
+    overrides = getattr(settings, 'LLM_ROUTING', {}).get(task, {})
+    if task not in DEFAULT_POLICIES and not overrides:
+        raise ValueError(f'No routing policy for task: {task}')
+    policy = dict(DEFAULT_POLICIES.get(task, {}))
+    policy.update(overrides)
+    return policy
+
+
+def _call_kwargs(policy, call_site, task, kwargs):
+    kwargs = dict(kwargs)
+    kwargs['call_site'] = call_site or task
+    if policy.get('MAX_TOKENS'):
+        kwargs.setdefault('max_tokens', policy['MAX_TOKENS'])
+    return kwargs
+
+
+def _record_latency(task, seconds):
+    with _latencies_lock:
+        _latencies.setdefault(task, deque(maxlen=HEDGE_WINDOW)).append(seconds)
+
+
+def hedge_delay(task, policy):
+    """Seconds to wait before hedging: the task's recent p95, or HEDGE_AFTER until there's enough data"""
+    with _latencies_lock:
+        samples = sorted(_latencies.get(task, ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return policy.get('HEDGE_AFTER', 8)
+    return samples[int(0.95 * (len(samples) - 1))]
+
+
+def _get_hedge_executor():
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='llm-hedge')
+        return _hedge_executor
+
+
+def _hedged(task, policy, call):
+    """Run call; if it is slower than the hedge delay, race it against a second attempt"""
+    def attempt():
+        try:
+            return call()
+        finally:
+            # Pool threads reach the DB (rate limiter, LLM cache); don't keep a connection per thread
+            connection.close()
+
+    started = time.monotonic()
+    executor = _get_hedge_executor()
+    first = executor.submit(attempt)
+    done, _ = wait([first], timeout=hedge_delay(task, policy))
+    if done:
+        result = first.result()
+        _record_latency(task, time.monotonic() - started)
+        return result
+
+    second = executor.submit(attempt)
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                # The slower attempt finishes in the background and is discarded
+                LLM_HEDGED.inc(task=task, winner='primary' if future is first else 'hedge')
+                _record_latency(task, time.monotonic() - started)
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def _call_primary(task, policy, messages, kwargs, max_retries=None):
+    def call():
+        return chat_completion(
+            messages, policy['MODEL'], timeout=policy['LATENCY_BUDGET'], max_retries=max_retries, **kwargs
+        )
+
+    if policy.get('HEDGE'):
+        return _hedged(task, policy, call)
+    started = time.monotonic()
+    response = call()
+    _record_latency(task, time.monotonic() - started)
+    return response
+
+
+def routed_completion(task, messages, call_site=None, **kwargs):
+    """
+    Create a chat completion with the task's model, falling back on timeout
+
+    Args:
+        task: The task whose policy to apply
+        messages: The chat messages to send
+        call_site: (optional) Metrics label, defaults to the task name
+        **kwargs: Any other ``chat_completion`` arguments (temperature, response_format, ...)
+
+    Returns:
+        The OpenAI ChatCompletion response (``response.model`` says which model answered)
+    """
+    policy = get_policy(task)
+    kwargs = _call_kwargs(policy, call_site, task, kwargs)
+    fallback = policy.get('FALLBACK_MODEL')
+
+    if not fallback:
+        return _call_primary(task, policy, messages, kwargs)
+
+    try:
+        return _call_primary(task, policy, messages, kwargs, max_retries=0)
+    except FALLBACK_ERRORS as e:
+        LLM_FALLBACKS.inc(task=task, model=policy['MODEL'], fallback_model=fallback, error=type(e).__name__)
+        return chat_completion(messages, fallback, **kwargs)
+
+
+def routed_stream(task, messages, call_site=None, **kwargs):
+    """
+    Stream a chat completion with the task's model, falling back on timeout
+
+    The fallback only applies until the first token arrives; after that the
+    output has been forwarded and errors are raised to the caller.
+
+    Yields:
+        str: Content deltas as they arrive
+    """
+    policy = get_policy(task)
+    kwargs = _call_kwargs(policy, call_site, task, kwargs)
+    fallback = policy.get('FALLBACK_MODEL')
+
+    if not fallback:
+        yield from stream_chat_completion(messages, policy['MODEL'], timeout=policy['LATENCY_BUDGET'], **kwargs)
+        return
+
+    chunks = stream_chat_completion(
+        messages, policy['MODEL'], timeout=policy['LATENCY_BUDGET'], max_retries=0, **kwargs
+    )
+    try:
+        first = next(chunks)
+    except StopIteration:
+        return
+    except FALLBACK_ERRORS as e:
+        LLM_FALLBACKS.inc(task=task, model=policy['MODEL'], fallback_model=fallback, error=type(e).__name__)
+        yield from stream_chat_completion(messages, fallback, **kwargs)
+        return
+
+    yield first
+    yield from chunks
+
+
+async def _ahedged(task, policy, call):
+    """asyncio counterpart of _hedged"""
+    started = time.monotonic()
+    first = asyncio.ensure_future(call())
+    done, _ = await asyncio.wait([first], timeout=hedge_delay(task, policy))
+    if done:
+        result = first.result()
+        _record_latency(task, time.monotonic() - started)
+        return result
+
+    second = asyncio.ensure_future(call())
+    pending = {first, second}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    LLM_HEDGED.inc(task=task, winner='primary' if future is first else 'hedge')
+                    _record_latency(task, time.monotonic() - started)
+                    return future.result()
+                error = future.exception()
+        raise error
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def _acall_primary(task, policy, messages, kwargs, max_retries=None):
+    def call():
+        return achat_completion(
+            messages, policy['MODEL'], timeout=policy['LATENCY_BUDGET'], max_retries=max_retries, **kwargs
+        )
+
+    if policy.get('HEDGE'):
+        return await _ahedged(task, policy, call)
+    started = time.monotonic()
+    response = await call()
+    _record_latency(task, time.monotonic() - started)
+    return response
+
+
+async def arouted_completion(task, messages, call_site=None, **kwargs):
+    """Async variant of ``routed_completion``"""
+    policy = get_policy(task)
+    kwargs = _call_kwargs(policy, call_site, task, kwargs)
+    fallback = policy.get('FALLBACK_MODEL')
+
+    if not fallback:
+        return await _acall_primary(task, policy, messages, kwargs)
+
+    try:
+        return await _acall_primary(task, policy, messages, kwargs, max_retries=0)
+    except FALLBACK_ERRORS as e:
+        LLM_FALLBACKS.inc(task=task, model=policy['MODEL'], fallback_model=fallback, error=type(e).__name__)
+        return await achat_completion(messages, fallback, **kwargs)
@@ -1,5 +1,7 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
+import uuid
 
 
 
@@ -49,6 +51,12 @@ class Projects(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Revenue aggregates over completed projects by end date
+            models.Index(fields=['user', 'status', 'end_date'], name='project_user_status_end_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -70,4 +78,139 @@ class Experience(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
-        return self.company
\ No newline at end of file
+        return self.company
+
+
+class LLMCacheEntry(models.Model):
+    """Persistent tier of the LLM response cache (see core/llm_cache.py)"""
+    key = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=100)
+    response = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.model} - {self.key[:12]}"
+
+
+class RateLimitBucket(models.Model):
+    """
+    Shared token bucket for the OpenAI rate limits (see core/rate_limit.py).
+    Updates are compare-and-swap on `version`, so every process draws from the same bucket.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField()
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} - {self.tokens:.0f}"
+
+
+class UserStats(models.Model):
+    """
+    Dashboard counters of one user, kept current by signals on Proposal and
+    Projects (see core/dashboard_stats.py). Deleting a row makes the next
+    dashboard load rebuild it.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    total_proposals = models.IntegerField(default=0)
+    accepted_proposals = models.IntegerField(default=0)
+    total_revenue = models.BigIntegerField(default=0)
+    # Recent activity by day: {"YYYY-MM-DD": {"proposals": n, "accepted": n, "revenue": n}}
+    daily = models.JSONField(default=dict, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.total_proposals} proposals"
+
+
+class DailyProposalRollup(models.Model):
+    """Proposals a user created on one day with one status and style (see core/rollups.py)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    day = models.DateField()
+    status = models.CharField(max_length=20)
+    style = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index for (user, day range) queries
+            models.UniqueConstraint(fields=['user', 'day', 'status', 'style'], name='proposal_rollup_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.day} - {self.status}/{self.style}: {self.count}"
+
+
+class DailyRevenueRollup(models.Model):
+    """Revenue of the projects a user completed on one day (by end date, see core/rollups.py)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    day = models.DateField()
+    revenue = models.BigIntegerField(default=0)
+    completed_projects = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='revenue_rollup_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.day}: {self.revenue}"
+
+
+class LLMInFlight(models.Model):
+    """
+    Cross-process lock for an LLM request that is being computed
+    (see core/single_flight.py). Other processes wait for its result
+    instead of sending the same request again.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    owner = models.CharField(max_length=255)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key[:12]} - {self.owner}"
+
+
+
+TASK_STATUS = (
+    ('queued', 'Queued'),
+    ('running', 'Running'),
+    ('succeeded', 'Succeeded'),
+    ('failed', 'Failed'),
+)
+
+
+class LLMTask(models.Model):
+    """A unit of LLM work executed off the request path (see core/task_queue.py)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    task_type = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, default='queued', choices=TASK_STATUS)
+
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=2)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    # Not claimed before this time (retry backoff)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_type} - {self.status} - {self.id}"
@@ -0,0 +1,472 @@
+"""
+Central gateway for every OpenAI call made by the server.
+
+All call sites go through ``chat_completion`` so they share a single,
+lazily-built client with one keep-alive connection pool, explicit
+timeouts and a jittered retry policy. Configuration lives in
+``settings.LLM_CLIENT``.
+
+The HTTP transport is pluggable so tests and benchmarks can point the
+gateway at a local stand-in server (or an ``httpx.MockTransport``)
+without touching the call sites:
+
+    from core import openai_service
+    openai_service.set_transport(httpx.MockTransport(handler))
+
+``achat_completion`` is the asyncio counterpart for ASGI views. It uses an
+``AsyncOpenAI`` client per event loop with the same pool limits, retries,
+circuit breaker, rate limiter and metrics.
+
+A per-model circuit breaker (core/circuit_breaker.py) makes calls fail fast
+with ``LLMUnavailableError`` while OpenAI keeps failing, and a shared RPM/TPM
+limiter (core/rate_limit.py) holds calls back, or fails them with
+``LLMRateLimitError``, before they would exceed the account's rate limits.
+
+Every call records latency, retries, outcome and token usage as Prometheus
+metrics labelled by ``call_site`` (core/metrics.py, served at ``/metrics``).
+Token usage is also tallied per model, including the prompt tokens OpenAI served
+from its prefix cache (``usage.prompt_tokens_details.cached_tokens``); see
+``get_usage_stats``. Prompts are laid out static-instructions-first so that
+prefix stays byte-identical between requests (proposals/prompts.py).
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+
+import httpx
+from django.conf import settings
+from django.utils.module_loading import import_string
+from openai import (
+    AsyncOpenAI,
+    OpenAI,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from . import metrics, rate_limit
+from .circuit_breaker import LLMUnavailableError, get_breaker
+from .rate_limit import LLMRateLimitError
+
+
+DEFAULTS = {
+    'API_KEY': None,
+    'BASE_URL': None,
+    'TIMEOUT': 60.0,
+    'CONNECT_TIMEOUT': 5.0,
+    'MAX_RETRIES': 2,
+    'RETRY_BASE_DELAY': 0.5,
+    'RETRY_MAX_DELAY': 8.0,
+    'MAX_CONNECTIONS': 20,
+    'MAX_KEEPALIVE_CONNECTIONS': 10,
+    'KEEPALIVE_EXPIRY': 30.0,
+    'TRANSPORT': None,
+}
+
+# Errors worth retrying: the request either never reached OpenAI or
+# OpenAI told us to come back later.
+RETRYABLE_ERRORS = (
+    APIConnectionError,
+    APITimeoutError,
+    RateLimitError,
+    InternalServerError,
+)
+
+_client = None
+_transport = None
+_lock = threading.Lock()
+
+# AsyncOpenAI connections belong to the event loop that opened them
+_async_clients = weakref.WeakKeyDictionary()
+
+_usage = {}
+_usage_lock = threading.Lock()
+
+
+def get_config():
+    """Return the gateway configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'LLM_CLIENT', {}))
+    return config
+
+
+def _build_transport(config):
+    """Resolve the transport: explicit override first, then settings"""
+    if _transport is not None:
+        return _transport
+    if config['TRANSPORT']:
+        factory = import_string(config['TRANSPORT'])
+        return factory() if callable(factory) else factory
+    return None
+
+
+def _http_client_options(config):
+    return {
+        'limits': httpx.Limits(
+            max_connections=config['MAX_CONNECTIONS'],
+            max_keepalive_connections=config['MAX_KEEPALIVE_CONNECTIONS'],
+            keepalive_expiry=config['KEEPALIVE_EXPIRY'],
+        ),
+        'timeout': httpx.Timeout(config['TIMEOUT'], connect=config['CONNECT_TIMEOUT']),
+    }
+
+
+def _client_options(config):
+    return {
+        'api_key': config['API_KEY'] or os.getenv('OPENAI_API_KEY'),
+        'base_url': config['BASE_URL'] or os.getenv('OPENAI_BASE_URL') or None,
+        # Retries are handled here so every call site gets the same jittered policy
+        'max_retries': 0,
+    }
+
+
+def _build_client():
+    config = get_config()
+    http_client = httpx.Client(transport=_build_transport(config), **_http_client_options(config))
+    return OpenAI(http_client=http_client, **_client_options(config))
+
+
+def _build_async_client():
+    config = get_config()
+    transport = _build_transport(config)
+    if not isinstance(transport, httpx.AsyncBaseTransport):
+        # Sync-only transports can't serve the async client (httpx.MockTransport does both)
+        transport = None
+    http_client = httpx.AsyncClient(transport=transport, **_http_client_options(config))
+    return AsyncOpenAI(http_client=http_client, **_client_options(config))
+
+
+def get_client():
+    """Return the shared OpenAI client, building it on first use"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def get_async_client():
+    """Return the AsyncOpenAI client for the running event loop, building it on first use"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = _async_clients[loop] = _build_async_client()
+        return client
+
+
+def reset_client():
+    """Close the shared client so the next call rebuilds it from settings"""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        # Async clients can only be closed on their own loop; drop them and let them be collected
+        _async_clients.clear()
+
+
+def set_transport(transport):
+    """
+    Route all gateway traffic through a custom httpx transport
+
+    Args:
+        transport: An ``httpx.BaseTransport`` instance, or None to restore the default
+    """
+    global _transport
+    _transport = transport
+    reset_client()
+
+
+def _retry_delay(attempt, error, config):
+    """Full-jitter exponential backoff, honouring Retry-After when OpenAI sends one"""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        retry_after = response.headers.get('retry-after')
+        try:
+            return min(float(retry_after), config['RETRY_MAX_DELAY'])
+        except (TypeError, ValueError):
+            pass
+    ceiling = min(config['RETRY_MAX_DELAY'], config['RETRY_BASE_DELAY'] * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def record_usage(model, usage, call_site=None):
+    """
+    Add a response's token usage to the per-model totals and the token metrics
+
+    Args:
+        model: The model name
+        usage: The ``usage`` object of a completion (or final stream chunk), may be None
+        call_site: (optional) Label of the calling feature, for the metrics
+    """
+    if usage is None:
+        return
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached_tokens = getattr(details, 'cached_tokens', None) or 0
+    prompt_tokens = usage.prompt_tokens or 0
+    completion_tokens = usage.completion_tokens or 0
+    with _usage_lock:
+        totals = _usage.setdefault(model, {
+            'calls': 0,
+            'prompt_tokens': 0,
+            'cached_tokens': 0,
+            'completion_tokens': 0,
+        })
+        totals['calls'] += 1
+        totals['prompt_tokens'] += prompt_tokens
+        totals['cached_tokens'] += cached_tokens
+        totals['completion_tokens'] += completion_tokens
+
+    call_site = call_site or 'unknown'
+    metrics.LLM_TOKENS.inc(prompt_tokens, call_site=call_site, model=model, type='prompt')
+    metrics.LLM_TOKENS.inc(completion_tokens, call_site=call_site, model=model, type='completion')
+    metrics.LLM_TOKENS.inc(cached_tokens, call_site=call_site, model=model, type='cached')
+
+
+def _record_call(call_site, model, outcome, started, error=None):
+    """Record the latency and outcome of one LLM call"""
+    metrics.LLM_REQUEST_SECONDS.observe(time.monotonic() - started, call_site=call_site, model=model, outcome=outcome)
+    metrics.LLM_REQUESTS.inc(call_site=call_site, model=model, outcome=outcome)
+    if error is not None:
+        metrics.LLM_ERRORS.inc(call_site=call_site, model=model, error=type(error).__name__)
+
+
+def get_usage_stats():
+    """Token usage per model for this process, with the share of prompt tokens served from cache"""
+    with _usage_lock:
+        stats = {model: dict(totals) for model, totals in _usage.items()}
+    for totals in stats.values():
+        prompt_tokens = totals['prompt_tokens']
+        totals['cache_hit_rate'] = round(totals['cached_tokens'] / prompt_tokens, 4) if prompt_tokens else 0.0
+    return stats
+
+
+def reset_usage_stats():
+    with _usage_lock:
+        _usage.clear()
+
+
+def _check_breaker(breaker, call_site, model, started):
+    """Fail fast while the model's circuit is open"""
+    try:
+        breaker.before_call()
+    except LLMUnavailableError as e:
+        _record_call(call_site, model, 'rejected', started, e)
+        raise
+
+
+def _check_rate_limit(call_site, model, messages, kwargs, started):
+    """Wait for the model's shared RPM/TPM capacity"""
+    try:
+        rate_limit.acquire(model, messages, kwargs.get('max_tokens'))
+    except LLMRateLimitError as e:
+        _record_call(call_site, model, 'throttled', started, e)
+        raise
+
+
+def _record_other_error(breaker, error):
+    # OpenAI answered (e.g. 400 for a bad request), so the service itself is up
+    if isinstance(error, APIStatusError):
+        breaker.record_success()
+    else:
+        breaker.record_other()
+
+
+def chat_completion(messages, model, timeout=None, max_retries=None, call_site=None, **kwargs):
+    """
+    Create a chat completion through the shared client
+
+    Args:
+        messages: The chat messages to send
+        model: The model name
+        timeout: (optional) Per-call timeout in seconds, defaults to LLM_CLIENT['TIMEOUT']
+        max_retries: (optional) Override the configured number of retries
+        call_site: (optional) Name of the calling feature, used to label metrics
+        **kwargs: Any other ``chat.completions.create`` arguments (temperature, response_format, ...)
+
+    Returns:
+        The OpenAI ChatCompletion response
+
+    Raises:
+        The last OpenAI error once retries are exhausted
+    """
+    config = get_config()
+    if max_retries is None:
+        max_retries = config['MAX_RETRIES']
+    if timeout is None:
+        timeout = config['TIMEOUT']
+
+    call_site = call_site or 'unknown'
+    breaker = get_breaker(model)
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        _check_breaker(breaker, call_site, model, started)
+        _check_rate_limit(call_site, model, messages, kwargs, started)
+        attempt_started = time.monotonic()
+        try:
+            response = get_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                timeout=timeout,
+                **kwargs
+            )
+        except RETRYABLE_ERRORS as e:
+            breaker.record_failure()
+            if attempt >= max_retries:
+                _record_call(call_site, model, 'error', started, e)
+                raise
+            metrics.LLM_RETRIES.inc(call_site=call_site, model=model, error=type(e).__name__)
+            time.sleep(_retry_delay(attempt, e, config))
+            attempt += 1
+        except Exception as e:
+            _record_other_error(breaker, e)
+            _record_call(call_site, model, 'error', started, e)
+            raise
+        else:
+            breaker.record_success(time.monotonic() - attempt_started, timeout)
+            _record_call(call_site, model, 'success', started)
+            record_usage(model, getattr(response, 'usage', None), call_site)
+            return response
+
+
+async def _acheck_rate_limit(call_site, model, messages, kwargs, started):
+    try:
+        await rate_limit.aacquire(model, messages, kwargs.get('max_tokens'))
+    except LLMRateLimitError as e:
+        _record_call(call_site, model, 'throttled', started, e)
+        raise
+
+
+async def achat_completion(messages, model, timeout=None, max_retries=None, call_site=None, **kwargs):
+    """
+    Async variant of ``chat_completion`` for ASGI views
+
+    Takes the same arguments and applies the same retries, circuit breaker,
+    rate limit and metrics; waits (backoff, rate limit) don't block the event loop.
+
+    Returns:
+        The OpenAI ChatCompletion response
+    """
+    config = get_config()
+    if max_retries is None:
+        max_retries = config['MAX_RETRIES']
+    if timeout is None:
+        timeout = config['TIMEOUT']
+
+    call_site = call_site or 'unknown'
+    breaker = get_breaker(model)
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        _check_breaker(breaker, call_site, model, started)
+        await _acheck_rate_limit(call_site, model, messages, kwargs, started)
+        attempt_started = time.monotonic()
+        try:
+            response = await get_async_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                timeout=timeout,
+                **kwargs
+            )
+        except RETRYABLE_ERRORS as e:
+            breaker.record_failure()
+            if attempt >= max_retries:
+                _record_call(call_site, model, 'error', started, e)
+                raise
+            metrics.LLM_RETRIES.inc(call_site=call_site, model=model, error=type(e).__name__)
+            await asyncio.sleep(_retry_delay(attempt, e, config))
+            attempt += 1
+        except Exception as e:
+            _record_other_error(breaker, e)
+            _record_call(call_site, model, 'error', started, e)
+            raise
+        else:
+            breaker.record_success(time.monotonic() - attempt_started, timeout)
+            _record_call(call_site, model, 'success', started)
+            record_usage(model, getattr(response, 'usage', None), call_site)
+            return response
+
+
+def complete_text(messages, model, **kwargs):
+    """Convenience wrapper returning only the message content of the first choice"""
+    response = chat_completion(messages, model, **kwargs)
+    return response.choices[0].message.content
+
+
+def stream_chat_completion(messages, model, timeout=None, max_retries=None, call_site=None, **kwargs):
+    """
+    Stream a chat completion through the shared client
+
+    Retries only cover opening the stream; once the first token has been
+    yielded a failure is raised to the caller, since the partial output
+    has already been forwarded.
+
+    Yields:
+        str: Content deltas as they arrive
+    """
+    config = get_config()
+    if max_retries is None:
+        max_retries = config['MAX_RETRIES']
+    if timeout is None:
+        timeout = config['TIMEOUT']
+
+    call_site = call_site or 'unknown'
+    breaker = get_breaker(model)
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        _check_breaker(breaker, call_site, model, started)
+        _check_rate_limit(call_site, model, messages, kwargs, started)
+        attempt_started = time.monotonic()
+        try:
+            stream = get_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                timeout=timeout,
+                stream=True,
+                # The final chunk then carries the usage, including cached tokens
+                stream_options={'include_usage': True},
+                **kwargs
+            )
+            breaker.record_success(time.monotonic() - attempt_started, timeout)
+            break
+        except RETRYABLE_ERRORS as e:
+            breaker.record_failure()
+            if attempt >= max_retries:
+                _record_call(call_site, model, 'error', started, e)
+                raise
+            metrics.LLM_RETRIES.inc(call_site=call_site, model=model, error=type(e).__name__)
+            time.sleep(_retry_delay(attempt, e, config))
+            attempt += 1
+        except Exception as e:
+            _record_other_error(breaker, e)
+            _record_call(call_site, model, 'error', started, e)
+            raise
+
+    first_token = True
+    try:
+        with stream:
+            for chunk in stream:
+                if getattr(chunk, 'usage', None) is not None:
+                    record_usage(model, chunk.usage, call_site)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if first_token:
+                        metrics.LLM_FIRST_TOKEN_SECONDS.observe(time.monotonic() - started, call_site=call_site, model=model)
+                        first_token = False
+                    yield chunk.choices[0].delta.content
+    except GeneratorExit:
+        # The client went away before the stream finished
+        _record_call(call_site, model, 'cancelled', started)
+        raise
+    except Exception as e:
+        _record_call(call_site, model, 'error', started, e)
+        raise
+    _record_call(call_site, model, 'success', started)
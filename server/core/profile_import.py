@@ -0,0 +1,300 @@
+import ast
+import json
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from proposals.context import invalidate_context
+from .dashboard_stats import rebuild_stats
+from .response_cache import bump_version
+from .rollups import rebuild_revenue_rollups
+from .models import Projects, FreelancerProfile, Experience
+from .utils import aextract_profile_details, extract_profile_details, summarize_project_description
+
+
+REQUIRED_FIELDS = ['full_name', 'professional_title', 'about', 'skills', 'portfolio_uri']
+EXPERIENCE_REQUIRED = ['company', 'title', 'start_date']
+PROJECT_REQUIRED = ['title', 'description', 'platform', 'status']
+PROJECT_UPDATE_FIELDS = [
+    'title', 'description', 'summary', 'budget', 'platform', 'status', 'start_date', 'end_date', 'updated_at',
+]
+
+DEFAULTS = {
+    # Project summaries generated at once during an import
+    'SUMMARY_CONCURRENCY': 4,
+}
+
+
+def get_config():
+    """Return the profile import configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PROFILE_IMPORT', {}))
+    return config
+
+
+class ProfileImportError(Exception):
+    """Raised when the extracted profile can't be parsed or is incomplete"""
+
+    def __init__(self, message, extra=None):
+        super().__init__(message)
+        self.message = message
+        self.extra = extra or {}
+
+
+def parse_extracted_profile(extracted_data_raw):
+    """
+    Turn the output of extract_profile_details into a dictionary
+
+    Args:
+        extracted_data_raw: dict, or the raw string the model returned
+
+    Returns:
+        dict: The extracted profile data
+    """
+    # Check if extracted_data_raw is already a dictionary
+    if isinstance(extracted_data_raw, dict):
+        extracted_data = extracted_data_raw
+    else:
+        cleaned_data = extracted_data_raw.strip()
+
+        try:
+            extracted_data = json.loads(cleaned_data)
+        except json.JSONDecodeError as e:
+            print(f"JSON Decode Error: {e}")
+
+            # Try to evaluate the string as a Python literal
+            try:
+                extracted_data = ast.literal_eval(cleaned_data)
+            except (SyntaxError, ValueError) as e:
+                print(f"AST Parse Error: {e}")
+                raise ProfileImportError(f'Invalid data format: {str(e)}', {'raw_data': extracted_data_raw})
+
+    # Validate required fields
+    missing_fields = [field for field in REQUIRED_FIELDS if field not in extracted_data]
+    if missing_fields:
+        print(missing_fields)
+        raise ProfileImportError(f'Missing required fields: {missing_fields}', {'data': extracted_data})
+
+    return extracted_data
+
+
+def _key_text(value):
+    return ' '.join(str(value or '').split()).casefold()
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_date(value):
+    """Parse an extracted YYYY-MM-DD date; None when missing or invalid"""
+    try:
+        return parse_date(str(value or ''))
+    except ValueError:
+        return None
+
+
+def _experience_rows(extracted_data):
+    """Valid experience entries keyed by (company, title, start_date); later duplicates win"""
+    rows = {}
+    for experience in extracted_data.get('experience') or []:
+        # Validate required experience fields
+        if not all(experience.get(field) for field in EXPERIENCE_REQUIRED):
+            continue
+        start_date = _to_date(experience['start_date'])
+        if start_date is None:
+            continue
+        end_date = _to_date(experience.get('end_date'))
+        key = (_key_text(experience['company']), _key_text(experience['title']), start_date)
+        rows[key] = {
+            'company': experience['company'],
+            'title': experience['title'],
+            'start_date': start_date,
+            'end_date': end_date,
+        }
+    return rows
+
+
+def _project_rows(extracted_data):
+    """Valid project entries keyed by (title, platform); later duplicates win"""
+    rows = {}
+    for project in extracted_data.get('projects') or []:
+        # Validate required project fields
+        if not all(project.get(field) for field in PROJECT_REQUIRED):
+            continue
+        key = (_key_text(project['title']), _key_text(project['platform']))
+        rows[key] = {
+            'title': project['title'],
+            'description': project['description'],
+            'budget': _to_int(project.get('budget', 0)),  # Default to 0 if not provided
+            'platform': project['platform'],
+            'status': project['status'],
+            'start_date': _to_date(project.get('start_date')),
+            'end_date': _to_date(project.get('end_date')),
+        }
+    return rows
+
+
+def _summarize_all(descriptions):
+    """Summaries for several project descriptions, generated concurrently"""
+    def summarize(description):
+        try:
+            return summarize_project_description(description)
+        finally:
+            # Worker threads open their own DB connection for the LLM cache
+            connection.close()
+
+    concurrency = max(get_config()['SUMMARY_CONCURRENCY'], 1)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(summarize, descriptions))
+
+
+def _upsert_experiences(user, rows):
+    existing = {
+        (_key_text(experience.company), _key_text(experience.title), experience.start_date): experience
+        for experience in Experience.objects.filter(user=user)
+    }
+    to_create, to_update = [], []
+    for key, row in rows.items():
+        experience = existing.get(key)
+        if experience is None:
+            to_create.append(Experience(user=user, **row))
+            continue
+        if experience.end_date != row['end_date']:
+            experience.end_date = row['end_date']
+            to_update.append(experience)
+    Experience.objects.bulk_create(to_create)
+    # bulk_update doesn't touch auto_now fields on its own
+    now = timezone.now()
+    for experience in to_update:
+        experience.updated_at = now
+    Experience.objects.bulk_update(to_update, ['end_date', 'updated_at'])
+
+
+def _upsert_projects(user, rows, existing, summaries):
+    to_create, to_update = [], []
+    today = timezone.localdate()
+    for key, row in rows.items():
+        project = existing.get(key)
+        if project is None:
+            row['start_date'] = row['start_date'] or today
+            row['end_date'] = row['end_date'] or row['start_date']
+            to_create.append(Projects(user=user, summary=summaries.get(key, ''), **row))
+            continue
+        # Keep dates the user entered when the import has none
+        row['start_date'] = row['start_date'] or project.start_date
+        row['end_date'] = row['end_date'] or project.end_date
+        if key in summaries:
+            row['summary'] = summaries[key]
+        if any(getattr(project, field) != value for field, value in row.items()):
+            for field, value in row.items():
+                setattr(project, field, value)
+            to_update.append(project)
+    Projects.objects.bulk_create(to_create)
+    now = timezone.now()
+    for project in to_update:
+        project.updated_at = now
+    Projects.objects.bulk_update(to_update, PROJECT_UPDATE_FIELDS)
+
+
+def save_extracted_profile(user, extracted_data):
+    """
+    Create or update the freelancer profile, experience and projects from extracted data
+
+    Idempotent: experience is matched on (company, title, start_date) and
+    projects on (title, platform), so importing the same resume again
+    updates those rows instead of duplicating them. Rows are written with
+    bulk_create/bulk_update, and summaries for new or changed project
+    descriptions are generated concurrently before the transaction opens.
+
+    Args:
+        user: The user who owns the profile
+        extracted_data: Output of parse_extracted_profile
+
+    Returns:
+        FreelancerProfile: The saved profile
+    """
+    experience_rows = _experience_rows(extracted_data)
+    project_rows = _project_rows(extracted_data)
+
+    # Only new or changed descriptions need a summary (the LLM calls stay outside the transaction)
+    existing_projects = {
+        (_key_text(project.title), _key_text(project.platform)): project
+        for project in Projects.objects.filter(user=user)
+    }
+    to_summarize = [
+        key for key, row in project_rows.items()
+        if key not in existing_projects
+        or existing_projects[key].description != row['description']
+        or not existing_projects[key].summary
+    ]
+    summaries = dict(zip(
+        to_summarize,
+        _summarize_all([project_rows[key]['description'] for key in to_summarize])
+    ))
+
+    with transaction.atomic():
+        # Create or update freelancer profile
+        defaults = {
+            'full_name': extracted_data['full_name'],
+            'tagline': extracted_data['professional_title'],
+            'about': extracted_data['about'],
+            'skills': extracted_data['skills'],
+            'portfolio': extracted_data['portfolio_uri'],
+        }
+
+        # Handle optional fields
+        if 'social_links' in extracted_data:
+            defaults['social_links'] = extracted_data['social_links']
+
+        freelancer_profile_obj, _ = FreelancerProfile.objects.update_or_create(
+            user=user,
+            defaults=defaults
+        )
+
+        _upsert_experiences(user, experience_rows)
+        _upsert_projects(user, project_rows, existing_projects, summaries)
+
+        # Bulk writes send no post_save signals, so the prompt context and cached
+        # dashboard responses must be invalidated and the stats and revenue rollups recomputed here
+        rebuild_stats(user.id)
+        rebuild_revenue_rollups(user.id)
+        bump_version(user.id)
+        transaction.on_commit(lambda: invalidate_context(user.id))
+
+    return freelancer_profile_obj
+
+
+def import_freelancer_profile(user, text):
+    """
+    Extract a profile from free text with the LLM and save it
+
+    Args:
+        user: The user who owns the profile
+        text: Resume / profile text submitted by the user
+
+    Returns:
+        dict: The extracted profile data
+
+    Raises:
+        ProfileImportError: If the extracted data is unusable
+    """
+    extracted_data = parse_extracted_profile(extract_profile_details(text))
+    save_extracted_profile(user, extracted_data)
+    return extracted_data
+
+
+async def aimport_freelancer_profile(user, text):
+    """
+    Async variant of import_freelancer_profile
+
+    The async ORM has no transactions, so the save runs in a worker thread.
+    """
+    extracted_data = parse_extracted_profile(await aextract_profile_details(text))
+    await sync_to_async(save_extracted_profile)(user, extracted_data)
+    return extracted_data
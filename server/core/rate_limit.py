@@ -0,0 +1,231 @@
+"""
+Global rate limiter for OpenAI calls (requests and tokens per minute).
+
+OpenAI enforces RPM and TPM limits per model across the whole account;
+exceeding them costs a 429 round-trip, retries and, once enough of those
+pile up, an open circuit breaker. Every gunicorn worker and
+``run_llm_worker`` process therefore draws from the same two token buckets
+per model, stored as ``RateLimitBucket`` rows:
+
+    rpm:<model>  one token per request
+    tpm:<model>  the estimated tokens of the request (prompt length / 4
+                 plus the max_tokens reserved for the answer, as OpenAI counts it)
+
+Buckets refill continuously at limit / 60 per second up to one minute's
+worth. Updates are compare-and-swap on the row's version, so concurrent
+processes never both spend the same capacity. A call waits up to MAX_WAIT
+seconds for capacity and otherwise fails with ``LLMRateLimitError``, which
+views turn into a 429 with a Retry-After header (``throttled_response``).
+
+Configuration lives in ``settings.LLM_RATE_LIMIT``; models without limits
+are not throttled.
+"""
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import metrics
+from .models import RateLimitBucket
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Per model: {'RPM': requests per minute, 'TPM': tokens per minute}
+    'LIMITS': {},
+    # How long a call waits for capacity before failing with a 429
+    'MAX_WAIT': 5,
+    # Output tokens reserved when a call doesn't set max_tokens
+    'DEFAULT_COMPLETION_TOKENS': 1000,
+}
+
+CHARS_PER_TOKEN = 4
+# Concurrent updates of the same bucket retry the compare-and-swap this many times per check
+CAS_ATTEMPTS = 5
+
+RATE_LIMIT_WAITS = metrics.Counter(
+    'llm_rate_limit_waits_total',
+    'LLM calls delayed by the global rate limiter, by whether they got capacity in time',
+    ['model', 'outcome'],
+)
+
+
+class LLMRateLimitError(Exception):
+    """Raised when the shared RPM/TPM budget for a model stays exhausted for MAX_WAIT seconds"""
+
+    def __init__(self, model, retry_after):
+        self.model = model
+        self.retry_after = max(int(retry_after + 0.999), 1)
+        super().__init__(
+            f'Too many AI requests right now ({model}); please try again in {self.retry_after}s'
+        )
+
+
+def get_config():
+    """Return the rate limiter configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'LLM_RATE_LIMIT', {}))
+    return config
+
+
+def estimate_tokens(messages, max_tokens=None, config=None):
+    """
+    Estimate the TPM cost of a request from its prompt length
+
+    Args:
+        messages: The chat messages to send
+        max_tokens: (optional) The completion limit of the call
+
+    Returns:
+        int: Estimated prompt tokens plus the reserved completion tokens
+    """
+    config = config or get_config()
+    chars = sum(len(message.get('content') or '') for message in messages)
+    completion = max_tokens if max_tokens is not None else config['DEFAULT_COMPLETION_TOKENS']
+    return chars // CHARS_PER_TOKEN + 1 + completion
+
+
+def _buckets(model, tokens, limits):
+    """(name, capacity, cost) for each limit configured for the model"""
+    buckets = []
+    if limits.get('RPM'):
+        buckets.append((f'rpm:{model}', float(limits['RPM']), 1.0))
+    if limits.get('TPM'):
+        # A single request larger than the whole budget would otherwise wait forever
+        buckets.append((f'tpm:{model}', float(limits['TPM']), float(min(tokens, limits['TPM']))))
+    return buckets
+
+
+def _load(buckets, now):
+    rows = {row.name: row for row in RateLimitBucket.objects.filter(name__in=[name for name, _, _ in buckets])}
+    for name, capacity, _ in buckets:
+        if name not in rows:
+            try:
+                rows[name], _ = RateLimitBucket.objects.get_or_create(
+                    name=name, defaults={'tokens': capacity, 'updated_at': now}
+                )
+            except IntegrityError:
+                rows[name] = RateLimitBucket.objects.get(name=name)
+    return rows
+
+
+class _Conflict(Exception):
+    pass
+
+
+def _try_take(buckets):
+    """
+    Take the cost from every bucket at once, or from none
+
+    Returns:
+        float: 0 if the capacity was taken, else seconds until it should be available
+    """
+    for _ in range(CAS_ATTEMPTS):
+        now = time.time()
+        rows = _load(buckets, now)
+        wait = 0.0
+        levels = {}
+        for name, capacity, cost in buckets:
+            row = rows[name]
+            rate = capacity / 60
+            level = min(capacity, row.tokens + max(now - row.updated_at, 0) * rate)
+            levels[name] = level - cost
+            if level < cost:
+                wait = max(wait, (cost - level) / rate)
+        if wait:
+            return wait
+
+        try:
+            with transaction.atomic():
+                for name, _, _ in buckets:
+                    row = rows[name]
+                    updated = RateLimitBucket.objects.filter(name=name, version=row.version).update(
+                        tokens=levels[name], updated_at=now, version=row.version + 1
+                    )
+                    if not updated:
+                        raise _Conflict()
+            return 0.0
+        except _Conflict:
+            continue
+    # Heavy contention: back off briefly rather than spin on the database
+    return 0.05
+
+
+def acquire(model, messages, max_tokens=None):
+    """
+    Wait for RPM and TPM capacity for one call to a model
+
+    Args:
+        model: The model the call goes to
+        messages: The chat messages (their length is the TPM estimate)
+        max_tokens: (optional) The completion limit of the call
+
+    Raises:
+        LLMRateLimitError: If no capacity frees up within MAX_WAIT seconds
+    """
+    config = get_config()
+    limits = config['LIMITS'].get(model)
+    if not config['ENABLED'] or not limits:
+        return
+
+    buckets = _buckets(model, estimate_tokens(messages, max_tokens, config), limits)
+    deadline = time.monotonic() + config['MAX_WAIT']
+    waited = False
+    while True:
+        try:
+            wait = _try_take(buckets)
+        except DatabaseError as e:
+            # The limiter must not take the LLM features down with it
+            print(f"Error checking rate limit: {str(e)}")
+            return
+        if not wait:
+            if waited:
+                RATE_LIMIT_WAITS.inc(model=model, outcome='admitted')
+            return
+        remaining = deadline - time.monotonic()
+        if wait > remaining:
+            RATE_LIMIT_WAITS.inc(model=model, outcome='rejected')
+            raise LLMRateLimitError(model, wait)
+        waited = True
+        time.sleep(wait)
+
+
+async def aacquire(model, messages, max_tokens=None):
+    """Async variant of ``acquire``: waits with asyncio.sleep instead of blocking the event loop"""
+    config = get_config()
+    limits = config['LIMITS'].get(model)
+    if not config['ENABLED'] or not limits:
+        return
+
+    buckets = _buckets(model, estimate_tokens(messages, max_tokens, config), limits)
+    deadline = time.monotonic() + config['MAX_WAIT']
+    waited = False
+    while True:
+        try:
+            wait = await sync_to_async(_try_take)(buckets)
+        except DatabaseError as e:
+            print(f"Error checking rate limit: {str(e)}")
+            return
+        if not wait:
+            if waited:
+                RATE_LIMIT_WAITS.inc(model=model, outcome='admitted')
+            return
+        remaining = deadline - time.monotonic()
+        if wait > remaining:
+            RATE_LIMIT_WAITS.inc(model=model, outcome='rejected')
+            raise LLMRateLimitError(model, wait)
+        waited = True
+        await asyncio.sleep(wait)
+
+
+def throttled_response(error):
+    """The 429 response for an LLMRateLimitError raised while handling a request"""
+    return Response(
+        {'status': 'error', 'message': str(error), 'retry_after': error.retry_after},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(error.retry_after)},
+    )
@@ -0,0 +1,138 @@
+"""
+Per-user versioned response cache with ETags for the dashboard endpoints.
+
+The dashboard endpoints are polled on every navigation and return the same
+body until the user writes something. Each user has a cache version (a
+random token in Django's cache) that signals on Proposal, Projects,
+FreelancerProfile and User replace once the write commits
+(core/signals.py). Responses are cached under (endpoint, user, version,
+day, query string) together with a strong ETag, the SHA-256 of the body:
+
+    If-None-Match matches   304, no database work at all (the JWT is
+                            verified without loading the user)
+    cached, no match        200 from the cache
+    not cached              the view runs; its body is cached
+
+The user row is only loaded, with simplejwt's usual active/existence
+checks, when the view actually runs. Deactivating a user is a User write,
+which bumps the version, so cached responses stop being served at once.
+Relative dates in the bodies ("2 days ago") can still age, so entries
+also expire after RESPONSE_CACHE['TTL'] seconds.
+
+Note: like proposals/context.py, with the default LocMemCache each process
+holds its own versions and entries. Point CACHES at a shared backend
+(Redis, Memcached) so a write invalidates every process at once.
+"""
+import hashlib
+import json
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import metrics
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TTL': 300,
+}
+
+RESPONSE_CACHE_REQUESTS = metrics.Counter(
+    'response_cache_requests_total',
+    'Cached endpoint requests by result (not_modified, hit, miss)',
+    ['endpoint', 'result'],
+)
+
+
+def get_config():
+    """Return the response cache configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'RESPONSE_CACHE', {}))
+    return config
+
+
+def _version_key(user_id):
+    return f'response_version:{user_id}'
+
+
+def get_version(user_id):
+    """The user's current cache version (created on first use)"""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user_id):
+    """Invalidate every cached response of the user, once the current transaction commits"""
+    # Bumping before the commit would let a concurrent read cache the old data under the new version
+    transaction.on_commit(lambda: cache.set(_version_key(user_id), uuid.uuid4().hex, None))
+
+
+def _etag(data):
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    return '"' + hashlib.sha256(body.encode()).hexdigest() + '"'
+
+
+def _with_headers(response, etag):
+    response['ETag'] = etag
+    # Always revalidate: the body changes as soon as the user writes something
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def versioned_response(endpoint):
+    """
+    Cache a per-user GET endpoint under the user's cache version (per query string)
+
+    Use with ``@authentication_classes([JWTStatelessUserAuthentication])``
+    so that revalidation doesn't load the user; the wrapped view gets the
+    real user in ``request.user``.
+
+    Args:
+        endpoint: Name of the endpoint, part of the cache key
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            config = get_config()
+            user_id = request.user.id
+            key = None
+            if config['ENABLED']:
+                query = hashlib.sha256(request.GET.urlencode().encode()).hexdigest()[:16]
+                key = f'response:{endpoint}:{user_id}:{get_version(user_id)}:{timezone.localdate().isoformat()}:{query}'
+                cached = cache.get(key)
+                if cached is not None:
+                    etag, data = cached
+                    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                        RESPONSE_CACHE_REQUESTS.inc(endpoint=endpoint, result='not_modified')
+                        return _with_headers(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+                    RESPONSE_CACHE_REQUESTS.inc(endpoint=endpoint, result='hit')
+                    return _with_headers(Response(data, status=status.HTTP_200_OK), etag)
+                RESPONSE_CACHE_REQUESTS.inc(endpoint=endpoint, result='miss')
+
+            # Raises AuthenticationFailed (401) for a deleted or deactivated user
+            request.user = JWTAuthentication().get_user(request.auth)
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            etag = _etag(response.data)
+            if key:
+                cache.set(key, (etag, response.data), config['TTL'])
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return _with_headers(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+            return _with_headers(response, etag)
+
+        return wrapper
+    return decorator
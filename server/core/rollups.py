@@ -0,0 +1,235 @@
+"""
+Daily rollups of proposals and revenue for time-series charts.
+
+    DailyProposalRollup  proposals created per (user, day, status, style)
+    DailyRevenueRollup   revenue and count of completed projects per
+                         (user, day), by project end date
+
+Signals on Proposal and Projects (core/signals.py) move counts between
+rows as proposals are created, change status or style, or are deleted, and
+as projects are completed or edited, in the write's own transaction.
+``manage.py rebuild_rollups`` recomputes them from the raw tables (initial
+backfill, or after writes that bypass signals such as queryset.update()).
+
+``get_timeseries`` answers any date range from the rollups alone: at most
+one row per day and status/style combination, however many proposals there are.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from proposals.models import Proposal
+from .models import DailyProposalRollup, DailyRevenueRollup, Projects
+
+
+INTERVALS = ('day', 'week', 'month')
+# Longest range one request may ask for
+MAX_DAYS = 366 * 3
+
+
+def _as_date(value):
+    return parse_date(value) if isinstance(value, str) else value
+
+
+def _add(model, keys, deltas):
+    """Add deltas to the row with these keys, creating it if needed"""
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**keys).update(**increments):
+        return
+    if not any(delta > 0 for delta in deltas.values()):
+        # Removing from a row that doesn't exist: the user is being deleted, or a rebuild is due
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**keys, **deltas)
+    except IntegrityError:
+        # Created concurrently
+        model.objects.filter(**keys).update(**increments)
+
+
+def _proposal_key(values):
+    return {
+        'user_id': values['user_id'],
+        'day': timezone.localdate(values['created_at']),
+        'status': values['status'],
+        'style': values['style'],
+    }
+
+
+def _revenue(values):
+    """(keys, revenue) a project contributes, or None unless it is completed"""
+    if values['status'] != 'completed' or not values['end_date']:
+        return None
+    keys = {'user_id': values['user_id'], 'day': _as_date(values['end_date'])}
+    return keys, int(values['budget'] or 0)
+
+
+def apply_proposal_change(previous, current):
+    """
+    Move a proposal between rollup rows
+
+    Args:
+        previous: user_id, status, style and created_at before the write (None if it was created)
+        current: The same after the write (None if it was deleted)
+    """
+    before = previous and _proposal_key(previous)
+    after = current and _proposal_key(current)
+    if before == after:
+        return
+    if before:
+        _add(DailyProposalRollup, before, {'count': -1})
+        DailyProposalRollup.objects.filter(**before, count__lte=0).delete()
+    if after:
+        _add(DailyProposalRollup, after, {'count': 1})
+
+
+def apply_project_change(previous, current):
+    """
+    Move a project's revenue between rollup rows
+
+    Args:
+        previous: user_id, status, budget and end_date before the write (None if it was created)
+        current: The same after the write (None if it was deleted)
+    """
+    before = previous and _revenue(previous)
+    after = current and _revenue(current)
+    if before == after:
+        return
+    if before:
+        keys, revenue = before
+        _add(DailyRevenueRollup, keys, {'revenue': -revenue, 'completed_projects': -1})
+        DailyRevenueRollup.objects.filter(**keys, completed_projects__lte=0).delete()
+    if after:
+        keys, revenue = after
+        _add(DailyRevenueRollup, keys, {'revenue': revenue, 'completed_projects': 1})
+
+
+@transaction.atomic
+def rebuild_proposal_rollups(user_id=None):
+    """
+    Recompute the proposal rollups from the proposals table
+
+    Args:
+        user_id: (optional) Only this user's rows; all users by default
+
+    Returns:
+        int: Rollup rows written
+    """
+    proposals = Proposal.objects.all()
+    rollups = DailyProposalRollup.objects.all()
+    if user_id is not None:
+        proposals = proposals.filter(user_id=user_id)
+        rollups = rollups.filter(user_id=user_id)
+    rollups.delete()
+    groups = (
+        proposals.annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+        .values('user_id', 'day', 'status', 'style')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    rows = DailyProposalRollup.objects.bulk_create(
+        (DailyProposalRollup(**group) for group in groups.iterator()), batch_size=1000
+    )
+    return len(rows)
+
+
+@transaction.atomic
+def rebuild_revenue_rollups(user_id=None):
+    """
+    Recompute the revenue rollups from the completed projects
+
+    Args:
+        user_id: (optional) Only this user's rows; all users by default
+
+    Returns:
+        int: Rollup rows written
+    """
+    projects = Projects.objects.filter(status='completed')
+    rollups = DailyRevenueRollup.objects.all()
+    if user_id is not None:
+        projects = projects.filter(user_id=user_id)
+        rollups = rollups.filter(user_id=user_id)
+    rollups.delete()
+    groups = (
+        projects.values('user_id', 'end_date')
+        .annotate(revenue=Sum('budget'), completed_projects=Count('pk'))
+        .order_by()
+    )
+    rows = DailyRevenueRollup.objects.bulk_create(
+        (
+            DailyRevenueRollup(user_id=group['user_id'], day=group['end_date'], revenue=group['revenue'] or 0,
+                               completed_projects=group['completed_projects'])
+            for group in groups.iterator()
+        ),
+        batch_size=1000,
+    )
+    return len(rows)
+
+
+def _bucket(day, interval):
+    """First day of the interval containing day"""
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _empty_point(start):
+    return {'date': start.isoformat(), 'proposals': 0, 'by_status': {}, 'by_style': {},
+            'revenue': 0, 'completed_projects': 0}
+
+
+def get_timeseries(user, start, end, interval='day', statuses=None, styles=None):
+    """
+    Proposal and revenue time series from the rollups
+
+    Args:
+        user: The user
+        start: First day (inclusive)
+        end: Last day (inclusive)
+        interval: 'day', 'week' (starting Monday) or 'month'
+        statuses: (optional) Only count proposals with these statuses
+        styles: (optional) Only count proposals with these styles
+
+    Returns:
+        dict: series (one point per interval, empty ones included) and totals
+    """
+    proposal_rows = DailyProposalRollup.objects.filter(user=user, day__gte=start, day__lte=end)
+    if statuses:
+        proposal_rows = proposal_rows.filter(status__in=statuses)
+    if styles:
+        proposal_rows = proposal_rows.filter(style__in=styles)
+    revenue_rows = DailyRevenueRollup.objects.filter(user=user, day__gte=start, day__lte=end)
+
+    points = {}
+    bucket = _bucket(start, interval)
+    while bucket <= end:
+        points[bucket] = _empty_point(bucket)
+        bucket = _bucket(bucket + timedelta(days=32 if interval == 'month' else 7 if interval == 'week' else 1), interval)
+
+    for row in proposal_rows.values_list('day', 'status', 'style', 'count'):
+        day, status, style, count = row
+        point = points[_bucket(day, interval)]
+        point['proposals'] += count
+        point['by_status'][status] = point['by_status'].get(status, 0) + count
+        point['by_style'][style] = point['by_style'].get(style, 0) + count
+    for day, revenue, completed in revenue_rows.values_list('day', 'revenue', 'completed_projects'):
+        point = points[_bucket(day, interval)]
+        point['revenue'] += revenue
+        point['completed_projects'] += completed
+
+    series = list(points.values())
+    totals = _empty_point(start)
+    del totals['date']
+    for point in series:
+        for key in ('proposals', 'revenue', 'completed_projects'):
+            totals[key] += point[key]
+        for key in ('by_status', 'by_style'):
+            for name, count in point[key].items():
+                totals[key][name] = totals[key].get(name, 0) + count
+    return {'series': series, 'totals': totals}
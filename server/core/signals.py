@@ -0,0 +1,89 @@
+from django.contrib.auth.models import User
+from django.db import DatabaseError, transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from proposals.models import Proposal
+from .dashboard_stats import apply_changes, project_contribution, proposal_contribution
+from .models import FreelancerProfile, Projects
+from .response_cache import bump_version
+from .rollups import apply_project_change, apply_proposal_change
+
+
+# Fields the dashboard stats and rollups are derived from
+TRACKED_FIELDS = {
+    Proposal: ['user_id', 'status', 'style', 'created_at'],
+    Projects: ['user_id', 'status', 'budget', 'end_date'],
+}
+
+
+def _values(instance):
+    return {field: getattr(instance, field) for field in TRACKED_FIELDS[type(instance)]}
+
+
+def _contribution(sender, values):
+    if sender is Proposal:
+        return proposal_contribution(values['user_id'], values['status'], values['created_at'])
+    return project_contribution(values['user_id'], values['status'], values['budget'], values['end_date'])
+
+
+def _apply_rollups(sender, previous, current):
+    try:
+        # A savepoint, so a failure here never breaks the caller's transaction
+        with transaction.atomic():
+            if sender is Proposal:
+                apply_proposal_change(previous, current)
+            else:
+                apply_project_change(previous, current)
+    except DatabaseError as e:
+        # The rollups drift until the next `manage.py rebuild_rollups`
+        print(f"Error updating daily rollups: {str(e)}")
+
+
+@receiver(pre_save, sender=Proposal)
+@receiver(pre_save, sender=Projects)
+def remember_tracked_values(sender, instance, update_fields=None, **kwargs):
+    """Load the stored values of the tracked fields, to diff them after the save"""
+    fields = TRACKED_FIELDS[sender]
+    names = {field.removesuffix('_id') for field in fields}
+    instance._tracked_skip = update_fields is not None and not names & set(update_fields)
+    instance._tracked_previous = None
+    if not instance._tracked_skip and not instance._state.adding and instance.pk is not None:
+        instance._tracked_previous = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(post_save, sender=Proposal)
+@receiver(post_save, sender=Projects)
+def apply_tracked_changes(sender, instance, created, **kwargs):
+    """Apply the difference the write made to the owner's dashboard stats and daily rollups"""
+    if getattr(instance, '_tracked_skip', False):
+        return
+    previous = None if created else getattr(instance, '_tracked_previous', None)
+    current = _values(instance)
+    changes = [(1, _contribution(sender, current))]
+    if previous:
+        changes.append((-1, _contribution(sender, previous)))
+    apply_changes(changes)
+    _apply_rollups(sender, previous, current)
+
+
+@receiver(post_delete, sender=Proposal)
+@receiver(post_delete, sender=Projects)
+def remove_tracked_values(sender, instance, **kwargs):
+    values = _values(instance)
+    # Never recreate the stats row here: the user may be being deleted
+    apply_changes([(-1, _contribution(sender, values))], create_missing=False)
+    _apply_rollups(sender, values, None)
+
+
+@receiver([post_save, post_delete], sender=Proposal)
+@receiver([post_save, post_delete], sender=Projects)
+@receiver([post_save, post_delete], sender=FreelancerProfile)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    """Anything shown on the dashboard changed: cached dashboard responses are stale"""
+    bump_version(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_responses(sender, instance, **kwargs):
+    """Cached responses skip the user lookup, so a deactivated user must not match them any more"""
+    bump_version(instance.pk)
@@ -0,0 +1,263 @@
+"""
+Single-flight coalescing of identical in-flight LLM requests.
+
+When several requests need the same cached analysis at once (the pipeline
+and a batch both analyzing a job someone just pasted, or a double-clicked
+button), only the first one calls OpenAI; the rest wait for its answer.
+
+Two layers:
+    1. Threads in one process share an in-memory call record and block on it.
+    2. Processes (gunicorn workers, ``run_llm_worker``) take an ``LLMInFlight``
+       row as a lock. A process that finds the row taken polls for the result
+       (via the caller's ``poll`` function, i.e. the response cache) until the
+       owner finishes, the lock expires or WAIT_TIMEOUT passes, and then
+       computes the result itself.
+
+``ado`` does the same for coroutines: tasks on one event loop share an
+asyncio future, and the cross-process lock is taken and polled without
+blocking the loop.
+
+Configuration lives in ``settings.LLM_SINGLE_FLIGHT``.
+"""
+import asyncio
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils import timezone
+
+from . import metrics
+from .models import LLMInFlight
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CROSS_PROCESS': True,
+    # A lock older than this is considered abandoned (its owner died)
+    'LOCK_TTL': 120,
+    # How long a waiting process polls before computing the result itself
+    'WAIT_TIMEOUT': 90,
+    'POLL_INTERVAL': 0.25,
+}
+
+COALESCED = metrics.Counter(
+    'llm_coalesced_total',
+    'Requests answered by another in-flight identical request (scope: thread or process)',
+    ['scope'],
+)
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_calls = {}
+_calls_lock = threading.Lock()
+
+# (event loop, key) -> asyncio future of the leading coroutine
+_async_calls = {}
+
+
+def get_config():
+    """Return the single-flight configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'LLM_SINGLE_FLIGHT', {}))
+    return config
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _acquire(key, config):
+    """Try to take the cross-process lock; returns True if we own it"""
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            # Clear an abandoned lock so the key doesn't stay blocked
+            LLMInFlight.objects.filter(key=key, expires_at__lte=now).delete()
+            LLMInFlight.objects.create(
+                key=key,
+                owner=_owner(),
+                expires_at=now + timedelta(seconds=config['LOCK_TTL']),
+            )
+        return True
+    except IntegrityError:
+        return False
+
+
+def _release(key):
+    try:
+        LLMInFlight.objects.filter(key=key, owner=_owner()).delete()
+    except DatabaseError as e:
+        print(f"Error releasing in-flight lock: {str(e)}")
+
+
+def _wait_for_owner(key, poll, config):
+    """Poll for another process's result; returns None if it never shows up"""
+    deadline = time.monotonic() + config['WAIT_TIMEOUT']
+    while time.monotonic() < deadline:
+        time.sleep(config['POLL_INTERVAL'])
+        result = poll()
+        if result is not None:
+            return result
+        if not LLMInFlight.objects.filter(key=key, expires_at__gt=timezone.now()).exists():
+            # The owner finished without a result (or died); check once more and give up waiting
+            return poll()
+    return None
+
+
+def _run_across_processes(key, func, poll, config):
+    if not config['CROSS_PROCESS'] or poll is None:
+        return func()
+
+    try:
+        acquired = _acquire(key, config)
+    except DatabaseError as e:
+        print(f"Error taking in-flight lock: {str(e)}")
+        return func()
+
+    if acquired:
+        try:
+            # Another process may have finished just before we took the lock
+            result = poll()
+            return result if result is not None else func()
+        finally:
+            _release(key)
+
+    result = _wait_for_owner(key, poll, config)
+    if result is not None:
+        COALESCED.inc(scope='process')
+        return result
+    return func()
+
+
+def do(key, func, poll=None):
+    """
+    Run func once per key at a time and share its result with concurrent callers
+
+    Args:
+        key: Identity of the request (e.g. the LLM cache key)
+        func: Callable computing the result
+        poll: (optional) Callable returning the stored result or None; enables
+              coalescing across processes, since that is how waiters get the result
+
+    Returns:
+        The result of func (possibly computed by another caller)
+    """
+    config = get_config()
+    if not config['ENABLED']:
+        return func()
+
+    with _calls_lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+
+    if not leader:
+        call.event.wait()
+        COALESCED.inc(scope='thread')
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = _run_across_processes(key, func, poll, config)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _calls_lock:
+            _calls.pop(key, None)
+        call.event.set()
+
+
+async def _await_owner(key, poll, config):
+    """Async counterpart of _wait_for_owner"""
+    deadline = time.monotonic() + config['WAIT_TIMEOUT']
+    lock_held = sync_to_async(
+        lambda: LLMInFlight.objects.filter(key=key, expires_at__gt=timezone.now()).exists()
+    )
+    while time.monotonic() < deadline:
+        await asyncio.sleep(config['POLL_INTERVAL'])
+        result = await poll()
+        if result is not None:
+            return result
+        if not await lock_held():
+            return await poll()
+    return None
+
+
+async def _arun_across_processes(key, func, poll, config):
+    if not config['CROSS_PROCESS'] or poll is None:
+        return await func()
+
+    poll = sync_to_async(poll)
+    try:
+        acquired = await sync_to_async(_acquire)(key, config)
+    except DatabaseError as e:
+        print(f"Error taking in-flight lock: {str(e)}")
+        return await func()
+
+    if acquired:
+        try:
+            result = await poll()
+            return result if result is not None else await func()
+        finally:
+            await sync_to_async(_release)(key)
+
+    result = await _await_owner(key, poll, config)
+    if result is not None:
+        COALESCED.inc(scope='process')
+        return result
+    return await func()
+
+
+async def ado(key, func, poll=None):
+    """
+    Async variant of ``do``
+
+    Args:
+        key: Identity of the request
+        func: Coroutine function computing the result
+        poll: (optional) Sync callable returning the stored result or None
+
+    Returns:
+        The result of func (possibly computed by another caller)
+    """
+    config = get_config()
+    if not config['ENABLED']:
+        return await func()
+
+    loop = asyncio.get_running_loop()
+    future = _async_calls.get((loop, key))
+    if future is not None:
+        COALESCED.inc(scope='thread')
+        # shield: a cancelled follower must not cancel the leader's call
+        return await asyncio.shield(future)
+
+    future = _async_calls[(loop, key)] = loop.create_future()
+    try:
+        result = await _arun_across_processes(key, func, poll, config)
+        future.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception retrieved when nobody else was waiting
+        future.exception()
+        raise
+    finally:
+        _async_calls.pop((loop, key), None)
@@ -0,0 +1,185 @@
+"""
+Database-backed queue for LLM work.
+
+Views call ``submit`` and return straight away; ``run_llm_worker``
+processes claim queued ``LLMTask`` rows, run the registered handler and
+store its result. Workers scale independently of the web processes.
+
+Claiming uses a conditional UPDATE (status='queued' -> 'running'), so it
+works on SQLite and Postgres alike and a task is only ever picked up by
+one worker. A failed attempt is requeued with a ``run_after`` delay: the
+error's ``retry_after`` (open circuit, exhausted rate limit) or else an
+exponential backoff, so retries don't burn out while OpenAI recovers.
+"""
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import LLMTask
+
+
+DEFAULTS = {
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 2,
+    # A running task whose worker hasn't finished it in this many seconds is requeued
+    'VISIBILITY_TIMEOUT': 600,
+    # Backoff before retrying a failed attempt: RETRY_BASE_DELAY * 2 ** (attempt - 1), capped
+    'RETRY_BASE_DELAY': 5,
+    'RETRY_MAX_DELAY': 300,
+}
+
+# task_type -> dotted path of handler(user, payload) returning a JSON-serializable dict
+TASK_HANDLERS = {
+    'job_match': 'proposals.tasks.job_match_task',
+    'pain_points': 'proposals.tasks.pain_points_task',
+    'generate_proposal': 'proposals.tasks.generate_proposal_task',
+    'targeted_proposal': 'proposals.tasks.targeted_proposal_task',
+    'humanize_proposal': 'proposals.tasks.humanize_proposal_task',
+    'proposal_pipeline': 'proposals.tasks.proposal_pipeline_task',
+    'extract_profile': 'core.tasks.extract_profile_task',
+    'summarize_project': 'core.tasks.summarize_project_task',
+}
+
+
+class TaskError(Exception):
+    """Raised by handlers for expected failures that should not be retried"""
+
+
+def get_config():
+    """Return the queue configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'LLM_TASKS', {}))
+    return config
+
+
+def submit(user, task_type, payload=None):
+    """
+    Queue a task for a worker
+
+    Args:
+        user: The user the task runs on behalf of
+        task_type: One of TASK_HANDLERS
+        payload: JSON-serializable handler arguments
+
+    Returns:
+        LLMTask: The queued task
+    """
+    if task_type not in TASK_HANDLERS:
+        raise ValueError(f'Unknown task type: {task_type}')
+    return LLMTask.objects.create(
+        user=user,
+        task_type=task_type,
+        payload=payload or {},
+        max_attempts=get_config()['MAX_ATTEMPTS'],
+    )
+
+
+def claim_next(worker_name):
+    """Atomically claim the oldest queued task that is due, or return None if there is none"""
+    candidates = (
+        LLMTask.objects.filter(status='queued', run_after__lte=timezone.now())
+        .order_by('created_at')
+        .values_list('id', flat=True)[:5]
+    )
+    for task_id in candidates:
+        claimed = LLMTask.objects.filter(id=task_id, status='queued').update(
+            status='running',
+            worker=worker_name,
+            attempts=F('attempts') + 1,
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return LLMTask.objects.select_related('user').get(id=task_id)
+    return None
+
+
+def requeue_stale():
+    """Put tasks whose worker died back on the queue (or fail them if out of attempts)"""
+    cutoff = timezone.now() - timedelta(seconds=get_config()['VISIBILITY_TIMEOUT'])
+    # Conditional updates: a worker finishing meanwhile keeps its outcome
+    stale = LLMTask.objects.filter(status='running', started_at__lt=cutoff)
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', error='Worker stopped responding', finished_at=timezone.now()
+    )
+    stale.filter(attempts__lt=F('max_attempts')).update(status='queued')
+
+
+def retry_delay(task, error):
+    """Seconds to wait before the next attempt after a failed one"""
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after:
+        return retry_after
+    config = get_config()
+    return min(config['RETRY_BASE_DELAY'] * 2 ** max(task.attempts - 1, 0), config['RETRY_MAX_DELAY'])
+
+
+def execute(task):
+    """Run a claimed task and store its outcome"""
+    try:
+        handler = import_string(TASK_HANDLERS[task.task_type])
+        task.result = handler(task.user, task.payload)
+        task.status = 'succeeded'
+        task.error = None
+    except TaskError as e:
+        task.status = 'failed'
+        task.error = str(e)
+    except Exception as e:
+        print(f"Error in task {task.id} ({task.task_type}): {str(e)}")
+        traceback.print_exc()
+        task.error = str(e)
+        # Transient failures (timeouts, rate limits) get another go, once they may have passed
+        task.status = 'queued' if task.attempts < task.max_attempts else 'failed'
+        if task.status == 'queued':
+            task.run_after = timezone.now() + timedelta(seconds=retry_delay(task, e))
+
+    task.finished_at = timezone.now() if task.status in ('succeeded', 'failed') else None
+    task.save(update_fields=['result', 'status', 'error', 'finished_at', 'run_after'])
+    return task
+
+
+def default_worker_name(index=0):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def run_worker(worker_name=None, poll_interval=None, max_tasks=None, burst=False):
+    """
+    Process tasks until interrupted
+
+    Args:
+        worker_name: Identifier stored on claimed tasks
+        poll_interval: Seconds to sleep when the queue is empty
+        max_tasks: (optional) Exit after this many tasks
+        burst: Exit as soon as the queue is empty
+    """
+    config = get_config()
+    worker_name = worker_name or default_worker_name()
+    poll_interval = poll_interval if poll_interval is not None else config['POLL_INTERVAL']
+    processed = 0
+    last_requeue = None
+
+    while max_tasks is None or processed < max_tasks:
+        close_old_connections()
+
+        if last_requeue is None or time.monotonic() - last_requeue > 60:
+            requeue_stale()
+            last_requeue = time.monotonic()
+
+        task = claim_next(worker_name)
+        if task is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        execute(task)
+        processed += 1
+
+    return processed
@@ -0,0 +1,115 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from django.shortcuts import get_object_or_404
+
+from .models import LLMTask
+from .task_queue import submit, TASK_HANDLERS
+
+
+def _task_status_data(task):
+    return {
+        'id': str(task.id),
+        'task_type': task.task_type,
+        'status': task.status,
+        'attempts': task.attempts,
+        'error': task.error,
+        'created_at': task.created_at,
+        'started_at': task.started_at,
+        'finished_at': task.finished_at,
+    }
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_task(request):
+    """
+    Queue LLM work for a background worker
+    
+    Request body:
+        task_type: One of job_match, pain_points, generate_proposal, targeted_proposal,
+                   humanize_proposal, proposal_pipeline, extract_profile, summarize_project
+        payload: The arguments for the task (same fields as the matching synchronous endpoint)
+    """
+    try:
+        data = request.data
+        task_type = data.get('task_type', '')
+        payload = data.get('payload', {})
+        
+        # Validate input
+        if task_type not in TASK_HANDLERS:
+            return Response({
+                'status': 'error',
+                'message': f'Invalid task_type. Must be one of: {list(TASK_HANDLERS)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not isinstance(payload, dict):
+            return Response({
+                'status': 'error',
+                'message': 'payload must be an object'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        task = submit(request.user, task_type, payload)
+        
+        return Response({
+            'status': 'success',
+            'task': _task_status_data(task)
+        }, status=status.HTTP_202_ACCEPTED)
+        
+    except Exception as e:
+        print(f"Error in submit_task: {str(e)}")
+        return Response({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_task_status(request, task_id):
+    """
+    Poll the status of a queued task
+    
+    URL Parameters:
+        task_id: UUID of the task
+    """
+    task = get_object_or_404(
+        LLMTask.objects.defer('payload', 'result'),
+        id=task_id,
+        user=request.user
+    )
+    return Response({
+        'status': 'success',
+        'task': _task_status_data(task)
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_task_result(request, task_id):
+    """
+    Get the result of a finished task
+    
+    Returns 202 while the task is still queued or running.
+    """
+    task = get_object_or_404(LLMTask, id=task_id, user=request.user)
+    
+    if task.status == 'failed':
+        return Response({
+            'status': 'error',
+            'message': task.error,
+            'task': _task_status_data(task)
+        }, status=status.HTTP_200_OK)
+    
+    if task.status != 'succeeded':
+        return Response({
+            'status': 'pending',
+            'task': _task_status_data(task)
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    return Response({
+        'status': 'success',
+        'task': _task_status_data(task),
+        'result': task.result
+    }, status=status.HTTP_200_OK)
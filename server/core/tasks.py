@@ -0,0 +1,31 @@
+"""Task handlers for core LLM work (see TASK_HANDLERS in core/task_queue.py)"""
+from .models import Projects
+from .profile_import import import_freelancer_profile, ProfileImportError
+from .task_queue import TaskError
+from .utils import summarize_project_description
+
+
+def extract_profile_task(user, payload):
+    """
+    Payload:
+        text: Resume / profile text to extract and save
+    """
+    try:
+        return {'data': import_freelancer_profile(user, payload.get('text', ''))}
+    except ProfileImportError as e:
+        raise TaskError(e.message)
+
+
+def summarize_project_task(user, payload):
+    """
+    Payload:
+        project_id: ID of one of the user's projects; its summary is regenerated and saved
+    """
+    try:
+        project = Projects.objects.get(id=payload.get('project_id'), user=user)
+    except Projects.DoesNotExist:
+        raise TaskError('Project not found')
+
+    project.summary = summarize_project_description(project.description)
+    project.save(update_fields=['summary', 'updated_at'])
+    return {'project_id': project.id, 'summary': project.summary}
@@ -2,9 +2,12 @@ from django.urls import path
 from . import views
 from . import views_experience
 from . import dashboard_views
+from . import task_views
+from . import async_views
 
 urlpatterns = [
     path('create_freelancer_profile/', views.create_freelancer_profile, name='create_freelancer_profile'),
+    path('async/create_freelancer_profile/', async_views.create_freelancer_profile_async, name='create_freelancer_profile_async'),
     path('get_freelancer_profile/', views.get_freelancer_profile, name='get_freelancer_profile'),
     path('update_freelancer_profile/', views.update_freelancer_profile, name='update_freelancer_profile'),
     
@@ -26,4 +29,10 @@ urlpatterns = [
     path('dashboard/proposals/', dashboard_views.get_recent_proposals, name='dashboard_proposals'),
     path('dashboard/opportunities/', dashboard_views.get_job_opportunities, name='dashboard_opportunities'),
     path('dashboard/data/', dashboard_views.get_dashboard_data, name='dashboard_data'),
+    path('dashboard/timeseries/', dashboard_views.get_dashboard_timeseries, name='dashboard_timeseries'),
+    
+    # Background LLM tasks
+    path('tasks/submit/', task_views.submit_task, name='submit_task'),
+    path('tasks/<uuid:task_id>/', task_views.get_task_status, name='task_status'),
+    path('tasks/<uuid:task_id>/result/', task_views.get_task_result, name='task_result'),
 ]
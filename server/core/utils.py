@@ -1,15 +1,11 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-load_dotenv()
-import os
+import json
+from .model_routing import arouted_completion, routed_completion
+from .llm_cache import cached_completion
+from .circuit_breaker import LLMUnavailableError
+from .rate_limit import LLMRateLimitError
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
-
-
-def extract_profile_details(text):
-    try:
-        system_prompt = """
+PROFILE_EXTRACTION_PROMPT = """
         You are a helpful assistant that can extract profile details from a given text in JSON format.
         
         Data we need is:
@@ -55,7 +51,9 @@ def extract_profile_details(text):
                     "description": "Description of Project A",
                     "budget": 1000,
                     "platform": "upwork",
-                    "status": "completed"
+                    "status": "completed",
+                    "start_date": "2023-01-01",
+                    "end_date": "2023-03-31"
                 }
             ],
             "social_links": [
@@ -68,42 +66,75 @@ def extract_profile_details(text):
         
         IMPORTANT: Return ONLY the JSON object with no additional text, markdown formatting, or code blocks.
         """
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
-            ]
+
+
+def build_profile_extraction_messages(text):
+    return [
+        {"role": "system", "content": PROFILE_EXTRACTION_PROMPT},
+        {"role": "user", "content": text}
+    ]
+
+
+def parse_profile_details(content):
+    """Parse the model's answer: a dict when it is valid JSON, else the cleaned string"""
+    # Clean up the response to ensure it's valid JSON
+    # Remove any markdown code block markers
+    content = content.replace('```json', '').replace('```', '').strip()
+    
+    # Try to parse the JSON to ensure it's valid
+    try:
+        parsed_json = json.loads(content)
+        return parsed_json  # Return the parsed JSON as a Python dictionary
+    except json.JSONDecodeError:
+        # If parsing fails, return the cleaned string
+        return content
+
+
+def empty_profile_details():
+    return {
+        "full_name": "",
+        "professional_title": "",
+        "about": "",
+        "skills": [],
+        "experience": [],
+        "portfolio_uri": None,
+        "projects": [],
+        "social_links": []
+    }
+
+
+def extract_profile_details(text):
+    try:
+        response = routed_completion(
+            "extract_profile",
+            messages=build_profile_extraction_messages(text)
         )
 
-        content = response.choices[0].message.content
-        
-        # Clean up the response to ensure it's valid JSON
-        # Remove any markdown code block markers
-        content = content.replace('```json', '').replace('```', '').strip()
-        
-        # Try to parse the JSON to ensure it's valid
-        try:
-            import json
-            parsed_json = json.loads(content)
-            return parsed_json  # Return the parsed JSON as a Python dictionary
-        except json.JSONDecodeError:
-            # If parsing fails, return the cleaned string
-            return content
+        return parse_profile_details(response.choices[0].message.content)
         
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
     except Exception as e:
         print(f"Error in extract_profile_details: {e}")
         # Return a default structure in case of error
-        return {
-            "full_name": "",
-            "professional_title": "",
-            "about": "",
-            "skills": [],
-            "experience": [],
-            "portfolio_uri": None,
-            "projects": [],
-            "social_links": []
-        }
+        return empty_profile_details()
+
+
+async def aextract_profile_details(text):
+    """Async variant of extract_profile_details"""
+    try:
+        response = await arouted_completion(
+            "extract_profile",
+            messages=build_profile_extraction_messages(text)
+        )
+
+        return parse_profile_details(response.choices[0].message.content)
+
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
+    except Exception as e:
+        print(f"Error in aextract_profile_details: {e}")
+        return empty_profile_details()
 
 
 
@@ -112,8 +143,9 @@ def summarize_project_description(description):
         prompt = """
         You are a helpful assistant that can summarize a project description in 50 words or less.
         """
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        summary = cached_completion(
+            task="summarize",
+            call_site="summarize_project",
             messages=[
                 {"role": "system", "content": prompt},
                 {"role": "user", "content": description}
@@ -121,8 +153,10 @@ def summarize_project_description(description):
         )
 
         
-        return response.choices[0].message.content
+        return summary
         
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
     except Exception as e:
         print(f"Error in summarize_project_description: {e}")
         # Return a default structure in case of error
@@ -6,7 +6,10 @@ from rest_framework import status
 from django.db import transaction
 from .serializer import ProjectsSerializer, ExperienceSerializer, FreelancerProfileSerializer
 from .models import Projects, FreelancerProfile, Experience
-from .utils import extract_profile_details, summarize_project_description
+from .utils import summarize_project_description
+from .profile_import import import_freelancer_profile, ProfileImportError
+from .circuit_breaker import LLMUnavailableError, unavailable_response
+from .rate_limit import LLMRateLimitError, throttled_response
 
 import json
 
@@ -17,100 +20,9 @@ import json
 # CRUD for FreelancerProfile
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@transaction.atomic
 def create_freelancer_profile(request):
     try:
-        data = request.data
-        extracted_data_raw = extract_profile_details(data)
-        print(extracted_data_raw)
-        
-        # Check if extracted_data_raw is already a dictionary
-        if isinstance(extracted_data_raw, dict):
-            extracted_data = extracted_data_raw
-        else:
-            cleaned_data = extracted_data_raw.strip()
-            
-            try:
-                extracted_data = json.loads(cleaned_data)
-            except json.JSONDecodeError as e:
-                print(f"JSON Decode Error: {e}")
-                
-                # Try to evaluate the string as a Python literal
-                try:
-                    import ast
-                    extracted_data = ast.literal_eval(cleaned_data)
-                except (SyntaxError, ValueError) as e:
-                    print(f"AST Parse Error: {e}")
-                    return Response({
-                        'status': 'error',
-                        'message': f'Invalid data format: {str(e)}',
-                        'raw_data': extracted_data_raw
-                    }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Validate required fields
-        required_fields = ['full_name', 'professional_title', 'about', 'skills', 'portfolio_uri']
-        missing_fields = [field for field in required_fields if field not in extracted_data]
-        
-        if missing_fields:
-            print(missing_fields)
-            return Response({
-                'status': 'error',
-                'message': f'Missing required fields: {missing_fields}',
-                'data': extracted_data
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Create or update freelancer profile
-        defaults = {
-            'full_name': extracted_data['full_name'],
-            'tagline': extracted_data['professional_title'],
-            'about': extracted_data['about'],
-            'skills': extracted_data['skills'],
-            'portfolio': extracted_data['portfolio_uri'],
-        }
-        
-        # Handle optional fields
-        if 'social_links' in extracted_data:
-            defaults['social_links'] = extracted_data['social_links']
-        
-        freelancer_profile_obj, created = FreelancerProfile.objects.get_or_create(
-            user=request.user,
-            defaults=defaults
-        )
-        
-        # If not created, update the existing profile
-        if not created:
-            for key, value in defaults.items():
-                setattr(freelancer_profile_obj, key, value)
-            freelancer_profile_obj.save()
-        
-        # Handle experience entries
-        if 'experience' in extracted_data and extracted_data['experience']:
-            for experience in extracted_data['experience']:
-                # Validate required experience fields
-                exp_required = ['company', 'title', 'start_date']
-                if all(field in experience for field in exp_required):
-                    Experience.objects.create(
-                        user=request.user,
-                        company=experience['company'],
-                        title=experience['title'],
-                        start_date=experience['start_date'],
-                        end_date=experience.get('end_date', None),  # Optional field
-                    )
-        
-        # Handle projects
-        if 'projects' in extracted_data and extracted_data['projects']:
-            for project in extracted_data['projects']:
-                # Validate required project fields
-                proj_required = ['title', 'description', 'platform', 'status']
-                if all(field in project for field in proj_required):
-                    Projects.objects.create(
-                        user=request.user,
-                        title=project['title'],
-                        description=project['description'],
-                        budget=project.get('budget', 0),  # Default to 0 if not provided
-                        platform=project['platform'],
-                        status=project['status'],
-                    )
+        extracted_data = import_freelancer_profile(request.user, request.data)
         
         return Response({
             'status': 'success',
@@ -118,8 +30,18 @@ def create_freelancer_profile(request):
             'data': extracted_data
         }, status=status.HTTP_200_OK)
         
+    except ProfileImportError as e:
+        return Response({
+            'status': 'error',
+            'message': e.message,
+            **e.extra
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
     except Exception as e:
-        # Rollback transaction on error due to @transaction.atomic
+        # save_extracted_profile runs in a transaction, so nothing is half-saved
         return Response({
             'status': 'error',
             'message': f'An error occurred: {str(e)}'
@@ -265,6 +187,10 @@ def create_project(request):
             'message': 'Project created successfully',
             'data': serializer.data
         }, status=status.HTTP_201_CREATED)
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
     except Exception as e:
         print(f"Error in create_project: {str(e)}")
         return Response({
@@ -340,6 +266,10 @@ def update_project(request, project_id):
             'status': 'error',
             'message': 'Project not found'
         }, status=status.HTTP_404_NOT_FOUND)
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
     except Exception as e:
         print(f"Error in update_project: {str(e)}")
         return Response({
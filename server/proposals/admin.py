@@ -1,4 +1,6 @@
 from django.contrib import admin
-from .models import Proposal
+from .models import Proposal, CanonicalJob, JobDescription
 # Register your models here.
 admin.site.register(Proposal)
+admin.site.register(CanonicalJob)
+admin.site.register(JobDescription)
@@ -0,0 +1,323 @@
+"""
+Async (ASGI-native) variants of the proposal, job match and generation endpoints.
+
+Same request and response bodies as proposals/views.py,
+proposals/job_match_views.py, proposals/proposal_generation_views.py and
+proposals/pipeline_views.py, mounted under ``async/``. While the LLM call
+is in flight the request holds no thread, so under an ASGI server these
+endpoints scale with open connections rather than worker threads.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+
+from core.async_api import async_api_view, throttled_json_response, unavailable_json_response
+from core.circuit_breaker import LLMUnavailableError
+from core.rate_limit import LLMRateLimitError
+from .job_match import aanalyze_job_match
+from .match_prefilter import prefilter_job_match, should_escalate, local_analysis
+from .models import Proposal
+from .pipeline import arun_proposal_pipeline
+from .serializer import ProposalSerializer
+from .utils import aanalyze_client_pain_points, agenerate_proposal, agenerate_targeted_proposal, ahumanize_proposal
+
+
+@async_api_view(['POST'])
+async def create_proposal_async(request):
+    """
+    Generate a proposal based on job description and selected style
+
+    Request body:
+        job_description: The job description text
+        style: (optional) The style of proposal to generate
+    """
+    try:
+        data = request.data
+        job_description = data.get('job_description', '')
+        style = data.get('style', 'default')
+
+        if not job_description:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Job description is required'
+            }, status=400)
+
+        proposal_text = await agenerate_proposal(request.user, job_description, style)
+
+        if proposal_text is None:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Failed to generate proposal'
+            }, status=500)
+
+        proposal = await Proposal.objects.acreate(
+            user=request.user,
+            job_description=job_description,
+            proposal_text=proposal_text,
+            style=style
+        )
+
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Proposal generated successfully',
+            'proposal': ProposalSerializer(proposal).data
+        }, status=201)
+
+    except LLMRateLimitError as e:
+        return throttled_json_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_json_response(e)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=500)
+
+
+@async_api_view(['POST'])
+async def analyze_job_match_async(request):
+    """
+    Analyze how well the freelancer matches a job description
+
+    Request body:
+        job_description: The job description text
+        prefilter: (optional) Set to false to always run the LLM analysis
+    """
+    try:
+        data = request.data
+        job_description = data.get('job_description', '')
+        use_prefilter = str(data.get('prefilter', 'true')).lower() not in ('false', '0')
+
+        if not job_description:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Job description is required'
+            }, status=400)
+
+        prefilter = await sync_to_async(prefilter_job_match)(request.user, job_description) if use_prefilter else None
+        provisional_score = prefilter['score'] if prefilter else None
+        if prefilter and not should_escalate(prefilter):
+            return JsonResponse({
+                'status': 'success',
+                'analysis': local_analysis(prefilter),
+                'source': 'local',
+                'provisional_score': provisional_score
+            })
+
+        analysis_result = await aanalyze_job_match(request.user, job_description)
+
+        if isinstance(analysis_result, dict) and 'error' in analysis_result:
+            return JsonResponse({
+                'status': 'error',
+                'message': analysis_result['error']
+            }, status=400)
+        if isinstance(analysis_result, str):
+            try:
+                analysis_result = json.loads(analysis_result)
+            except json.JSONDecodeError:
+                # Not valid JSON: return it as is, like the sync endpoint
+                pass
+        return JsonResponse({
+            'status': 'success',
+            'analysis': analysis_result,
+            'source': 'llm',
+            'provisional_score': provisional_score
+        })
+
+    except LLMRateLimitError as e:
+        return throttled_json_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_json_response(e)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=500)
+
+
+@async_api_view(['POST'])
+async def analyze_pain_points_async(request):
+    """
+    Analyze client pain points from job description
+
+    Request body:
+        job_description: The job description text
+    """
+    try:
+        job_description = request.data.get('job_description', '')
+        if not job_description:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Job description is required'
+            }, status=400)
+
+        analysis_result = await aanalyze_client_pain_points(job_description)
+
+        if isinstance(analysis_result, dict) and 'error' in analysis_result:
+            return JsonResponse({
+                'status': 'error',
+                'message': analysis_result['error']
+            }, status=400)
+
+        return JsonResponse({
+            'status': 'success',
+            'analysis': analysis_result
+        })
+
+    except LLMRateLimitError as e:
+        return throttled_json_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_json_response(e)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=500)
+
+
+@async_api_view(['POST'])
+async def generate_targeted_proposal_async(request):
+    """
+    Generate a proposal that specifically addresses the client's pain points
+
+    Request body:
+        job_description: The job description text
+        pain_points: The pain points analysis from analyze_client_pain_points
+        style: The style of proposal to generate
+        strategy: The strategy to use for proposal generation
+    """
+    try:
+        data = request.data
+        job_description = data.get('job_description', '')
+        pain_points = data.get('pain_points', {})
+        style = data.get('style', 'default')
+        strategy = data.get('strategy', '')
+
+        if not job_description:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Job description is required'
+            }, status=400)
+        if not pain_points:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Pain points analysis is required'
+            }, status=400)
+
+        proposal_text = await agenerate_targeted_proposal(request.user, job_description, pain_points, style, strategy)
+
+        if proposal_text and proposal_text.startswith('Error'):
+            return JsonResponse({
+                'status': 'error',
+                'message': proposal_text
+            }, status=400)
+
+        return JsonResponse({
+            'status': 'success',
+            'proposal': proposal_text
+        })
+
+    except LLMRateLimitError as e:
+        return throttled_json_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_json_response(e)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=500)
+
+
+@async_api_view(['POST'])
+async def humanize_proposal_async(request):
+    """
+    Make the proposal sound more human and natural
+
+    Request body:
+        proposal_text: The generated proposal text
+        job_description: (optional) The job description text
+    """
+    try:
+        data = request.data
+        proposal_text = data.get('proposal_text', '')
+        job_description = data.get('job_description', '')
+
+        if not proposal_text:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Proposal text is required'
+            }, status=400)
+
+        humanized_text = await ahumanize_proposal(proposal_text)
+
+        proposal = await Proposal.objects.acreate(
+            user=request.user,
+            job_description=job_description,
+            proposal_text=proposal_text,
+        )
+
+        return JsonResponse({
+            'status': 'success',
+            'proposal': humanized_text,
+            'proposal_id': str(proposal.id)
+        })
+
+    except LLMRateLimitError as e:
+        return throttled_json_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_json_response(e)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=500)
+
+
+@async_api_view(['POST'])
+async def proposal_pipeline_async(request):
+    """
+    Run job match, pain-point analysis, generation and humanization in one request
+
+    Request body:
+        job_description: The job description text
+        style: (optional) The style of proposal to generate
+    """
+    try:
+        data = request.data
+        job_description = data.get('job_description', '')
+        style = data.get('style', 'default')
+
+        if not job_description:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Job description is required'
+            }, status=400)
+
+        result = await arun_proposal_pipeline(request.user, job_description, style)
+
+        if 'error' in result:
+            return JsonResponse({
+                'status': 'error',
+                'message': result['error'],
+                'timings': result['timings']
+            }, status=400)
+
+        return JsonResponse({
+            'status': 'success',
+            'proposal': ProposalSerializer(result['proposal']).data,
+            'job_match': result['job_match'],
+            'pain_points': result['pain_points'],
+            'context_tokens': result['context_tokens'],
+            'timings': result['timings']
+        }, status=201)
+
+    except LLMRateLimitError as e:
+        return throttled_json_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_json_response(e)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=500)
@@ -0,0 +1,99 @@
+"""
+Versioned snapshot of the freelancer block that goes into every prompt.
+
+Building it takes three queries and a fair amount of string formatting, and
+the multi-step flow needs it two or three times per proposal. The formatted
+text is stored in FreelancerContextSnapshot and cached with Django's cache,
+so the hot path costs no queries at all.
+
+Writes to FreelancerProfile, Projects and Experience bump the snapshot
+version through signals (proposals/signals.py). The version doubles as a
+cache key for anything derived from the freelancer context.
+
+Note: with the default LocMemCache each process holds its own copy, so
+another process may serve the previous snapshot for up to
+FREELANCER_CONTEXT['CACHE_TTL'] seconds. Point CACHES at a shared backend
+(Redis, Memcached) to make invalidation immediate everywhere.
+"""
+from collections import namedtuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from .models import FreelancerContextSnapshot
+
+
+DEFAULTS = {
+    'CACHE_TTL': 300,
+}
+
+# context: the full formatted block; data: the structured rows it was built from
+Snapshot = namedtuple('Snapshot', ['version', 'context', 'data'])
+
+
+def get_config():
+    """Return the snapshot configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'FREELANCER_CONTEXT', {}))
+    return config
+
+
+def _cache_key(user_id):
+    return f'freelancer_context:{user_id}'
+
+
+def get_context_snapshot(user, builder):
+    """
+    Return the current snapshot for a user, rebuilding it if stale
+
+    Args:
+        user: The user object
+        builder: Callable(user) returning (context, data), or None if there is no profile
+
+    Returns:
+        Snapshot: (version, context, data); context and data are None if the user has no profile
+    """
+    key = _cache_key(user.pk)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    snapshot, _ = FreelancerContextSnapshot.objects.get_or_create(user=user)
+    if not snapshot.is_stale:
+        value = Snapshot(snapshot.version, snapshot.context or None, snapshot.data or None)
+    else:
+        context, data = builder(user) or (None, None)
+        # Only mark it fresh if nothing was written while we were building it
+        updated = FreelancerContextSnapshot.objects.filter(user=user, version=snapshot.version).update(
+            context=context or '',
+            data=data or {},
+            is_stale=False
+        )
+        value = Snapshot(snapshot.version, context, data)
+        if not updated:
+            # A concurrent write won: good enough for this call, but not worth caching
+            return value
+
+    cache.set(key, value, get_config()['CACHE_TTL'])
+    return value
+
+
+def get_context_version(user):
+    """Version of the user's freelancer context, for use in downstream cache keys"""
+    cached = cache.get(_cache_key(user.pk))
+    if cached is not None:
+        return cached[0]
+    snapshot = FreelancerContextSnapshot.objects.filter(user=user).only('version').first()
+    return snapshot.version if snapshot else 0
+
+
+def invalidate_context(user_id):
+    """Bump the user's context version and drop the cached copy"""
+    FreelancerContextSnapshot.objects.filter(user_id=user_id).update(
+        version=F('version') + 1,
+        is_stale=True
+    )
+    key = _cache_key(user_id)
+    cache.delete(key)
+    # Again once the write commits: until then other requests still read, and may re-cache, the old rows
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,174 @@
+"""
+Relevance-ranked, token-budgeted selection of the freelancer context.
+
+Power users have dozens of projects and jobs, and sending all of them in
+every prompt wastes thousands of input tokens. Projects and experience are
+ranked against the job description with BM25 over title, description and
+summary, and the top entries are kept while they fit
+FREELANCER_CONTEXT['TOKEN_BUDGET'].
+
+Token counts are estimated (~4 characters per token); that is close enough
+for budgeting and needs no tokenizer dependency.
+"""
+import math
+import re
+import threading
+from collections import Counter
+from django.conf import settings
+
+
+DEFAULTS = {
+    'SELECTION_ENABLED': True,
+    'TOKEN_BUDGET': 1500,
+    'BM25_K1': 1.5,
+    'BM25_B': 0.75,
+}
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have i in is it its of on or our that the this to
+we will with you your they their them need looking who what which can should would about
+""".split())
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+_stats = {'calls': 0, 'tokens_full': 0, 'tokens_used': 0, 'tokens_saved': 0}
+_stats_lock = threading.Lock()
+
+
+def get_config():
+    """Return the selection configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'FREELANCER_CONTEXT', {}))
+    return config
+
+
+def estimate_tokens(text):
+    """Rough token count for budgeting (~4 characters per token)"""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def tokenize(text):
+    """Lowercase terms, without stopwords and trailing punctuation"""
+    terms = (term.rstrip('.-') for term in TOKEN_RE.findall((text or '').lower()))
+    return [term for term in terms if term and term not in STOPWORDS]
+
+
+def _document_terms(entry, kind):
+    """Searchable terms for a project or experience entry; the title counts double"""
+    if kind == 'project':
+        fields = [entry.get('title'), entry.get('title'), entry.get('description'), entry.get('summary')]
+    else:
+        fields = [entry.get('title'), entry.get('title'), entry.get('company'), entry.get('description')]
+    return tokenize(' '.join(field for field in fields if field))
+
+
+def bm25_scores(query_terms, documents, k1=1.5, b=0.75):
+    """
+    Score each document against the query with Okapi BM25
+
+    Args:
+        query_terms: List of query terms
+        documents: List of term lists
+
+    Returns:
+        list: One score per document
+    """
+    if not documents:
+        return []
+
+    doc_count = len(documents)
+    avg_length = sum(len(doc) for doc in documents) / doc_count or 1
+    frequencies = [Counter(doc) for doc in documents]
+    document_frequency = Counter(term for freq in frequencies for term in freq)
+
+    scores = []
+    for doc, freq in zip(documents, frequencies):
+        score = 0.0
+        length_norm = k1 * (1 - b + b * len(doc) / avg_length)
+        for term in set(query_terms):
+            tf = freq.get(term)
+            if not tf:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + length_norm)
+        scores.append(score)
+    return scores
+
+
+def select_freelancer_context(snapshot, job_description, formatter):
+    """
+    Build the freelancer context for one job, keeping only what fits the budget
+
+    Args:
+        snapshot: proposals.context.Snapshot with structured data
+        job_description: The job description text
+        formatter: Callable(data, projects, experiences) that renders the context
+
+    Returns:
+        dict: context, plus tokens_full, tokens_used, tokens_saved,
+              and selected/total entry counts
+    """
+    config = get_config()
+    data = snapshot.data
+    full_tokens = estimate_tokens(snapshot.context)
+
+    entries = [('project', entry) for entry in data['projects']]
+    entries += [('experience', entry) for entry in data['experiences']]
+
+    if not config['SELECTION_ENABLED'] or full_tokens <= config['TOKEN_BUDGET']:
+        context = snapshot.context
+        selected = entries
+    else:
+        scores = bm25_scores(
+            tokenize(job_description),
+            [_document_terms(entry, kind) for kind, entry in entries],
+            config['BM25_K1'],
+            config['BM25_B'],
+        )
+        ranked = sorted(zip(scores, range(len(entries))), key=lambda item: (-item[0], item[1]))
+
+        # The profile header is always kept; entries are added best-first while they fit
+        header_tokens = estimate_tokens(formatter(data, [], []))
+        used = header_tokens
+        selected = []
+        for score, index in ranked:
+            kind, entry = entries[index]
+            if kind == 'project':
+                cost = estimate_tokens(formatter(data, [entry], [])) - header_tokens
+            else:
+                cost = estimate_tokens(formatter(data, [], [entry])) - header_tokens
+            if used + cost > config['TOKEN_BUDGET']:
+                continue
+            used += cost
+            selected.append((kind, entry))
+
+        context = formatter(
+            data,
+            [entry for kind, entry in selected if kind == 'project'],
+            [entry for kind, entry in selected if kind == 'experience'],
+        )
+
+    used_tokens = estimate_tokens(context)
+    result = {
+        'context': context,
+        'tokens_full': full_tokens,
+        'tokens_used': used_tokens,
+        'tokens_saved': max(full_tokens - used_tokens, 0),
+        'selected': len(selected),
+        'total': len(entries),
+    }
+
+    with _stats_lock:
+        _stats['calls'] += 1
+        _stats['tokens_full'] += result['tokens_full']
+        _stats['tokens_used'] += result['tokens_used']
+        _stats['tokens_saved'] += result['tokens_saved']
+
+    return result
+
+
+def get_stats():
+    """Cumulative token savings for this process"""
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,85 @@
+"""
+Text fields stored compressed at rest.
+
+CompressedTextField behaves like a TextField in Python, forms and
+serializers, but its column is binary. Values of at least
+TEXT_STORAGE['COMPRESS_MIN_BYTES'] UTF-8 bytes are zlib-compressed when that
+makes them smaller; shorter ones are stored as they are. The first byte
+tells which:
+
+    0x00  UTF-8 text
+    0x01  zlib stream of the UTF-8 text
+
+Proposal and job texts are prose and shrink to a third or less. The column
+can't be searched or sliced in SQL, so keep what queries need (previews,
+counts) in ordinary columns next to it.
+"""
+import zlib
+
+from django.conf import settings
+from django.db import models
+
+
+DEFAULTS = {
+    # Shorter values gain little and cost a decompression on every read
+    'COMPRESS_MIN_BYTES': 256,
+    'LEVEL': 6,
+}
+
+PLAIN = b'\x00'
+ZLIB = b'\x01'
+
+
+def get_config():
+    """Return the text storage configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'TEXT_STORAGE', {}))
+    return config
+
+
+def compress_text(text):
+    """Encode text for storage, compressed if that pays off"""
+    data = text.encode('utf-8')
+    config = get_config()
+    if len(data) >= config['COMPRESS_MIN_BYTES']:
+        packed = zlib.compress(data, config['LEVEL'])
+        if len(packed) < len(data):
+            return ZLIB + packed
+    return PLAIN + data
+
+
+def decompress_text(value):
+    """Decode a stored value back to text"""
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if not value:
+        return ''
+    header, body = value[:1], value[1:]
+    if header == ZLIB:
+        body = zlib.decompress(body)
+    elif header != PLAIN:
+        raise ValueError(f'Unknown text storage header {header!r}')
+    return body.decode('utf-8')
+
+
+class CompressedTextField(models.TextField):
+    """A TextField whose column holds the text zlib-compressed (see the module docstring)"""
+    description = 'Text (compressed at rest)'
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def from_db_value(self, value, expression, connection):
+        return decompress_text(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return decompress_text(value)
+        return super().to_python(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        return connection.Database.Binary(compress_text(value))
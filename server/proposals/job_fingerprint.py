@@ -0,0 +1,235 @@
+"""
+Near-duplicate detection for job descriptions across users.
+
+The same posting reaches many freelancers, often re-pasted with different
+whitespace, tracking links or a trimmed footer. Descriptions are normalized
+and fingerprinted with a MinHash signature over word bigrams; postings whose
+estimated Jaccard similarity reaches JOB_FINGERPRINT['MIN_SIMILARITY']
+resolve to one CanonicalJob, and job-only analyses (pain points) computed
+for one user are reused for everyone else.
+
+Candidate lookup uses locality-sensitive hashing: the signature is cut into
+BANDS bands of ROWS values, each band is hashed and stored in
+CanonicalJobBand, and any posting sharing a band hash is a candidate. With
+16 x 4 a pair at 0.75 similarity becomes a candidate >99% of the time, one
+at 0.3 about 13% of the time; candidates are then checked on the full
+signature. The content hash of a variant matched this way is recorded as a
+CanonicalJobAlias, so pasting the same variant again is an exact lookup.
+"""
+import hashlib
+import random
+import re
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from core import metrics
+from .models import CanonicalJob, CanonicalJobAlias, CanonicalJobBand
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MIN_SIMILARITY': 0.75,
+    'SHINGLE_SIZE': 2,
+    # Shorter descriptions only match exactly; MinHash is too noisy for them
+    'MIN_WORDS': 20,
+}
+
+BANDS = 16
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+
+# Fixed hash family h(x) = (a * x + b) mod p, so signatures stay comparable across processes
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+URL_RE = re.compile(r'https?://\S+|www\.\S+')
+EMAIL_RE = re.compile(r'\S+@\S+\.\S+')
+NON_WORD_RE = re.compile(r'[^a-z0-9+#]+')
+
+JOB_FINGERPRINT_LOOKUPS = metrics.Counter(
+    'job_fingerprint_lookups_total',
+    'Canonical job lookups by result (exact, near, new)',
+    ['result'],
+)
+SHARED_ANALYSES = metrics.Counter(
+    'job_shared_analyses_total',
+    'Job-only analyses served from a canonical job instead of the LLM',
+    ['analysis'],
+)
+
+
+def get_config():
+    """Return the fingerprinting configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'JOB_FINGERPRINT', {}))
+    return config
+
+
+def normalize(text):
+    """Lowercase, drop links, emails and punctuation, and collapse whitespace"""
+    text = (text or '').lower()
+    text = URL_RE.sub(' ', text)
+    text = EMAIL_RE.sub(' ', text)
+    return NON_WORD_RE.sub(' ', text).strip()
+
+
+def shingles(words, shingle_size=2):
+    """Set of word n-grams (the whole text for very short descriptions)"""
+    if len(words) < shingle_size:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+
+def minhash(shingle_set):
+    """MinHash signature (NUM_PERM values below 2**61) of a set of shingles"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big') % _PRIME
+        for shingle in shingle_set
+    ]
+    return [min((a * value + b) % _PRIME for value in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two signatures"""
+    if not signature or len(signature) != len(other):
+        return 0.0
+    return sum(1 for x, y in zip(signature, other) if x == y) / len(signature)
+
+
+def band_values(signature):
+    """One signed 64-bit hash per LSH band"""
+    values = []
+    for band in range(BANDS):
+        rows = ','.join(str(value) for value in signature[band * ROWS:(band + 1) * ROWS])
+        values.append(int.from_bytes(hashlib.blake2b(rows.encode(), digest_size=8).digest(), 'big', signed=True))
+    return values
+
+
+def fingerprint_job(job_description):
+    """
+    Fingerprint a job description
+
+    Returns:
+        tuple: (content_hash of the normalized text, MinHash signature, word count)
+    """
+    config = get_config()
+    normalized = normalize(job_description)
+    words = normalized.split()
+    return hash_normalized(normalized), minhash(shingles(words, config['SHINGLE_SIZE'])), len(words)
+
+
+def hash_normalized(normalized):
+    """Content hash of a normalized description"""
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def find_exact(content_hash):
+    """The CanonicalJob registered under this content hash, directly or as an alias, or None"""
+    canonical = CanonicalJob.objects.filter(content_hash=content_hash).first()
+    if canonical is None:
+        canonical = CanonicalJob.objects.filter(aliases__content_hash=content_hash).first()
+    return canonical
+
+
+def register_alias(canonical, content_hash):
+    """Resolve this content hash straight to canonical from now on"""
+    try:
+        with transaction.atomic():
+            CanonicalJobAlias.objects.create(job=canonical, content_hash=content_hash)
+    except IntegrityError:
+        # Registered concurrently
+        pass
+
+
+def find_near_duplicate(signature):
+    """Return the most similar CanonicalJob at or above MIN_SIMILARITY, or None"""
+    min_similarity = get_config()['MIN_SIMILARITY']
+    bands = band_values(signature)
+
+    candidate_ids = set()
+    for band, value in enumerate(bands):
+        candidate_ids.update(
+            CanonicalJobBand.objects.filter(band=band, value=value).values_list('job_id', flat=True)[:50]
+        )
+    if not candidate_ids:
+        return None
+
+    best, best_similarity = None, min_similarity
+    for candidate in CanonicalJob.objects.filter(id__in=candidate_ids).only('id', 'minhash', 'pain_points'):
+        score = similarity(signature, candidate.minhash)
+        if score >= best_similarity:
+            best, best_similarity = candidate, score
+    return best
+
+
+def get_canonical_job(job_description):
+    """
+    Resolve a job description to its CanonicalJob, creating one for new postings
+
+    Args:
+        job_description: The job description text
+
+    Returns:
+        CanonicalJob: The shared record, or None if fingerprinting is disabled
+    """
+    config = get_config()
+    if not config['ENABLED'] or not (job_description or '').strip():
+        return None
+
+    normalized = normalize(job_description)
+    content_hash = hash_normalized(normalized)
+
+    canonical = find_exact(content_hash)
+    result = 'exact'
+    if canonical is None:
+        # Only unseen texts pay for the signature
+        words = normalized.split()
+        word_count = len(words)
+        signature = minhash(shingles(words, config['SHINGLE_SIZE']))
+        if word_count >= config['MIN_WORDS']:
+            canonical = find_near_duplicate(signature)
+            result = 'near'
+            if canonical is not None:
+                register_alias(canonical, content_hash)
+
+    if canonical is not None:
+        CanonicalJob.objects.filter(pk=canonical.pk).update(seen_count=F('seen_count') + 1)
+        JOB_FINGERPRINT_LOOKUPS.inc(result=result)
+        return canonical
+
+    try:
+        with transaction.atomic():
+            canonical = CanonicalJob.objects.create(
+                content_hash=content_hash,
+                minhash=signature,
+                description=job_description,
+            )
+            # Too-short postings only ever match exactly, so they get no bands
+            if word_count >= config['MIN_WORDS']:
+                CanonicalJobBand.objects.bulk_create([
+                    CanonicalJobBand(job=canonical, band=band, value=value)
+                    for band, value in enumerate(band_values(signature))
+                ])
+    except IntegrityError:
+        # Another request registered the same posting first
+        canonical = CanonicalJob.objects.get(content_hash=content_hash)
+    JOB_FINGERPRINT_LOOKUPS.inc(result='new')
+    return canonical
+
+
+def get_shared_pain_points(canonical):
+    """Pain points already computed for this posting (possibly for another user), or None"""
+    if canonical is None or not canonical.pain_points:
+        return None
+    SHARED_ANALYSES.inc(analysis='pain_points')
+    return canonical.pain_points
+
+
+def save_shared_pain_points(canonical, analysis):
+    """Store a successful pain-point analysis on the canonical job for other users"""
+    if canonical is None or not isinstance(analysis, dict) or 'error' in analysis:
+        return
+    CanonicalJob.objects.filter(pk=canonical.pk, pain_points__isnull=True).update(pain_points=analysis)
@@ -1,33 +1,23 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-load_dotenv()
-import os
+import json
+from asgiref.sync import sync_to_async
 from core.models import FreelancerProfile
+from core.llm_cache import acached_completion, cached_completion
+from core.circuit_breaker import LLMUnavailableError
+from core.rate_limit import LLMRateLimitError
 from .utils import get_freelancer_data
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-def analyze_job_match(user, job_description):
+def build_job_match_messages(freelancer_data, job_description):
     """
-    Analyze how well a freelancer matches a job description and if it's worth bidding on
-    
+    Build the chat messages for the job match analysis
+
     Args:
-        user: The user object for whom to analyze the match
+        freelancer_data: Output of get_freelancer_data
         job_description: The job description text
-        
+
     Returns:
-        dict: Analysis results including match score, strengths, weaknesses, and recommendation
+        list: Chat messages
     """
-    try:
-        # Get freelancer data
-        freelancer_data = get_freelancer_data(user)
-        if not freelancer_data:
-            return {
-                "error": "Freelancer profile not found"
-            }
-        
-        # Format the prompt for job match analysis
-        prompt = f"""
+    prompt = f"""
         # JOB MATCH ANALYSIS TASK
         
         ## Freelancer Profile
@@ -55,24 +45,84 @@ def analyze_job_match(user, job_description):
             "strategy": "Focus on your experience with similar projects and emphasize your quick turnaround time."
         }}
         """
+
+    return [
+        {"role": "system", "content": "You are an expert freelance job analyzer that helps freelancers determine if a job is a good match for their skills and experience. Provide honest, data-driven analysis."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def analyze_job_match(user, job_description, freelancer_data=None):
+    """
+    Analyze how well a freelancer matches a job description and if it's worth bidding on
+    
+    Args:
+        user: The user object for whom to analyze the match
+        job_description: The job description text
+        freelancer_data: (optional) Pre-built output of get_freelancer_data, to avoid rebuilding it
         
-        # Call OpenAI API for job match analysis
-        response = client.chat.completions.create(
-            model="gpt-4o",
+    Returns:
+        dict: Analysis results including match score, strengths, weaknesses, and recommendation
+    """
+    try:
+        # Get freelancer data
+        if freelancer_data is None:
+            freelancer_data = get_freelancer_data(user, job_description)
+        if not freelancer_data:
+            return {
+                "error": "Freelancer profile not found"
+            }
+        
+        # Call OpenAI API for job match analysis (cached on profile + job description)
+        analysis = cached_completion(
+            task="job_match",
             temperature=0.5,  # Lower temperature for more consistent analysis
             response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": "You are an expert freelance job analyzer that helps freelancers determine if a job is a good match for their skills and experience. Provide honest, data-driven analysis."},
-                {"role": "user", "content": prompt}
-            ]
+            messages=build_job_match_messages(freelancer_data, job_description)
         )
         
-        # Parse and return the analysis
-        analysis = response.choices[0].message.content
         return analysis
     
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
     except Exception as e:
         print(f"Error in analyze_job_match: {str(e)}")
         return {
             "error": f"Error analyzing job match: {str(e)}"
         }
+
+
+async def aanalyze_job_match(user, job_description, freelancer_data=None):
+    """Async variant of analyze_job_match (same arguments and return value)"""
+    try:
+        if freelancer_data is None:
+            freelancer_data = await sync_to_async(get_freelancer_data)(user, job_description)
+        if not freelancer_data:
+            return {
+                "error": "Freelancer profile not found"
+            }
+
+        return await acached_completion(
+            task="job_match",
+            temperature=0.5,
+            response_format={"type": "json_object"},
+            messages=build_job_match_messages(freelancer_data, job_description)
+        )
+
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
+    except Exception as e:
+        print(f"Error in aanalyze_job_match: {str(e)}")
+        return {
+            "error": f"Error analyzing job match: {str(e)}"
+        }
+
+
+def parse_job_match(result):
+    """analyze_job_match returns the raw JSON string on success and an error dict on failure"""
+    if isinstance(result, str):
+        try:
+            return json.loads(result)
+        except json.JSONDecodeError:
+            return {'error': 'Job match analysis returned invalid JSON'}
+    return result
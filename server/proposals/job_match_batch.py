@@ -0,0 +1,131 @@
+"""
+Job match analysis for a list of job descriptions in one request.
+
+The freelancer snapshot is loaded once for the whole batch; only the cheap
+per-job selection (proposals/context_selection.py) runs for each job. The
+LLM calls then run on a bounded thread pool so a large batch can't exhaust
+the OpenAI connection pool or rate limit.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.db import connection
+from core.circuit_breaker import LLMUnavailableError
+from core.rate_limit import LLMRateLimitError
+from .context import get_context_snapshot
+from .context_selection import select_freelancer_context
+from .job_match import analyze_job_match, parse_job_match
+from .match_prefilter import get_config as get_prefilter_config, score_job_match, should_escalate, local_analysis
+from .utils import build_freelancer_data, format_freelancer_data
+
+
+DEFAULTS = {
+    'MAX_JOBS': 25,
+    'CONCURRENCY': 4,
+}
+
+
+class BatchError(Exception):
+    """Raised when the batch as a whole can't be analyzed"""
+
+
+def get_config():
+    """Return the batch configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'JOB_MATCH_BATCH', {}))
+    return config
+
+
+def _analyze_one(user, index, job_description, freelancer_data, provisional_score):
+    """Analyze one job in a worker thread and shape it as a batch item"""
+    try:
+        analysis = parse_job_match(analyze_job_match(user, job_description, freelancer_data))
+        if isinstance(analysis, dict) and 'error' in analysis:
+            return {'index': index, 'status': 'error', 'message': analysis['error']}
+        return {
+            'index': index,
+            'status': 'success',
+            'analysis': analysis,
+            'source': 'llm',
+            'provisional_score': provisional_score,
+        }
+    except (LLMRateLimitError, LLMUnavailableError):
+        # Every other job would be refused the same way: fail the batch
+        raise
+    except Exception as e:
+        print(f"Error in batch job match {index}: {str(e)}")
+        return {'index': index, 'status': 'error', 'message': f'An error occurred: {str(e)}'}
+    finally:
+        # Worker threads open their own DB connection for the LLM cache
+        connection.close()
+
+
+def iter_job_match_batch(user, job_descriptions, concurrency=None, prefilter=True):
+    """
+    Analyze several jobs concurrently, yielding each result as it completes
+
+    Args:
+        user: The user object for whom to analyze the matches
+        job_descriptions: List of job description texts
+        concurrency: (optional) Maximum number of analyses in flight
+        prefilter: Answer clear mismatches from the local pre-filter (proposals/match_prefilter.py)
+
+    Yields:
+        dict: {'index', 'status': 'success', 'analysis', 'source', 'provisional_score'} or
+              {'index', 'status': 'error', 'message'}; index is the position in job_descriptions
+
+    Raises:
+        BatchError: If the freelancer profile doesn't exist
+        LLMRateLimitError, LLMUnavailableError: As soon as one analysis hits them;
+            the analyses not started yet are cancelled
+    """
+    concurrency = concurrency or get_config()['CONCURRENCY']
+    prefilter = prefilter and get_prefilter_config()['ENABLED']
+
+    # One snapshot lookup for the whole batch
+    snapshot = get_context_snapshot(user, build_freelancer_data)
+    if snapshot.data is None:
+        raise BatchError('Freelancer profile not found')
+
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        futures = []
+        for index, job_description in enumerate(job_descriptions):
+            if not isinstance(job_description, str) or not job_description.strip():
+                yield {'index': index, 'status': 'error', 'message': 'Job description is required'}
+                continue
+
+            provisional_score = None
+            if prefilter:
+                result = score_job_match(snapshot.data, job_description)
+                provisional_score = result['score']
+                if not should_escalate(result):
+                    yield {
+                        'index': index,
+                        'status': 'success',
+                        'analysis': local_analysis(result),
+                        'source': 'local',
+                        'provisional_score': provisional_score,
+                    }
+                    continue
+
+            freelancer_data = select_freelancer_context(snapshot, job_description, format_freelancer_data)['context']
+            futures.append(executor.submit(_analyze_one, user, index, job_description, freelancer_data, provisional_score))
+
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        except (GeneratorExit, LLMRateLimitError, LLMUnavailableError):
+            # The client went away or the batch failed; don't start analyses nobody will read
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def analyze_job_match_batch(user, job_descriptions, concurrency=None, prefilter=True):
+    """
+    Analyze several jobs concurrently
+
+    Returns:
+        list: One result per job description, in input order (see iter_job_match_batch)
+    """
+    results = list(iter_job_match_batch(user, job_descriptions, concurrency, prefilter))
+    return sorted(results, key=lambda item: item['index'])
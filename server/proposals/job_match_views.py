@@ -1,9 +1,16 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from django.http import StreamingHttpResponse
+from core.circuit_breaker import LLMUnavailableError, unavailable_response
+from core.rate_limit import LLMRateLimitError, throttled_response
 import json
 from .job_match import analyze_job_match
+from .match_prefilter import prefilter_job_match, should_escalate, local_analysis
+from .job_match_batch import BatchError, analyze_job_match_batch, iter_job_match_batch, get_config as get_batch_config
+from .streaming_views import EventStreamRenderer, _sse
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -11,13 +18,19 @@ def analyze_job_match_api(request):
     """
     Analyze how well the freelancer matches a job description and if it's worth bidding on
     
+    A local pre-filter scores the job first; clear mismatches are answered
+    from that provisional score without calling the LLM. `source` in the
+    response says which path produced the analysis.
+    
     Request body:
         job_description: The job description text
+        prefilter: (optional) Set to false to always run the LLM analysis
     """
     try:
         # Get data from request
         data = request.data
         job_description = data.get('job_description', '')
+        use_prefilter = str(data.get('prefilter', 'true')).lower() not in ('false', '0')
         
         # Validate input
         if not job_description:
@@ -26,6 +39,17 @@ def analyze_job_match_api(request):
                 'message': 'Job description is required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        # Answer clear mismatches locally
+        prefilter = prefilter_job_match(request.user, job_description) if use_prefilter else None
+        provisional_score = prefilter['score'] if prefilter else None
+        if prefilter and not should_escalate(prefilter):
+            return Response({
+                'status': 'success',
+                'analysis': local_analysis(prefilter),
+                'source': 'local',
+                'provisional_score': provisional_score
+            }, status=status.HTTP_200_OK)
+        
         # Call the job match analysis function
         analysis_result = analyze_job_match(request.user, job_description)
         
@@ -36,13 +60,17 @@ def analyze_job_match_api(request):
                 analysis_json = json.loads(analysis_result)
                 return Response({
                     'status': 'success',
-                    'analysis': analysis_json
+                    'analysis': analysis_json,
+                    'source': 'llm',
+                    'provisional_score': provisional_score
                 }, status=status.HTTP_200_OK)
             except json.JSONDecodeError:
                 # If it's not valid JSON, return it as is
                 return Response({
                     'status': 'success',
-                    'analysis': analysis_result
+                    'analysis': analysis_result,
+                    'source': 'llm',
+                    'provisional_score': provisional_score
                 }, status=status.HTTP_200_OK)
         elif isinstance(analysis_result, dict) and 'error' in analysis_result:
             return Response({
@@ -52,11 +80,112 @@ def analyze_job_match_api(request):
         else:
             return Response({
                 'status': 'success',
-                'analysis': analysis_result
+                'analysis': analysis_result,
+                'source': 'llm',
+                'provisional_score': provisional_score
             }, status=status.HTTP_200_OK)
             
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+            
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
     except Exception as e:
         return Response({
             'status': 'error',
             'message': f'An error occurred: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def analyze_job_match_batch_api(request):
+    """
+    Analyze several job descriptions in one request
+    
+    Request body:
+        job_descriptions: List of job description texts
+        prefilter: (optional) Set to false to send every job to the LLM
+        stream: (optional) If true, respond with Server-Sent Events instead of one JSON body
+    
+    Events (stream mode):
+        result: one item per job as soon as it completes
+        done: {"status": "success", "count": n}
+        error: {"status": "error", "message": "..."}; when the AI service is
+            rate limited or unavailable also "code" (429 or 503) and "retry_after"
+    
+    Every item carries the job's index in job_descriptions and either its
+    analysis (with `source`: local or llm) or an error message, so one bad
+    job doesn't fail the batch. A rate limit or open circuit does: the whole
+    request is answered with 429/503 and Retry-After.
+    """
+    data = request.data
+    job_descriptions = data.get('job_descriptions')
+    max_jobs = get_batch_config()['MAX_JOBS']
+    
+    # Validate input
+    if not isinstance(job_descriptions, list) or not job_descriptions:
+        return Response({
+            'status': 'error',
+            'message': 'job_descriptions must be a non-empty list'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(job_descriptions) > max_jobs:
+        return Response({
+            'status': 'error',
+            'message': f'At most {max_jobs} job descriptions per batch'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    use_prefilter = str(data.get('prefilter', 'true')).lower() not in ('false', '0')
+    if str(data.get('stream', '')).lower() in ('true', '1'):
+        return _stream_batch(request.user, job_descriptions, use_prefilter)
+    
+    try:
+        results = analyze_job_match_batch(request.user, job_descriptions, prefilter=use_prefilter)
+    except BatchError as e:
+        return Response({
+            'status': 'error',
+            'message': str(e)
+        }, status=status.HTTP_404_NOT_FOUND)
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    return Response({
+        'status': 'success',
+        'results': results
+    }, status=status.HTTP_200_OK)
+
+
+def _stream_batch(user, job_descriptions, use_prefilter):
+    def events():
+        count = 0
+        try:
+            for item in iter_job_match_batch(user, job_descriptions, prefilter=use_prefilter):
+                count += 1
+                yield _sse('result', item)
+            yield _sse('done', {'status': 'success', 'count': count})
+        except (LLMRateLimitError, LLMUnavailableError) as e:
+            yield _sse('error', {
+                'status': 'error',
+                'code': status.HTTP_429_TOO_MANY_REQUESTS if isinstance(e, LLMRateLimitError) else status.HTTP_503_SERVICE_UNAVAILABLE,
+                'message': str(e),
+                'retry_after': e.retry_after
+            })
+        except Exception as e:
+            print(f"Error in job match batch stream: {str(e)}")
+            yield _sse('error', {
+                'status': 'error',
+                'message': str(e) if isinstance(e, BatchError) else f'An error occurred: {str(e)}'
+            })
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
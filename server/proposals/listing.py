@@ -0,0 +1,203 @@
+"""
+Cursor-paginated, lightweight proposal listing.
+
+The proposal list used to load and serialize every proposal of the user
+with its full job description, proposal text and feedback, which grows
+without bound. Pages are now selected by keyset on (created_at, id), newest
+first: the cursor is the position of the last row of the previous page, so
+each page is one indexed range query no matter how deep the client pages,
+and rows inserted meanwhile never shift or repeat items.
+
+List items carry only previews of the large text columns (kept uncompressed
+next to the texts, so the full text is never loaded); the detail endpoint
+still returns everything. Configuration lives in ``settings.PROPOSAL_LIST``.
+"""
+import base64
+import binascii
+import uuid
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Substr
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Proposal, PROPOSAL_STATUS, PROPOSAL_STYLES
+
+
+DEFAULTS = {
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 100,
+    # Characters of the job description and proposal text included in list items
+    # (at most models.PREVIEW_LENGTH, the length of the stored previews)
+    'PREVIEW_CHARS': 200,
+}
+
+LIST_FIELDS = (
+    'id', 'status', 'style', 'word_count', 'created_at', 'updated_at',
+    'user__id', 'user__username', 'user__email', 'user__first_name', 'user__last_name',
+)
+
+
+class ListingError(ValueError):
+    """Raised for an invalid cursor or filter; the message is safe to show to the client"""
+
+
+def get_config():
+    """Return the listing configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PROPOSAL_LIST', {}))
+    return config
+
+
+def encode_cursor(proposal):
+    """Opaque cursor pointing just past this proposal"""
+    raw = f"{proposal.created_at.isoformat()}|{proposal.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        tuple: (created_at, id) of the last item of the previous page
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, proposal_id = raw.split('|')
+        created_at = parse_datetime(created_at)
+        proposal_id = uuid.UUID(proposal_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ListingError('Invalid cursor')
+    if created_at is None:
+        raise ListingError('Invalid cursor')
+    return created_at, proposal_id
+
+
+def _choices(params, name, choices):
+    """Comma-separated filter values, validated against the model choices"""
+    value = params.get(name)
+    if not value:
+        return None
+    values = [item.strip() for item in value.split(',') if item.strip()]
+    allowed = {choice for choice, _ in choices}
+    invalid = [item for item in values if item not in allowed]
+    if invalid:
+        raise ListingError(f"Invalid {name}: {', '.join(invalid)}")
+    return values
+
+
+def _date_bound(params, name, end_of_day=False):
+    """An ISO date or datetime; a bare date covers the whole day"""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError
+            moment = datetime.combine(day, time.max if end_of_day else time.min)
+    except ValueError:
+        raise ListingError(f'Invalid {name}: expected YYYY-MM-DD or an ISO datetime')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filter_proposals(queryset, params):
+    """
+    Apply the list filters
+
+    Query parameters:
+        status: One status or a comma-separated list (generated, pending, accepted, viewed, rejected)
+        style: One style or a comma-separated list
+        created_after: Only proposals created on/after this date or datetime
+        created_before: Only proposals created on/before this date or datetime
+    """
+    statuses = _choices(params, 'status', PROPOSAL_STATUS)
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    styles = _choices(params, 'style', PROPOSAL_STYLES)
+    if styles:
+        queryset = queryset.filter(style__in=styles)
+    created_after = _date_bound(params, 'created_after')
+    if created_after:
+        queryset = queryset.filter(created_at__gte=created_after)
+    created_before = _date_bound(params, 'created_before', end_of_day=True)
+    if created_before:
+        queryset = queryset.filter(created_at__lte=created_before)
+    return queryset
+
+
+def with_previews(queryset, preview_chars=None):
+    """Load only the small columns, plus previews and the word count of the large ones"""
+    if preview_chars is None:
+        preview_chars = get_config()['PREVIEW_CHARS']
+    return queryset.select_related('user').only(*LIST_FIELDS).annotate(
+        job_description_preview=Substr('job__preview', 1, preview_chars),
+        proposal_preview=Substr('proposal_text_preview', 1, preview_chars),
+        has_feedback=Case(
+            When(Q(user_feedback__isnull=True) | Q(user_feedback=''), then=Value(False)),
+            default=Value(True),
+        ),
+    )
+
+
+def page_query(user, params):
+    """
+    The query for one page of the user's proposals, newest first
+
+    Returns:
+        tuple: (queryset fetching limit + 1 rows, limit)
+
+    Raises:
+        ListingError: If the cursor, limit or a filter is invalid
+    """
+    config = get_config()
+    try:
+        limit = int(params.get('limit') or config['PAGE_SIZE'])
+    except ValueError:
+        raise ListingError('Invalid limit')
+    limit = max(1, min(limit, config['MAX_PAGE_SIZE']))
+
+    queryset = filter_proposals(Proposal.objects.filter(user=user), params)
+    cursor = params.get('cursor')
+    if cursor:
+        created_at, proposal_id = decode_cursor(cursor)
+        # The redundant created_at bound lets the index seek straight to the cursor
+        queryset = queryset.filter(
+            Q(created_at__lte=created_at),
+            Q(created_at__lt=created_at) | Q(id__lt=proposal_id),
+        )
+
+    # One extra row tells whether there is another page
+    queryset = with_previews(queryset.order_by('-created_at', '-id'), config['PREVIEW_CHARS'])
+    return queryset[:limit + 1], limit
+
+
+def list_proposals(user, params):
+    """
+    One page of the user's proposals, newest first
+
+    Args:
+        user: The user whose proposals to list
+        params: Query parameters: cursor, limit and the filters of filter_proposals
+
+    Returns:
+        dict: proposals (list of Proposal with preview annotations), next_cursor
+              (None on the last page) and has_more
+
+    Raises:
+        ListingError: If the cursor, limit or a filter is invalid
+    """
+    queryset, limit = page_query(user, params)
+    rows = list(queryset)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'proposals': rows,
+        'next_cursor': encode_cursor(rows[-1]) if has_more else None,
+        'has_more': has_more,
+    }
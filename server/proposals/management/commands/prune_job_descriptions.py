@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from proposals.models import JobDescription
+
+
+class Command(BaseCommand):
+    help = 'Delete job descriptions no proposal uses any more (e.g. left behind by queryset updates)'
+
+    def handle(self, *args, **options):
+        count = JobDescription.delete_unused()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} job description(s)'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from proposals.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Recompute the full-text search index of all proposals'
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} proposal(s)'))
@@ -0,0 +1,145 @@
+"""
+Local, LLM-free pre-filter for job match analysis.
+
+Most jobs a freelancer pastes in are obviously off-target, and each of those
+costs a full gpt-4o call. The pre-filter scores the job against the cached
+freelancer snapshot (no queries) from skill overlap, keyword overlap and the
+similarity of past project titles, in well under a millisecond.
+
+Jobs scoring below MATCH_PREFILTER['ESCALATE_THRESHOLD'] are answered with
+the provisional score; everything else is escalated to the LLM analysis.
+"""
+from django.conf import settings
+from .context import get_context_snapshot
+from .context_selection import tokenize
+from .utils import build_freelancer_data
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Provisional scores (1-100) below this are answered locally
+    'ESCALATE_THRESHOLD': 20,
+    # Matched skills at which the skill component saturates
+    'SKILL_SATURATION': 4,
+    'SKILL_WEIGHT': 0.5,
+    'KEYWORD_WEIGHT': 0.3,
+    'TITLE_WEIGHT': 0.2,
+}
+
+
+def get_config():
+    """Return the pre-filter configuration merged over the defaults"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'MATCH_PREFILTER', {}))
+    return config
+
+
+def _skill_names(skills):
+    """FreelancerProfile.skills is free-form JSON: a list of strings or of {"name": ...} objects"""
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    names = []
+    for skill in skills or []:
+        if isinstance(skill, dict):
+            skill = skill.get('name') or skill.get('skill') or ''
+        skill = str(skill).strip()
+        if skill:
+            names.append(skill)
+    return names
+
+
+def _terms(text):
+    """Pre-filter terms, with a naive plural fold so APIs matches API"""
+    return [term[:-1] if len(term) > 3 and term.endswith('s') and not term.endswith('ss') else term
+            for term in tokenize(text)]
+
+
+def score_job_match(data, job_description):
+    """
+    Compute a provisional match score without calling the LLM
+
+    Args:
+        data: Structured freelancer data (Snapshot.data from proposals/context.py)
+        job_description: The job description text
+
+    Returns:
+        dict: score (1-100), matched_skills, and the skill/keyword/title components (0-1)
+    """
+    config = get_config()
+    profile = data['profile']
+    job_terms = set(_terms(job_description))
+
+    skills = _skill_names(profile.get('skills'))
+    title_term_sets = [set(_terms(project.get('title'))) for project in data['projects']]
+
+    # Skills: a skill matches when all of its terms appear in the job ("react native")
+    matched_skills = []
+    vocabulary = set()
+    for skill in skills:
+        skill_terms = _terms(skill)
+        vocabulary.update(skill_terms)
+        if skill_terms and job_terms.issuperset(skill_terms):
+            matched_skills.append(skill)
+    skill_score = min(len(matched_skills) / config['SKILL_SATURATION'], 1.0)
+
+    # Keywords: share of the job's terms the freelancer's profile and work history mention
+    vocabulary.update(_terms(' '.join(filter(None, [
+        profile.get('tagline'),
+        profile.get('about'),
+        ' '.join(experience.get('title') or '' for experience in data['experiences']),
+    ]))))
+    vocabulary.update(*title_term_sets)
+    keyword_score = len(job_terms & vocabulary) / len(job_terms) if job_terms else 0.0
+
+    # Project titles: best share of a past project's title found in the job
+    title_score = max(
+        (len(title_terms & job_terms) / len(title_terms) for title_terms in title_term_sets if title_terms),
+        default=0.0
+    )
+
+    combined = (
+        config['SKILL_WEIGHT'] * skill_score
+        + config['KEYWORD_WEIGHT'] * keyword_score
+        + config['TITLE_WEIGHT'] * title_score
+    )
+    return {
+        'score': max(1, min(100, round(combined * 100))),
+        'matched_skills': matched_skills,
+        'skill_score': round(skill_score, 3),
+        'keyword_score': round(keyword_score, 3),
+        'title_score': round(title_score, 3),
+    }
+
+
+def should_escalate(prefilter_result):
+    """Whether the provisional score is high enough to be worth an LLM analysis"""
+    config = get_config()
+    return not config['ENABLED'] or prefilter_result['score'] >= config['ESCALATE_THRESHOLD']
+
+
+def local_analysis(prefilter_result):
+    """Shape a provisional score like the LLM's job match JSON"""
+    matched = prefilter_result['matched_skills']
+    return {
+        'match_score': prefilter_result['score'],
+        'strengths': [f"Relevant skill: {skill}" for skill in matched],
+        'gaps': ["Few of your skills or past projects match this job's requirements"],
+        'recommendation': 'Not Recommended',
+        'strategy': '',
+    }
+
+
+def prefilter_job_match(user, job_description):
+    """
+    Score a job locally from the user's cached freelancer snapshot
+
+    Returns:
+        dict: Output of score_job_match, or None if the pre-filter is disabled
+              or the user has no profile
+    """
+    if not get_config()['ENABLED']:
+        return None
+    snapshot = get_context_snapshot(user, build_freelancer_data)
+    if snapshot.data is None:
+        return None
+    return score_job_match(snapshot.data, job_description)
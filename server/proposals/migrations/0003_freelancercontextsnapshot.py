@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-17 19:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('proposals', '0002_rename_proposal_proposal_proposal_text_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FreelancerContextSnapshot',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('context', models.TextField(blank=True, default='')),
+                ('is_stale', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposals', '0003_freelancercontextsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='freelancercontextsnapshot',
+            name='data',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
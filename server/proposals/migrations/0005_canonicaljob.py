@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-17 19:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposals', '0004_freelancercontextsnapshot_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CanonicalJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('minhash', models.JSONField(default=list)),
+                ('description', models.TextField()),
+                ('pain_points', models.JSONField(blank=True, null=True)),
+                ('seen_count', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CanonicalJobBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('value', models.BigIntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='proposals.canonicaljob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'value'], name='proposals_c_band_776833_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 19:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposals', '0005_canonicaljob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='proposal_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['user', 'status', 'created_at'], name='proposal_user_status_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+SQLITE = [
+    "CREATE VIRTUAL TABLE proposals_proposal_fts USING fts5("
+    "proposal_id UNINDEXED, user_id UNINDEXED, job_description, proposal_text, user_feedback, "
+    "tokenize = 'porter unicode61 remove_diacritics 2')",
+    "INSERT INTO proposals_proposal_fts (proposal_id, user_id, job_description, proposal_text, user_feedback) "
+    "SELECT id, user_id, job_description, proposal_text, COALESCE(user_feedback, '') FROM proposals_proposal",
+]
+
+POSTGRES = [
+    "CREATE TABLE proposals_proposal_search ("
+    " proposal_id uuid PRIMARY KEY REFERENCES proposals_proposal (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,"
+    " user_id integer NOT NULL,"
+    " job_description text NOT NULL DEFAULT '',"
+    " proposal_text text NOT NULL DEFAULT '',"
+    " user_feedback text NOT NULL DEFAULT '',"
+    " document tsvector GENERATED ALWAYS AS ("
+    "  setweight(to_tsvector('english'::regconfig, job_description), 'A') ||"
+    "  setweight(to_tsvector('english'::regconfig, proposal_text), 'B') ||"
+    "  setweight(to_tsvector('english'::regconfig, user_feedback), 'C')"
+    " ) STORED)",
+    "CREATE INDEX proposals_proposal_search_document ON proposals_proposal_search USING GIN (document)",
+    "CREATE INDEX proposals_proposal_search_user ON proposals_proposal_search (user_id)",
+    "INSERT INTO proposals_proposal_search (proposal_id, user_id, job_description, proposal_text, user_feedback) "
+    "SELECT id, user_id, job_description, proposal_text, COALESCE(user_feedback, '') FROM proposals_proposal",
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {'sqlite': SQLITE, 'postgresql': POSTGRES}.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    table = {'sqlite': 'proposals_proposal_fts', 'postgresql': 'proposals_proposal_search'}.get(
+        schema_editor.connection.vendor
+    )
+    if table:
+        schema_editor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+    """Full-text search index over proposals (see proposals/search.py)"""
+
+    dependencies = [
+        ('proposals', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:05
+
+import django.db.models.deletion
+import proposals.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposals', '0007_proposal_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobDescription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('text', proposals.fields.CompressedTextField()),
+                ('preview', models.CharField(blank=True, default='', max_length=300)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='proposal',
+            name='job',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='proposals', to='proposals.jobdescription'),
+        ),
+        migrations.AddField(
+            model_name='proposal',
+            name='compressed_text',
+            field=proposals.fields.CompressedTextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='proposal',
+            name='proposal_text_preview',
+            field=models.CharField(blank=True, default='', editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='proposal',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='canonicaljob',
+            name='compressed_description',
+            field=proposals.fields.CompressedTextField(null=True),
+        ),
+        # Nullable until 0010 drops them, so that migrating back can re-add them before refilling
+        migrations.AlterField(
+            model_name='proposal',
+            name='job_description',
+            field=models.TextField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='proposal',
+            name='proposal_text',
+            field=models.TextField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='canonicaljob',
+            name='description',
+            field=models.TextField(null=True),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:05
+
+import hashlib
+
+from django.db import migrations
+
+
+BATCH_SIZE = 500
+PREVIEW_LENGTH = 300
+
+
+def _batches(queryset):
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield queryset.filter(pk__in=ids[start:start + BATCH_SIZE])
+
+
+def move_texts(apps, schema_editor):
+    """Point proposals at deduplicated job descriptions and compress the large texts"""
+    Proposal = apps.get_model('proposals', 'Proposal')
+    JobDescription = apps.get_model('proposals', 'JobDescription')
+    CanonicalJob = apps.get_model('proposals', 'CanonicalJob')
+
+    job_ids = {}
+    for batch in _batches(Proposal.objects.only('id', 'job_description', 'proposal_text')):
+        proposals = list(batch)
+        for proposal in proposals:
+            description = proposal.job_description or ''
+            content_hash = hashlib.sha256(description.encode('utf-8')).hexdigest()
+            if content_hash not in job_ids:
+                job_ids[content_hash] = JobDescription.objects.get_or_create(
+                    content_hash=content_hash,
+                    defaults={'text': description, 'preview': description[:PREVIEW_LENGTH]},
+                )[0].pk
+            text = proposal.proposal_text or ''
+            proposal.job_id = job_ids[content_hash]
+            proposal.compressed_text = text
+            proposal.proposal_text_preview = text[:PREVIEW_LENGTH]
+            proposal.word_count = len(text.split())
+        Proposal.objects.bulk_update(
+            proposals, ['job', 'compressed_text', 'proposal_text_preview', 'word_count']
+        )
+
+    for batch in _batches(CanonicalJob.objects.only('id', 'description')):
+        jobs = list(batch)
+        for job in jobs:
+            job.compressed_description = job.description
+        CanonicalJob.objects.bulk_update(jobs, ['compressed_description'])
+
+
+def restore_texts(apps, schema_editor):
+    Proposal = apps.get_model('proposals', 'Proposal')
+    CanonicalJob = apps.get_model('proposals', 'CanonicalJob')
+
+    for batch in _batches(Proposal.objects.select_related('job')):
+        proposals = list(batch)
+        for proposal in proposals:
+            proposal.job_description = proposal.job.text
+            proposal.proposal_text = proposal.compressed_text
+        Proposal.objects.bulk_update(proposals, ['job_description', 'proposal_text'])
+
+    for batch in _batches(CanonicalJob.objects.all()):
+        jobs = list(batch)
+        for job in jobs:
+            job.description = job.compressed_description
+        CanonicalJob.objects.bulk_update(jobs, ['description'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposals', '0008_job_descriptions'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_texts, restore_texts),
+    ]
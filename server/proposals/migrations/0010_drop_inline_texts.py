@@ -0,0 +1,53 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:05
+
+import django.db.models.deletion
+import proposals.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from the data migration: PostgreSQL can't alter a table with pending deferred FK checks
+
+    dependencies = [
+        ('proposals', '0009_move_job_descriptions'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='proposal',
+            name='job_description',
+        ),
+        migrations.RemoveField(
+            model_name='proposal',
+            name='proposal_text',
+        ),
+        migrations.RenameField(
+            model_name='proposal',
+            old_name='compressed_text',
+            new_name='proposal_text',
+        ),
+        migrations.AlterField(
+            model_name='proposal',
+            name='proposal_text',
+            field=proposals.fields.CompressedTextField(),
+        ),
+        migrations.AlterField(
+            model_name='proposal',
+            name='job',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='proposals', to='proposals.jobdescription'),
+        ),
+        migrations.RemoveField(
+            model_name='canonicaljob',
+            name='description',
+        ),
+        migrations.RenameField(
+            model_name='canonicaljob',
+            old_name='compressed_description',
+            new_name='description',
+        ),
+        migrations.AlterField(
+            model_name='canonicaljob',
+            name='description',
+            field=proposals.fields.CompressedTextField(),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposals', '0010_drop_inline_texts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CanonicalJobAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='proposals.canonicaljob')),
+            ],
+        ),
+    ]
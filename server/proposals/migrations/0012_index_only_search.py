@@ -0,0 +1,119 @@
+from django.db import migrations
+
+
+SQLITE_TOKENIZER = 'porter unicode61 remove_diacritics 2'
+
+SQLITE = [
+    'DROP TABLE IF EXISTS proposals_proposal_fts',
+    # AUTOINCREMENT: a rowid whose terms were never removed must not be handed out again
+    "CREATE TABLE proposals_proposal_fts_doc ("
+    " doc_id integer NOT NULL PRIMARY KEY AUTOINCREMENT,"
+    " proposal_id char(32) NOT NULL UNIQUE REFERENCES proposals_proposal (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,"
+    " user_id integer NOT NULL)",
+    'CREATE INDEX proposals_proposal_fts_doc_user ON proposals_proposal_fts_doc (user_id)',
+    "CREATE VIRTUAL TABLE proposals_proposal_fts USING fts5("
+    "job_description, proposal_text, user_feedback, content = '', "
+    f"tokenize = '{SQLITE_TOKENIZER}')",
+]
+
+POSTGRES = [
+    'DROP TABLE IF EXISTS proposals_proposal_search',
+    "CREATE TABLE proposals_proposal_search ("
+    " proposal_id uuid PRIMARY KEY REFERENCES proposals_proposal (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,"
+    " user_id integer NOT NULL,"
+    " document tsvector NOT NULL)",
+    'CREATE INDEX proposals_proposal_search_document ON proposals_proposal_search USING GIN (document)',
+    'CREATE INDEX proposals_proposal_search_user ON proposals_proposal_search (user_id)',
+]
+
+# The tables of 0007, each holding its own copy of the texts
+OLD_SQLITE = [
+    'DROP TABLE IF EXISTS proposals_proposal_fts',
+    'DROP TABLE IF EXISTS proposals_proposal_fts_doc',
+    "CREATE VIRTUAL TABLE proposals_proposal_fts USING fts5("
+    "proposal_id UNINDEXED, user_id UNINDEXED, job_description, proposal_text, user_feedback, "
+    f"tokenize = '{SQLITE_TOKENIZER}')",
+]
+
+OLD_POSTGRES = [
+    'DROP TABLE IF EXISTS proposals_proposal_search',
+    "CREATE TABLE proposals_proposal_search ("
+    " proposal_id uuid PRIMARY KEY REFERENCES proposals_proposal (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,"
+    " user_id integer NOT NULL,"
+    " job_description text NOT NULL DEFAULT '',"
+    " proposal_text text NOT NULL DEFAULT '',"
+    " user_feedback text NOT NULL DEFAULT '',"
+    " document tsvector GENERATED ALWAYS AS ("
+    "  setweight(to_tsvector('english'::regconfig, job_description), 'A') ||"
+    "  setweight(to_tsvector('english'::regconfig, proposal_text), 'B') ||"
+    "  setweight(to_tsvector('english'::regconfig, user_feedback), 'C')"
+    " ) STORED)",
+    'CREATE INDEX proposals_proposal_search_document ON proposals_proposal_search USING GIN (document)',
+    'CREATE INDEX proposals_proposal_search_user ON proposals_proposal_search (user_id)',
+]
+
+
+def _documents(apps):
+    Proposal = apps.get_model('proposals', 'Proposal')
+    proposals = Proposal.objects.select_related('job').only(
+        'id', 'user_id', 'job__text', 'proposal_text', 'user_feedback'
+    )
+    for proposal in proposals.iterator(chunk_size=500):
+        yield proposal, [proposal.job.text or '', proposal.proposal_text or '', proposal.user_feedback or '']
+
+
+def index_only(apps, schema_editor):
+    """Replace the search tables with ones holding only the index, fed from the stored texts"""
+    vendor = schema_editor.connection.vendor
+    for statement in {'sqlite': SQLITE, 'postgresql': POSTGRES}.get(vendor, []):
+        schema_editor.execute(statement)
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for proposal, document in _documents(apps):
+            if vendor == 'sqlite':
+                cursor.execute(
+                    'INSERT INTO proposals_proposal_fts_doc (proposal_id, user_id) VALUES (%s, %s)',
+                    [proposal.pk.hex, proposal.user_id],
+                )
+                cursor.execute(
+                    'INSERT INTO proposals_proposal_fts (rowid, job_description, proposal_text, user_feedback) '
+                    'VALUES (%s, %s, %s, %s)',
+                    [cursor.lastrowid, *document],
+                )
+            else:
+                cursor.execute(
+                    'INSERT INTO proposals_proposal_search (proposal_id, user_id, document) '
+                    "VALUES (%s, %s, setweight(to_tsvector('english', %s), 'A') || "
+                    "setweight(to_tsvector('english', %s), 'B') || setweight(to_tsvector('english', %s), 'C'))",
+                    [str(proposal.pk), proposal.user_id, *document],
+                )
+
+
+def with_copies(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for statement in {'sqlite': OLD_SQLITE, 'postgresql': OLD_POSTGRES}.get(vendor, []):
+        schema_editor.execute(statement)
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+    table = 'proposals_proposal_fts' if vendor == 'sqlite' else 'proposals_proposal_search'
+    with schema_editor.connection.cursor() as cursor:
+        for proposal, document in _documents(apps):
+            proposal_id = proposal.pk.hex if vendor == 'sqlite' else str(proposal.pk)
+            cursor.execute(
+                f'INSERT INTO {table} (proposal_id, user_id, job_description, proposal_text, user_feedback) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [proposal_id, proposal.user_id, *document],
+            )
+
+
+class Migration(migrations.Migration):
+    """Search tables without their own copy of the texts (see proposals/search.py)"""
+
+    dependencies = [
+        ('proposals', '0011_canonical_job_aliases'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_only, with_copies),
+    ]
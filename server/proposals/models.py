@@ -1,8 +1,11 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from core.models import FreelancerProfile
 from django.contrib.auth.models import User
+import hashlib
 import uuid
 
+from .fields import CompressedTextField
+
 
 PROPOSAL_STATUS = (
     ('generated', 'Generated'),
@@ -21,14 +24,89 @@ PROPOSAL_STYLES = (
     ('technical', 'Technical'),
 )
 
+# Characters of the large texts kept uncompressed for list items
+PREVIEW_LENGTH = 300
+
+
+class JobDescription(models.Model):
+    """
+    One row per distinct job description text, shared by every proposal
+    written for it (regenerations and humanized versions included). A row
+    goes with the last proposal using it (see delete_unused).
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    text = CompressedTextField()
+    # Uncompressed start of the text, so lists never load the text itself
+    preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def hash_text(text):
+        """The content_hash of a text, for looking it up in SQL"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def for_text(cls, text):
+        """
+        The row holding this exact text, created if needed
+
+        Called inside a transaction: an existing row stays locked until it
+        ends, so delete_unused can't remove it before the proposal using it
+        is saved (where the database supports row locks).
+        """
+        content_hash = cls.hash_text(text)
+        job = cls.objects.select_for_update().filter(content_hash=content_hash).first()
+        if job is None:
+            job, _ = cls.objects.get_or_create(
+                content_hash=content_hash,
+                defaults={'text': text, 'preview': text[:PREVIEW_LENGTH]},
+            )
+        return job
+
+    @classmethod
+    def delete_unused(cls, ids=None):
+        """
+        Delete rows no proposal points at
+
+        Args:
+            ids: Only consider these rows (default: all)
+
+        Returns:
+            int: Rows deleted
+        """
+        rows = cls.objects.filter(proposals__isnull=True)
+        if ids is not None:
+            rows = rows.filter(pk__in=ids)
+        try:
+            with transaction.atomic():
+                deleted, _ = rows.delete()
+        except (models.ProtectedError, IntegrityError):
+            # A proposal took one of the rows meanwhile; the rest go next time
+            return 0
+        return deleted
+
+    def __str__(self):
+        return f"Job description {self.content_hash[:12]} - {self.preview[:30]}"
+
 
 class Proposal(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    job_description = models.TextField()
+    # Read and written through the job_description property, which is not a
+    # column: query through this relation instead, with
+    #   job__content_hash=JobDescription.hash_text(text)  exact text match
+    #   job__preview                                       prefix lookups, ordering, values()
+    #   select_related('job') / only('job__text')          loading the text itself
+    # The text is compressed (proposals/fields.py), so SQL can't match inside it;
+    # full-text queries go through proposals/search.py.
+    job = models.ForeignKey(JobDescription, on_delete=models.PROTECT, related_name='proposals')
     job_details = models.JSONField(default=dict, blank=True, null=True)
 
-    proposal_text = models.TextField()
+    proposal_text = CompressedTextField()
+    # Derived from proposal_text on save, for list items
+    proposal_text_preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True, default='', editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
     status = models.CharField(max_length=20, default='generated', choices=PROPOSAL_STATUS)
     style = models.CharField(max_length=20, default='default', choices=PROPOSAL_STYLES)
 
@@ -37,9 +115,119 @@ class Proposal(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Newest-first listing, keyset pagination and date-range counts
+            models.Index(fields=['user', 'created_at', 'id'], name='proposal_user_created_idx'),
+            # Status counts and status-filtered listing
+            models.Index(fields=['user', 'status', 'created_at'], name='proposal_user_status_idx'),
+        ]
+
+    # A job description assigned since the last save, resolved to its JobDescription row on save
+    _job_description = None
+
+    @property
+    def job_description(self):
+        """The job description text"""
+        if self._job_description is not None:
+            return self._job_description
+        return self.job.text if self.job_id else ''
+
+    @job_description.setter
+    def job_description(self, text):
+        self._job_description = text or ''
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'job_description' in update_fields:
+                update_fields = (update_fields - {'job_description'}) | {'job'}
+            if 'proposal_text' in update_fields:
+                update_fields |= {'proposal_text_preview', 'word_count'}
+            kwargs['update_fields'] = update_fields
+        previous_job_id = self.job_id
+        job_text, self._job_description = self._job_description, None
+        text = self.proposal_text or ''
+        self.proposal_text_preview = text[:PREVIEW_LENGTH]
+        self.word_count = len(text.split())
+        adding = self._state.adding
+        try:
+            with transaction.atomic():
+                if job_text is not None:
+                    self.job = JobDescription.for_text(job_text)
+                super().save(*args, **kwargs)
+        except IntegrityError:
+            if job_text is None:
+                raise
+            # The job description was deleted between the lookup and the insert
+            # (delete_unused; SQLite has no row locks): resolve it again, once
+            self._state.adding = adding
+            with transaction.atomic():
+                self.job = JobDescription.for_text(job_text)
+                super().save(*args, **kwargs)
+        if job_text is not None and previous_job_id not in (None, self.job_id):
+            transaction.on_commit(lambda: JobDescription.delete_unused([previous_job_id]))
 
     def __str__(self):
         return f"Proposal for {self.user.username} - {self.style} style - {self.job_description[:30]}"
     
     
 
+
+
+class FreelancerContextSnapshot(models.Model):
+    """
+    Precomputed freelancer block used in every prompt (see proposals/context.py).
+    `version` is bumped whenever the profile, projects or experience change.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    version = models.PositiveIntegerField(default=1)
+    context = models.TextField(blank=True, default='')
+    # Structured profile/projects/experience used for per-job context selection
+    data = models.JSONField(default=dict, blank=True)
+    is_stale = models.BooleanField(default=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Context for {self.user.username} - v{self.version}"
+
+
+class CanonicalJob(models.Model):
+    """
+    One record per distinct job posting, shared by every user who pastes it
+    (see proposals/job_fingerprint.py). Near-duplicates resolve to the same
+    record through their MinHash signature.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    minhash = models.JSONField(default=list)
+    description = CompressedTextField()
+
+    # Job-only analyses shared across users
+    pain_points = models.JSONField(blank=True, null=True)
+
+    seen_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Job {self.content_hash[:12]} - seen {self.seen_count}x - {self.description[:30]}"
+
+
+class CanonicalJobBand(models.Model):
+    """LSH band of a CanonicalJob's MinHash signature, indexed for candidate lookup"""
+    job = models.ForeignKey(CanonicalJob, on_delete=models.CASCADE, related_name='bands')
+    band = models.PositiveSmallIntegerField()
+    value = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'value']),
+        ]
+
+
+class CanonicalJobAlias(models.Model):
+    """Content hash of a near-duplicate variant, so re-pastes of it resolve without MinHash"""
+    job = models.ForeignKey(CanonicalJob, on_delete=models.CASCADE, related_name='aliases')
+    content_hash = models.CharField(max_length=64, unique=True)
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.db import connection
+from .models import Proposal
+from .job_match import aanalyze_job_match, analyze_job_match, parse_job_match
+from .utils import (
+    get_freelancer_context, analyze_client_pain_points, generate_targeted_proposal, humanize_proposal,
+    aanalyze_client_pain_points, agenerate_targeted_proposal, ahumanize_proposal,
+)
+
+
+def _timed(timings, stage, func, *args, **kwargs):
+    """Run one pipeline stage and record its wall-clock time in milliseconds"""
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        timings[stage] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _atimed(timings, stage, func, *args, **kwargs):
+    """Async counterpart of _timed for a coroutine function"""
+    started = time.perf_counter()
+    try:
+        return await func(*args, **kwargs)
+    finally:
+        timings[stage] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _in_thread(timings, stage, func, *args):
+    """
+    Run a stage in a worker thread
+
+    Each thread gets its own DB connection (the analyses hit the LLM cache),
+    so close it here instead of leaking it until the thread dies.
+    """
+    try:
+        return _timed(timings, stage, func, *args)
+    finally:
+        connection.close()
+
+
+def run_proposal_pipeline(user, job_description, style='default'):
+    """
+    Run the full proposal flow server-side in one call
+
+    Job match and pain-point analysis are independent, so they run
+    concurrently; their results then feed generation and humanization.
+    A single Proposal is saved with the intermediate artifacts in job_details.
+
+    Args:
+        user: The user object for whom to generate the proposal
+        job_description: The job description text
+        style: The style of proposal to generate
+
+    Returns:
+        dict: proposal, job_match, pain_points, context_tokens (selection
+              savings) and per-stage timings (ms),
+              or {'error': ..., 'timings': ...} if a required stage failed
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    # Build the freelancer context once and share it with every stage
+    freelancer_context = _timed(timings, 'freelancer_data', get_freelancer_context, user, job_description)
+    if not freelancer_context:
+        return {'error': 'Freelancer profile not found', 'timings': timings}
+    freelancer_data = freelancer_context.pop('context')
+
+    # Stage 1: job match and pain points in parallel
+    analysis_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        job_match_future = executor.submit(
+            _in_thread, timings, 'job_match', analyze_job_match, user, job_description, freelancer_data
+        )
+        pain_points_future = executor.submit(
+            _in_thread, timings, 'pain_points', analyze_client_pain_points, job_description
+        )
+        job_match = parse_job_match(job_match_future.result())
+        pain_points_result = pain_points_future.result()
+    timings['analysis'] = round((time.perf_counter() - analysis_started) * 1000, 1)
+
+    if 'error' in pain_points_result:
+        return {'error': pain_points_result['error'], 'timings': timings}
+    pain_points = pain_points_result.get('pain_points', [])
+
+    # A failed job match is not fatal: we only lose the positioning strategy
+    strategy = '' if 'error' in job_match else job_match.get('strategy', '')
+
+    # Stage 2: generate the draft
+    draft = _timed(
+        timings, 'generate', generate_targeted_proposal,
+        user, job_description, pain_points, style, strategy, freelancer_data
+    )
+    if not draft or draft.startswith('Error'):
+        return {'error': draft or 'Failed to generate proposal', 'timings': timings}
+
+    # Stage 3: humanize (falls back to the draft on failure, except when rate limited)
+    proposal_text = _timed(timings, 'humanize', humanize_proposal, draft)
+
+    proposal = _timed(
+        timings, 'persist', Proposal.objects.create,
+        user=user,
+        job_description=job_description,
+        proposal_text=proposal_text,
+        style=style,
+        job_details={
+            'job_match': job_match,
+            'pain_points': pain_points,
+            'draft': draft,
+            'context_tokens': freelancer_context,
+            'timings': dict(timings),
+        }
+    )
+
+    timings['total'] = round((time.perf_counter() - started) * 1000, 1)
+
+    return {
+        'proposal': proposal,
+        'job_match': job_match,
+        'pain_points': pain_points,
+        'context_tokens': freelancer_context,
+        'timings': timings,
+    }
+
+
+async def arun_proposal_pipeline(user, job_description, style='default'):
+    """Async variant of run_proposal_pipeline: the two analyses run as concurrent coroutines"""
+    timings = {}
+    started = time.perf_counter()
+
+    freelancer_context = await _atimed(
+        timings, 'freelancer_data', sync_to_async(get_freelancer_context), user, job_description
+    )
+    if not freelancer_context:
+        return {'error': 'Freelancer profile not found', 'timings': timings}
+    freelancer_data = freelancer_context.pop('context')
+
+    analysis_started = time.perf_counter()
+    job_match, pain_points_result = await asyncio.gather(
+        _atimed(timings, 'job_match', aanalyze_job_match, user, job_description, freelancer_data),
+        _atimed(timings, 'pain_points', aanalyze_client_pain_points, job_description),
+    )
+    job_match = parse_job_match(job_match)
+    timings['analysis'] = round((time.perf_counter() - analysis_started) * 1000, 1)
+
+    if 'error' in pain_points_result:
+        return {'error': pain_points_result['error'], 'timings': timings}
+    pain_points = pain_points_result.get('pain_points', [])
+    strategy = '' if 'error' in job_match else job_match.get('strategy', '')
+
+    draft = await _atimed(
+        timings, 'generate', agenerate_targeted_proposal,
+        user, job_description, pain_points, style, strategy, freelancer_data
+    )
+    if not draft or draft.startswith('Error'):
+        return {'error': draft or 'Failed to generate proposal', 'timings': timings}
+
+    proposal_text = await _atimed(timings, 'humanize', ahumanize_proposal, draft)
+
+    proposal = await _atimed(
+        timings, 'persist', Proposal.objects.acreate,
+        user=user,
+        job_description=job_description,
+        proposal_text=proposal_text,
+        style=style,
+        job_details={
+            'job_match': job_match,
+            'pain_points': pain_points,
+            'draft': draft,
+            'context_tokens': freelancer_context,
+            'timings': dict(timings),
+        }
+    )
+
+    timings['total'] = round((time.perf_counter() - started) * 1000, 1)
+
+    return {
+        'proposal': proposal,
+        'job_match': job_match,
+        'pain_points': pain_points,
+        'context_tokens': freelancer_context,
+        'timings': timings,
+    }
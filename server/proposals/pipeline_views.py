@@ -0,0 +1,62 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from core.circuit_breaker import LLMUnavailableError, unavailable_response
+from core.rate_limit import LLMRateLimitError, throttled_response
+from .serializer import ProposalSerializer
+from .pipeline import run_proposal_pipeline
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def proposal_pipeline_api(request):
+    """
+    Run job match, pain-point analysis, generation and humanization in one request
+    
+    Request body:
+        job_description: The job description text
+        style: (optional) The style of proposal to generate
+    """
+    try:
+        # Get data from request
+        data = request.data
+        job_description = data.get('job_description', '')
+        style = data.get('style', 'default')
+        
+        # Validate input
+        if not job_description:
+            return Response({
+                'status': 'error',
+                'message': 'Job description is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = run_proposal_pipeline(request.user, job_description, style)
+        
+        # Check if there was an error
+        if 'error' in result:
+            return Response({
+                'status': 'error',
+                'message': result['error'],
+                'timings': result['timings']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'status': 'success',
+            'proposal': ProposalSerializer(result['proposal']).data,
+            'job_match': result['job_match'],
+            'pain_points': result['pain_points'],
+            'context_tokens': result['context_tokens'],
+            'timings': result['timings']
+        }, status=status.HTTP_201_CREATED)
+            
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+            
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
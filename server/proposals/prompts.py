@@ -1,17 +1,58 @@
 # High-Converting Proposal Generation Prompt
 
+FREELANCER_BLOCK = """## FREELANCER DATA
+{freelancer_data}
+"""
+
+JOB_BLOCK = """## JOB DESCRIPTION
+{job_description}
+"""
+
+
 class ProposalPrompt:
-    """Base class for proposal prompts"""
+    """
+    Base class for proposal prompts
+    
+    The prompt is laid out as static instructions, then the freelancer block,
+    then the job block. The instructions never contain per-request data, so
+    every request of a style starts with the same bytes and hits the
+    provider's prompt cache. That system message is the only shared prefix:
+    the freelancer block holds the projects and experience selected for the
+    job (proposals/context_selection.py), so it changes from job to job.
+    """
     
     def __init__(self):
-        self.prompt_template = """"""
+        self.instructions = """"""
     
     def get_prompt(self, freelancer_data, job_description):
         """Return the formatted prompt with freelancer data and job description"""
-        return self.prompt_template.format(
-            freelancer_data=freelancer_data,
-            job_description=job_description
+        return (
+            self.instructions
+            + "\n" + FREELANCER_BLOCK.format(freelancer_data=freelancer_data)
+            + "\n" + JOB_BLOCK.format(job_description=job_description)
         )
+    
+    def get_messages(self, freelancer_data, job_description, extra_sections='', system_prompt=None):
+        """
+        Return the prompt as chat messages in cache-friendly order
+        
+        Args:
+            freelancer_data: Formatted freelancer data (selected per job)
+            job_description: The job description text
+            extra_sections: (optional) Per-request sections appended after the job block
+            system_prompt: (optional) Static system message sent ahead of the instructions
+            
+        Returns:
+            list: [system prompt, static instructions, freelancer block, job block + extra sections]
+        """
+        messages = [
+            {"role": "system", "content": self.instructions},
+            {"role": "user", "content": FREELANCER_BLOCK.format(freelancer_data=freelancer_data)},
+            {"role": "user", "content": JOB_BLOCK.format(job_description=job_description) + extra_sections},
+        ]
+        if system_prompt:
+            messages.insert(0, {"role": "system", "content": system_prompt})
+        return messages
 
 
 class WinningProposalPrompt(ProposalPrompt):
@@ -19,7 +60,7 @@ class WinningProposalPrompt(ProposalPrompt):
     
     def __init__(self):
         super().__init__()
-        self.prompt_template = """
+        self.instructions = """
 # WINNING PROPOSAL GENERATION SYSTEM
 
 ## CRITICAL INSTRUCTIONS
@@ -77,12 +118,6 @@ You are an expert proposal writer with a 90% success rate on freelance platforms
 - Sound confident but NOT arrogant - focus on the client's needs, not yourself
 - Avoid clichés, jargon, and generic statements that don't add value
 - Do NOT invent or fabricate any information not present in the provided data
-
-## FREELANCER DATA
-{freelancer_data}
-
-## JOB DESCRIPTION
-{job_description}
 """
 
 
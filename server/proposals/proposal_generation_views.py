@@ -2,6 +2,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from core.circuit_breaker import LLMUnavailableError, unavailable_response
+from core.rate_limit import LLMRateLimitError, throttled_response
 from .models import Proposal
 import json
 from .utils import analyze_client_pain_points, generate_targeted_proposal, humanize_proposal
@@ -42,6 +44,11 @@ def analyze_pain_points_api(request):
             'analysis': analysis_result
         }, status=status.HTTP_200_OK)
             
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+            
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
     except Exception as e:
         return Response({
             'status': 'error',
@@ -97,6 +104,11 @@ def generate_targeted_proposal_api(request):
             'proposal': proposal_text
         }, status=status.HTTP_200_OK)
             
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+            
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
     except Exception as e:
         return Response({
             'status': 'error',
@@ -142,6 +154,11 @@ def humanize_proposal_api(request):
             'proposal_id': proposal.id
         }, status=status.HTTP_200_OK)
             
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+            
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
     except Exception as e:
         return Response({
             'status': 'error',
@@ -0,0 +1,317 @@
+"""
+Full-text search over a user's proposals.
+
+Job description, proposal text and feedback are indexed per proposal in a
+backend-specific table (created by migration 0007, made index-only by 0012):
+
+    SQLite      proposals_proposal_fts, a contentless FTS5 table (porter
+                stemming) ranked with bm25; proposals_proposal_fts_doc maps
+                its integer rowids to proposals and users
+    PostgreSQL  proposals_proposal_search, a weighted tsvector per proposal
+                with a GIN index, ranked with ts_rank_cd
+
+Neither keeps a copy of the texts: they are stored once, compressed, in
+proposals and job descriptions (see proposals/fields.py), and the index is
+fed from there. Snippets are cut from those rows for the page of results
+only, by the same tokenizer (a temporary FTS5 table, ts_headline).
+
+Signals (proposals/signals.py) drop a proposal's document before it is
+changed or deleted and index it again once it is saved. A contentless FTS5
+table can only forget a document given the texts it indexed, which is why
+the old document goes before the save rather than after it. Should a
+document be missed (queryset updates bypass signals), the proposal gets a
+fresh rowid and the stale terms are unreachable until
+``manage.py rebuild_search_index`` recomputes the whole index. Other
+databases fall back to a case-insensitive substring match over the user's
+proposals in Python, newest first.
+
+Matches are ranked job description first, then proposal text, then
+feedback. Every word of the query must match; the last word also matches
+as a prefix, so results keep up while the user is still typing.
+"""
+import html
+import re
+import uuid
+
+from django.db import DatabaseError, connection, transaction
+
+from .listing import with_previews
+from .models import Proposal
+
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+# Marks matched terms in snippets; replaced with <mark> after the text is HTML-escaped
+_START, _STOP = '\x02', '\x03'
+
+SQLITE_TABLE = 'proposals_proposal_fts'
+SQLITE_DOCS = 'proposals_proposal_fts_doc'
+# Per-connection scratch table the snippets of a page are cut from
+SQLITE_SNIPPETS = 'proposals_proposal_snippet'
+SQLITE_TOKENIZER = 'porter unicode61 remove_diacritics 2'
+POSTGRES_TABLE = 'proposals_proposal_search'
+# Column weights (job description, proposal text, feedback)
+SQLITE_WEIGHTS = (3.0, 2.0, 1.0)
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def _words(query):
+    return _WORD.findall(query or '')[:16]
+
+
+def _backend():
+    return connection.vendor if connection.vendor in ('sqlite', 'postgresql') else None
+
+
+def _with_texts(queryset):
+    return queryset.select_related('job').only('id', 'user_id', 'job', 'job__text', 'proposal_text', 'user_feedback')
+
+
+def _document(proposal):
+    return [
+        proposal.job_description or '',
+        proposal.proposal_text or '',
+        proposal.user_feedback or '',
+    ]
+
+
+def index_proposal(proposal):
+    """Add a saved proposal's search document"""
+    backend = _backend()
+    if backend is None:
+        return
+    document = _document(proposal)
+    with connection.cursor() as cursor:
+        if backend == 'sqlite':
+            # A document still mapped here was not removed before the change:
+            # unmapping it leaves its terms unreachable until the next rebuild
+            cursor.execute(f'DELETE FROM {SQLITE_DOCS} WHERE proposal_id = %s', [proposal.pk.hex])
+            cursor.execute(
+                f'INSERT INTO {SQLITE_DOCS} (proposal_id, user_id) VALUES (%s, %s)',
+                [proposal.pk.hex, proposal.user_id],
+            )
+            cursor.execute(
+                f'INSERT INTO {SQLITE_TABLE} (rowid, job_description, proposal_text, user_feedback) '
+                'VALUES (%s, %s, %s, %s)',
+                [cursor.lastrowid, *document],
+            )
+        else:
+            cursor.execute(
+                f'INSERT INTO {POSTGRES_TABLE} (proposal_id, user_id, document) '
+                "VALUES (%s, %s, setweight(to_tsvector('english', %s), 'A') || "
+                "setweight(to_tsvector('english', %s), 'B') || setweight(to_tsvector('english', %s), 'C')) "
+                'ON CONFLICT (proposal_id) DO UPDATE SET user_id = EXCLUDED.user_id, document = EXCLUDED.document',
+                [str(proposal.pk), proposal.user_id, *document],
+            )
+
+
+def remove_proposal(proposal_id):
+    """Drop a proposal's search document, before the proposal is changed or deleted"""
+    backend = _backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        if backend == 'postgresql':
+            cursor.execute(f'DELETE FROM {POSTGRES_TABLE} WHERE proposal_id = %s', [str(proposal_id)])
+            return
+        cursor.execute(f'SELECT doc_id FROM {SQLITE_DOCS} WHERE proposal_id = %s', [proposal_id.hex])
+        row = cursor.fetchone()
+        if row is None:
+            return
+        proposal = _with_texts(Proposal.objects.filter(pk=proposal_id)).first()
+        if proposal is not None:
+            # FTS5 removes a contentless document's terms given the texts it indexed
+            cursor.execute(
+                f"INSERT INTO {SQLITE_TABLE} ({SQLITE_TABLE}, rowid, job_description, proposal_text, user_feedback) "
+                "VALUES ('delete', %s, %s, %s, %s)",
+                [row[0], *_document(proposal)],
+            )
+        cursor.execute(f'DELETE FROM {SQLITE_DOCS} WHERE doc_id = %s', [row[0]])
+
+
+def sync_proposal(proposal=None, removed_id=None):
+    """
+    Keep the index in step with one write, without ever failing the write
+
+    Args:
+        proposal: The saved proposal
+        removed_id: Or the id of a proposal about to be changed or deleted
+    """
+    try:
+        # A savepoint, so a failure here never breaks the caller's transaction
+        with transaction.atomic():
+            if proposal is not None:
+                index_proposal(proposal)
+            else:
+                remove_proposal(removed_id)
+    except DatabaseError as e:
+        # The document is stale until the next `manage.py rebuild_search_index`
+        print(f"Error updating search index: {str(e)}")
+
+
+def rebuild_index():
+    """
+    Recompute every search document from the proposals table
+
+    Returns:
+        int: Documents indexed
+    """
+    backend = _backend()
+    if backend is None:
+        return 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if backend == 'sqlite':
+                cursor.execute(f"INSERT INTO {SQLITE_TABLE} ({SQLITE_TABLE}) VALUES ('delete-all')")
+                cursor.execute(f'DELETE FROM {SQLITE_DOCS}')
+            else:
+                cursor.execute(f'DELETE FROM {POSTGRES_TABLE}')
+        count = 0
+        for proposal in _with_texts(Proposal.objects.all()).iterator(chunk_size=500):
+            index_proposal(proposal)
+            count += 1
+    return count
+
+
+def _sqlite_query(words):
+    # Quoted terms, so user input can never be read as FTS5 syntax
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _postgres_query(words):
+    terms = [f"'{word}'" for word in words]
+    terms[-1] += ':*'
+    return ' & '.join(terms)
+
+
+def _search_sqlite(user, words, limit, offset):
+    weights = ', '.join(str(weight) for weight in SQLITE_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT doc.proposal_id, bm25({SQLITE_TABLE}, {weights}) AS rank '
+            f'FROM {SQLITE_TABLE} JOIN {SQLITE_DOCS} doc ON doc.doc_id = {SQLITE_TABLE}.rowid '
+            f'WHERE {SQLITE_TABLE} MATCH %s AND doc.user_id = %s '
+            'ORDER BY rank LIMIT %s OFFSET %s',
+            [_sqlite_query(words), user.pk, limit, offset],
+        )
+        # bm25 is lower-is-better; report higher-is-better like Postgres
+        return [(uuid.UUID(proposal_id), -rank) for proposal_id, rank in cursor.fetchall()]
+
+
+def _search_postgres(user, words, limit, offset):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT proposal_id, ts_rank_cd(document, query) AS rank '
+            f"FROM {POSTGRES_TABLE}, to_tsquery('english', %s) AS query "
+            'WHERE user_id = %s AND document @@ query '
+            'ORDER BY rank DESC, proposal_id LIMIT %s OFFSET %s',
+            [_postgres_query(words), user.pk, limit, offset],
+        )
+        return cursor.fetchall()
+
+
+def _search_fallback(user, words, limit, offset):
+    # The texts are compressed at rest, so they are matched after decompression
+    words = [word.lower() for word in words]
+    ids = []
+    proposals = _with_texts(Proposal.objects.filter(user=user)).order_by('-created_at', '-id')
+    for proposal in proposals.iterator(chunk_size=200):
+        text = ' '.join(_document(proposal)).lower()
+        if all(word in text for word in words):
+            ids.append(proposal.pk)
+            if len(ids) == offset + limit:
+                break
+    return [(proposal_id, None) for proposal_id in ids[offset:]]
+
+
+def _snippets_sqlite(words, documents):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS temp.{SQLITE_SNIPPETS} USING fts5('
+            f"job_description, proposal_text, user_feedback, tokenize = '{SQLITE_TOKENIZER}')"
+        )
+        try:
+            for rowid, document in enumerate(documents):
+                cursor.execute(
+                    f'INSERT INTO {SQLITE_SNIPPETS} (rowid, job_description, proposal_text, user_feedback) '
+                    'VALUES (%s, %s, %s, %s)',
+                    [rowid, *document],
+                )
+            cursor.execute(
+                f"SELECT rowid, snippet({SQLITE_SNIPPETS}, -1, %s, %s, '…', 24) "
+                f'FROM {SQLITE_SNIPPETS} WHERE {SQLITE_SNIPPETS} MATCH %s',
+                [_START, _STOP, _sqlite_query(words)],
+            )
+            return dict(cursor.fetchall())
+        finally:
+            cursor.execute(f'DELETE FROM {SQLITE_SNIPPETS}')
+
+
+def _snippets_postgres(words, documents):
+    options = f'StartSel="{_START}", StopSel="{_STOP}", MaxWords=30, MinWords=12, MaxFragments=2, FragmentDelimiter=" … "'
+    texts = [' … '.join(text for text in document if text) for document in documents]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT page.position - 1, ts_headline('english', page.text, to_tsquery('english', %s), %s) "
+            'FROM unnest(%s::text[]) WITH ORDINALITY AS page (text, position)',
+            [_postgres_query(words), options, texts],
+        )
+        return dict(cursor.fetchall())
+
+
+def _snippets(words, proposal_ids):
+    """Highlighted excerpts of the given proposals, cut from their stored texts"""
+    snippets = {'sqlite': _snippets_sqlite, 'postgresql': _snippets_postgres}.get(_backend())
+    if snippets is None or not proposal_ids:
+        return {}
+    proposals = list(_with_texts(Proposal.objects.filter(id__in=proposal_ids)))
+    by_position = snippets(words, [_document(proposal) for proposal in proposals])
+    return {proposal.pk: by_position.get(position) for position, proposal in enumerate(proposals)}
+
+
+def _highlight(snippet):
+    """HTML-escape a snippet and wrap the matched terms in <mark>"""
+    if not snippet:
+        return snippet
+    return html.escape(snippet).replace(_START, '<mark>').replace(_STOP, '</mark>')
+
+
+def search_proposals(user, query, page=1, limit=PAGE_SIZE):
+    """
+    Search the user's proposals
+
+    Args:
+        user: The user whose proposals to search
+        query: Free text; every word must match
+        page: 1-based page number
+        limit: Results per page (at most MAX_PAGE_SIZE)
+
+    Returns:
+        dict: results (list of (Proposal with list previews, rank, snippet)),
+              has_more; an empty query matches nothing
+    """
+    words = _words(query)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    page = max(1, page)
+    if not words:
+        return {'results': [], 'has_more': False}
+
+    search = {'sqlite': _search_sqlite, 'postgresql': _search_postgres}.get(_backend(), _search_fallback)
+    # One extra hit tells whether there is another page
+    hits = search(user, words, limit + 1, (page - 1) * limit)
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+
+    proposal_ids = [proposal_id for proposal_id, _ in hits]
+    proposals = with_previews(Proposal.objects.filter(user=user, id__in=proposal_ids))
+    by_id = {proposal.id: proposal for proposal in proposals}
+    snippets = _snippets(words, list(by_id))
+    results = [
+        (by_id[proposal_id], rank, _highlight(snippets.get(proposal_id)))
+        for proposal_id, rank in hits
+        if proposal_id in by_id
+    ]
+    return {'results': results, 'has_more': has_more}
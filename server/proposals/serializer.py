@@ -5,10 +5,12 @@ from core.serializer import UserSerializer
 
 class ProposalSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    job_description = serializers.CharField()
     
     class Meta:
         model = Proposal
-        fields = '__all__'
+        # The job reference and derived list columns stay internal
+        exclude = ('job', 'proposal_text_preview', 'word_count')
         read_only_fields = ('id', 'created_at', 'updated_at')
 
 
@@ -16,4 +18,28 @@ class ProposalUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Proposal
         fields = ('status', 'proposal_text', 'user_feedback')
-        read_only_fields = ('id', 'user', 'job_description', 'job_details', 'style', 'created_at', 'updated_at')
\ No newline at end of file
+        read_only_fields = ('id', 'user', 'job_description', 'job_details', 'style', 'created_at', 'updated_at')
+
+class ProposalListSerializer(serializers.ModelSerializer):
+    """List item: previews instead of the large text columns (see listing.list_proposals)"""
+    user = UserSerializer(read_only=True)
+    job_description = serializers.CharField(source='job_description_preview', read_only=True)
+    proposal_preview = serializers.CharField(read_only=True)
+    word_count = serializers.IntegerField(read_only=True)
+    has_feedback = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Proposal
+        fields = ('id', 'user', 'job_description', 'proposal_preview', 'word_count', 'has_feedback',
+                  'status', 'style', 'created_at', 'updated_at')
+        read_only_fields = fields
+
+
+class ProposalSearchResultSerializer(ProposalListSerializer):
+    """List item plus the search rank and a highlighted excerpt (see search.search_proposals)"""
+    rank = serializers.FloatField(read_only=True, allow_null=True)
+    snippet = serializers.CharField(read_only=True, allow_null=True)
+
+    class Meta(ProposalListSerializer.Meta):
+        fields = ProposalListSerializer.Meta.fields + ('rank', 'snippet')
+        read_only_fields = fields
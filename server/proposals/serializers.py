@@ -6,6 +6,7 @@ class ProposalSerializer(serializers.ModelSerializer):
     """Serializer for Proposal model"""
     
     username = serializers.SerializerMethodField()
+    job_description = serializers.CharField()
     
     class Meta:
         model = Proposal
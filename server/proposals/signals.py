@@ -0,0 +1,49 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.db import transaction
+from django.dispatch import receiver
+from core.models import FreelancerProfile, Projects, Experience
+from .context import invalidate_context
+from .models import JobDescription, Proposal
+from .search import sync_proposal
+
+SEARCH_FIELDS = {'user', 'job', 'proposal_text', 'user_feedback'}
+
+
+@receiver([post_save, post_delete], sender=FreelancerProfile)
+@receiver([post_save, post_delete], sender=Projects)
+@receiver([post_save, post_delete], sender=Experience)
+def invalidate_freelancer_context(sender, instance, **kwargs):
+    """Any change to the data behind get_freelancer_data makes the snapshot stale"""
+    invalidate_context(instance.user_id)
+
+
+def _changes_search_text(update_fields):
+    return update_fields is None or bool(SEARCH_FIELDS & set(update_fields))
+
+
+@receiver(pre_save, sender=Proposal)
+def unindex_changed_proposal(sender, instance, update_fields=None, **kwargs):
+    """The index forgets a document by its old texts, so drop it while they are still stored"""
+    if not instance._state.adding and _changes_search_text(update_fields):
+        sync_proposal(removed_id=instance.pk)
+
+
+@receiver(post_save, sender=Proposal)
+def index_proposal_text(sender, instance, update_fields=None, **kwargs):
+    """Keep the proposal's full-text search document current"""
+    if _changes_search_text(update_fields):
+        sync_proposal(instance)
+
+
+@receiver(pre_delete, sender=Proposal)
+def remove_proposal_text(sender, instance, **kwargs):
+    sync_proposal(removed_id=instance.pk)
+
+
+@receiver(post_delete, sender=Proposal)
+def delete_unused_job_description(sender, instance, **kwargs):
+    """Job descriptions are shared between proposals, so the last one to go takes it along"""
+    # After commit, so the delete runs in a transaction of its own and a
+    # proposal saved for the row meanwhile only makes it fail (see delete_unused)
+    job_id = instance.job_id
+    transaction.on_commit(lambda: JobDescription.delete_unused([job_id]))
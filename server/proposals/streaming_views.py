@@ -0,0 +1,233 @@
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from django.http import StreamingHttpResponse
+from core.circuit_breaker import LLMUnavailableError, unavailable_response
+from core.rate_limit import LLMRateLimitError, throttled_response
+from .models import Proposal
+from .serializer import ProposalSerializer
+from .utils import stream_proposal, stream_targeted_proposal, stream_humanized_proposal
+import itertools
+import json
+
+
+def _sse(event, data):
+    """Format a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets clients send `Accept: text/event-stream`.
+    Regular Responses (validation errors) are rendered as a single `error` event.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return _sse('error', data).encode(self.charset)
+
+
+def _event_stream(chunks, on_complete):
+    """
+    Forward text deltas as `token` events, then emit one `done` event
+
+    Args:
+        chunks: Iterator of text deltas from the LLM
+        on_complete: Called with the full text once the stream finishes; returns the `done` payload
+    """
+    parts = []
+    try:
+        for delta in chunks:
+            parts.append(delta)
+            yield _sse('token', {'delta': delta})
+        yield _sse('done', on_complete(''.join(parts)))
+    except Exception as e:
+        print(f"Error in proposal stream: {str(e)}")
+        yield _sse('error', {
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        })
+
+
+def _streaming_response(chunks, on_complete):
+    """
+    Start the event stream, or answer with a plain error response
+
+    The first delta is pulled before the response starts: the circuit breaker
+    and rate limiter only run once the lazy stream is iterated, and an open
+    circuit or exhausted budget must still get its 503/429 and Retry-After.
+    """
+    try:
+        first = next(chunks)
+    except StopIteration:
+        chunks = iter(())
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
+    except Exception as e:
+        print(f"Error in proposal stream: {str(e)}")
+        return Response({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    else:
+        chunks = itertools.chain([first], chunks)
+
+    response = StreamingHttpResponse(_event_stream(chunks, on_complete), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def create_proposal_stream(request):
+    """
+    Streaming variant of create_proposal (Server-Sent Events)
+
+    Request body:
+        job_description: The job description text
+        style: (optional) The style of proposal to generate
+
+    Events:
+        token: {"delta": "..."} for every chunk of generated text
+        done: {"status": "success", "proposal": {...}} once the proposal is saved
+        error: {"status": "error", "message": "..."}
+
+    An open circuit or exhausted rate limit is answered before the stream
+    starts, with 503/429 and Retry-After like the other endpoints.
+    """
+    data = request.data
+    job_description = data.get('job_description', '')
+    style = data.get('style', 'default')
+
+    # Validate input
+    if not job_description:
+        return Response({
+            'status': 'error',
+            'message': 'Job description is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    chunks = stream_proposal(request.user, job_description, style)
+    if chunks is None:
+        return Response({
+            'status': 'error',
+            'message': 'Failed to generate proposal'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def on_complete(proposal_text):
+        proposal = Proposal.objects.create(
+            user=request.user,
+            job_description=job_description,
+            proposal_text=proposal_text,
+            style=style
+        )
+        return {
+            'status': 'success',
+            'message': 'Proposal generated successfully',
+            'proposal': ProposalSerializer(proposal).data
+        }
+
+    return _streaming_response(chunks, on_complete)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def generate_targeted_proposal_stream(request):
+    """
+    Streaming variant of generate_targeted_proposal_api (Server-Sent Events)
+
+    Like the non-streaming endpoint this is an intermediate step and does not
+    save a Proposal; the humanize step does.
+
+    Request body:
+        job_description: The job description text
+        pain_points: The pain points analysis from analyze_client_pain_points
+        style: The style of proposal to generate
+        strategy: The strategy to use for proposal generation
+    """
+    data = request.data
+    job_description = data.get('job_description', '')
+    pain_points = data.get('pain_points', {})
+    style = data.get('style', 'default')
+    strategy = data.get('strategy', '')
+
+    # Validate input
+    if not job_description:
+        return Response({
+            'status': 'error',
+            'message': 'Job description is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if not pain_points:
+        return Response({
+            'status': 'error',
+            'message': 'Pain points analysis is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    chunks = stream_targeted_proposal(request.user, job_description, pain_points, style, strategy)
+    if chunks is None:
+        return Response({
+            'status': 'error',
+            'message': 'Freelancer profile not found'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    def on_complete(proposal_text):
+        return {
+            'status': 'success',
+            'proposal': proposal_text
+        }
+
+    return _streaming_response(chunks, on_complete)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def humanize_proposal_stream(request):
+    """
+    Streaming variant of humanize_proposal_api (Server-Sent Events)
+
+    The Proposal row is saved with the humanized text once the stream completes.
+
+    Request body:
+        proposal_text: The generated proposal text
+        job_description: The job description text
+        style: (optional) The style the proposal was generated with
+    """
+    data = request.data
+    proposal_text = data.get('proposal_text', '')
+    job_description = data.get('job_description', '')
+    style = data.get('style', 'default')
+
+    # Validate input
+    if not proposal_text:
+        return Response({
+            'status': 'error',
+            'message': 'Proposal text is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    def on_complete(humanized_text):
+        proposal = Proposal.objects.create(
+            user=request.user,
+            job_description=job_description,
+            proposal_text=humanized_text,
+            style=style
+        )
+        return {
+            'status': 'success',
+            'proposal': humanized_text,
+            'proposal_id': proposal.id
+        }
+
+    return _streaming_response(stream_humanized_proposal(proposal_text), on_complete)
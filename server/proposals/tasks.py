@@ -0,0 +1,121 @@
+"""Task handlers for proposal LLM work (see TASK_HANDLERS in core/task_queue.py)"""
+import json
+from core.task_queue import TaskError
+from .models import Proposal
+from .serializer import ProposalSerializer
+from .job_match import analyze_job_match
+from .pipeline import run_proposal_pipeline
+from .utils import generate_proposal, analyze_client_pain_points, generate_targeted_proposal, humanize_proposal
+
+
+def _require(payload, field, message):
+    value = payload.get(field)
+    if not value:
+        raise TaskError(message)
+    return value
+
+
+def job_match_task(user, payload):
+    """
+    Payload:
+        job_description: The job description text
+    """
+    job_description = _require(payload, 'job_description', 'Job description is required')
+    analysis = analyze_job_match(user, job_description)
+    if isinstance(analysis, dict) and 'error' in analysis:
+        raise TaskError(analysis['error'])
+    try:
+        analysis = json.loads(analysis)
+    except (TypeError, json.JSONDecodeError):
+        pass
+    return {'analysis': analysis}
+
+
+def pain_points_task(user, payload):
+    """
+    Payload:
+        job_description: The job description text
+    """
+    job_description = _require(payload, 'job_description', 'Job description is required')
+    analysis = analyze_client_pain_points(job_description)
+    if 'error' in analysis:
+        raise TaskError(analysis['error'])
+    return {'analysis': analysis}
+
+
+def generate_proposal_task(user, payload):
+    """
+    Same as create_proposal: generates and saves a proposal
+
+    Payload:
+        job_description: The job description text
+        style: (optional) The style of proposal to generate
+    """
+    job_description = _require(payload, 'job_description', 'Job description is required')
+    style = payload.get('style', 'default')
+    proposal_text = generate_proposal(user, job_description, style)
+    if proposal_text is None:
+        raise TaskError('Failed to generate proposal')
+
+    proposal = Proposal.objects.create(
+        user=user,
+        job_description=job_description,
+        proposal_text=proposal_text,
+        style=style
+    )
+    return {'proposal': ProposalSerializer(proposal).data}
+
+
+def targeted_proposal_task(user, payload):
+    """
+    Payload:
+        job_description: The job description text
+        pain_points: The pain points analysis from analyze_client_pain_points
+        style: (optional) The style of proposal to generate
+        strategy: (optional) The strategy to use for proposal generation
+    """
+    job_description = _require(payload, 'job_description', 'Job description is required')
+    pain_points = _require(payload, 'pain_points', 'Pain points analysis is required')
+    proposal_text = generate_targeted_proposal(
+        user, job_description, pain_points, payload.get('style', 'default'), payload.get('strategy', '')
+    )
+    if not proposal_text or proposal_text.startswith('Error'):
+        raise TaskError(proposal_text or 'Freelancer profile not found')
+    return {'proposal': proposal_text}
+
+
+def humanize_proposal_task(user, payload):
+    """
+    Same as humanize_proposal_api: humanizes the text and saves a proposal
+
+    Payload:
+        proposal_text: The generated proposal text
+        job_description: (optional) The job description text
+    """
+    proposal_text = _require(payload, 'proposal_text', 'Proposal text is required')
+    humanized_text = humanize_proposal(proposal_text)
+    proposal = Proposal.objects.create(
+        user=user,
+        job_description=payload.get('job_description', ''),
+        proposal_text=proposal_text,
+    )
+    return {'proposal': humanized_text, 'proposal_id': str(proposal.id)}
+
+
+def proposal_pipeline_task(user, payload):
+    """
+    Payload:
+        job_description: The job description text
+        style: (optional) The style of proposal to generate
+    """
+    job_description = _require(payload, 'job_description', 'Job description is required')
+    result = run_proposal_pipeline(user, job_description, payload.get('style', 'default'))
+    if 'error' in result:
+        raise TaskError(result['error'])
+    return {
+        'proposal': ProposalSerializer(result['proposal']).data,
+        'job_match': result['job_match'],
+        'pain_points': result['pain_points'],
+        'context_tokens': result['context_tokens'],
+        'timings': result['timings'],
+    }
@@ -1,3 +1,154 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from .fields import PLAIN, ZLIB, compress_text, decompress_text
+from .models import JobDescription, Proposal
+
+
+LONG_TEXT = 'We need an experienced Django developer to build a REST API for our store. ' * 20
+
+
+def stored_value(table, column, pk):
+    """The raw column value, as the database holds it"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {column} FROM {table} WHERE id = %s', [pk])
+        return bytes(cursor.fetchone()[0])
+
+
+class CompressedTextFieldTests(TestCase):
+    def test_short_text_is_stored_plain(self):
+        stored = compress_text('short text')
+        self.assertEqual(stored, PLAIN + b'short text')
+        self.assertEqual(decompress_text(stored), 'short text')
+
+    def test_long_text_is_stored_compressed(self):
+        stored = compress_text(LONG_TEXT)
+        self.assertEqual(stored[:1], ZLIB)
+        self.assertLess(len(stored), len(LONG_TEXT.encode('utf-8')))
+        self.assertEqual(decompress_text(stored), LONG_TEXT)
+
+    @override_settings(TEXT_STORAGE={'COMPRESS_MIN_BYTES': 10_000})
+    def test_threshold_comes_from_settings(self):
+        self.assertEqual(compress_text(LONG_TEXT)[:1], PLAIN)
+
+    def test_unknown_header_is_rejected(self):
+        with self.assertRaises(ValueError):
+            decompress_text(b'\x07abc')
+
+    def test_model_round_trip(self):
+        user = User.objects.create_user('freelancer', 'f@example.com', 'password')
+        proposal = Proposal.objects.create(user=user, job_description='Logo design', proposal_text=LONG_TEXT)
+
+        self.assertEqual(stored_value('proposals_proposal', 'proposal_text', proposal.pk.hex)[:1], ZLIB)
+        self.assertEqual(stored_value('proposals_jobdescription', 'text', proposal.job_id)[:1], PLAIN)
+        proposal = Proposal.objects.get(pk=proposal.pk)
+        self.assertEqual(proposal.proposal_text, LONG_TEXT)
+        self.assertEqual(proposal.job_description, 'Logo design')
+
+
+class ProposalJobDescriptionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('freelancer', 'f@example.com', 'password')
+
+    def test_create_shares_one_row_per_text(self):
+        first = Proposal.objects.create(user=self.user, job_description=LONG_TEXT, proposal_text='One')
+        second = Proposal.objects.create(user=self.user, job_description=LONG_TEXT, proposal_text='Two')
+
+        self.assertEqual(first.job_id, second.job_id)
+        self.assertEqual(JobDescription.objects.count(), 1)
+        self.assertEqual(Proposal.objects.get(pk=second.pk).job_description, LONG_TEXT)
+        self.assertEqual(first.job.preview, LONG_TEXT[:300])
+
+    def test_setter_moves_the_proposal_and_drops_the_unused_row(self):
+        proposal = Proposal.objects.create(user=self.user, job_description='Logo design', proposal_text='Hi')
+        old_job_id = proposal.job_id
+
+        proposal.job_description = LONG_TEXT
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal.save(update_fields=['job_description'])
+
+        self.assertEqual(Proposal.objects.get(pk=proposal.pk).job_description, LONG_TEXT)
+        self.assertFalse(JobDescription.objects.filter(pk=old_job_id).exists())
+
+    def test_row_in_use_survives_a_delete(self):
+        first = Proposal.objects.create(user=self.user, job_description='Logo design', proposal_text='One')
+        second = Proposal.objects.create(user=self.user, job_description='Logo design', proposal_text='Two')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(JobDescription.objects.filter(pk=second.job_id).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(JobDescription.objects.count(), 0)
+
+    def test_preview_and_word_count_follow_the_text(self):
+        proposal = Proposal.objects.create(user=self.user, job_description='Logo design', proposal_text='one two three')
+
+        self.assertEqual(proposal.word_count, 3)
+        self.assertEqual(proposal.proposal_text_preview, 'one two three')
+
+
+class ProposalSaveRaceTests(TransactionTestCase):
+    def test_save_resolves_a_job_description_deleted_meanwhile(self):
+        user = User.objects.create_user('freelancer', 'f@example.com', 'password')
+        stale = JobDescription.for_text('Logo design')
+        JobDescription.objects.filter(pk=stale.pk).delete()
+        lookups = [stale]
+        for_text = JobDescription.for_text
+
+        # The first lookup returns the row delete_unused removed before the insert
+        def lookup(text):
+            return lookups.pop() if lookups else for_text(text)
+
+        with mock.patch.object(JobDescription, 'for_text', side_effect=lookup):
+            proposal = Proposal.objects.create(user=user, job_description='Logo design', proposal_text='Hi')
+
+        self.assertNotEqual(proposal.job_id, stale.pk)
+        self.assertEqual(Proposal.objects.get(pk=proposal.pk).job_description, 'Logo design')
+
+
+class JobDescriptionMigrationTests(TransactionTestCase):
+    """0008-0010 move job descriptions into shared rows and compress the large texts"""
+    before = [('proposals', '0007_proposal_search')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_round_trip(self):
+        apps = self.migrate(self.before)
+        user = apps.get_model('auth', 'User').objects.create(username='freelancer')
+        OldProposal = apps.get_model('proposals', 'Proposal')
+        first = OldProposal.objects.create(user=user, job_description=LONG_TEXT, proposal_text=LONG_TEXT)
+        second = OldProposal.objects.create(user=user, job_description=LONG_TEXT, proposal_text='Short one')
+        third = OldProposal.objects.create(user=user, job_description='Logo design', proposal_text='')
+
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+        self.assertEqual(JobDescription.objects.count(), 2)
+        migrated = {proposal.pk: proposal for proposal in Proposal.objects.select_related('job')}
+        self.assertEqual(migrated[first.pk].job_id, migrated[second.pk].job_id)
+        self.assertEqual(migrated[first.pk].job_description, LONG_TEXT)
+        self.assertEqual(migrated[first.pk].proposal_text, LONG_TEXT)
+        self.assertEqual(migrated[second.pk].proposal_text, 'Short one')
+        self.assertEqual(migrated[second.pk].word_count, 2)
+        self.assertEqual(migrated[third.pk].job_description, 'Logo design')
+        self.assertEqual(stored_value('proposals_proposal', 'proposal_text', first.pk.hex)[:1], ZLIB)
+
+        apps = self.migrate(self.before)
+
+        restored = {proposal.pk: proposal for proposal in apps.get_model('proposals', 'Proposal').objects.all()}
+        self.assertEqual(restored[first.pk].job_description, LONG_TEXT)
+        self.assertEqual(restored[first.pk].proposal_text, LONG_TEXT)
+        self.assertEqual(restored[second.pk].proposal_text, 'Short one')
+        self.assertEqual(restored[third.pk].job_description, 'Logo design')
@@ -1,7 +1,13 @@
 from django.urls import path
 from . import views
-from .job_match_views import analyze_job_match_api
+from .job_match_views import analyze_job_match_api, analyze_job_match_batch_api
 from .proposal_generation_views import analyze_pain_points_api, generate_targeted_proposal_api, humanize_proposal_api
+from .pipeline_views import proposal_pipeline_api
+from .streaming_views import create_proposal_stream, generate_targeted_proposal_stream, humanize_proposal_stream
+from .async_views import (
+    create_proposal_async, analyze_job_match_async, analyze_pain_points_async,
+    generate_targeted_proposal_async, humanize_proposal_async, proposal_pipeline_async,
+)
 
 urlpatterns = [
     # Create proposal
@@ -10,6 +16,9 @@ urlpatterns = [
     # Get all proposals
     path('', views.get_proposals, name='get_proposals'),
     
+    # Full-text search
+    path('search/', views.search_proposals, name='search_proposals'),
+    
     # Get, update, delete specific proposal
     path('<uuid:proposal_id>/', views.get_proposal, name='get_proposal'),
     path('<uuid:proposal_id>/update/', views.update_proposal, name='update_proposal'),
@@ -17,9 +26,26 @@ urlpatterns = [
     
     # Job match analysis
     path('job-match/analyze/', analyze_job_match_api, name='analyze_job_match'),
+    path('job-match/analyze/batch/', analyze_job_match_batch_api, name='analyze_job_match_batch'),
     
     # Multi-step proposal generation
     path('generate/pain-points/', analyze_pain_points_api, name='analyze_pain_points'),
     path('generate/targeted-proposal/', generate_targeted_proposal_api, name='generate_targeted_proposal'),
     path('generate/humanize/', humanize_proposal_api, name='humanize_proposal'),
+    
+    # One-shot pipeline (job match + pain points -> generate -> humanize)
+    path('generate/pipeline/', proposal_pipeline_api, name='proposal_pipeline'),
+    
+    # Streaming (Server-Sent Events) variants
+    path('create/stream/', create_proposal_stream, name='create_proposal_stream'),
+    path('generate/targeted-proposal/stream/', generate_targeted_proposal_stream, name='generate_targeted_proposal_stream'),
+    path('generate/humanize/stream/', humanize_proposal_stream, name='humanize_proposal_stream'),
+    
+    # Async (ASGI-native) variants
+    path('async/create/', create_proposal_async, name='create_proposal_async'),
+    path('async/job-match/analyze/', analyze_job_match_async, name='analyze_job_match_async'),
+    path('async/generate/pain-points/', analyze_pain_points_async, name='analyze_pain_points_async'),
+    path('async/generate/targeted/', generate_targeted_proposal_async, name='generate_targeted_proposal_async'),
+    path('async/generate/humanize/', humanize_proposal_async, name='humanize_proposal_async'),
+    path('async/generate/pipeline/', proposal_pipeline_async, name='proposal_pipeline_async'),
 ]
@@ -1,94 +1,193 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-load_dotenv()
-import os
 import json
+from asgiref.sync import sync_to_async
 from core.models import FreelancerProfile, Projects, Experience
+from core.model_routing import arouted_completion, routed_completion, routed_stream
+from core.circuit_breaker import LLMUnavailableError
+from core.rate_limit import LLMRateLimitError
+from core.llm_cache import acached_completion, cached_completion
 from .prompts import ProposalPromptFactory
+from .context import get_context_snapshot
+from .context_selection import select_freelancer_context
+from .job_fingerprint import get_canonical_job, get_shared_pain_points, save_shared_pain_points
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
+HUMANIZE_SYSTEM_PROMPT = "You are an expert proposal writer who specializes in making professional proposals sound naturally human-written. Your goal is to maintain the exact structure, format, and organization of the proposal while adding warmth and personality. Never change section headings, bullet points, or the overall format of the document."
 
+PROPOSAL_SYSTEM_PROMPT = "You are writing as the freelancer themselves. Use a natural, conversational tone that avoids AI-generated patterns. Write in first person and make the proposal sound personally written with the freelancer's unique voice. Keep it concise and focused on the most relevant qualifications for this specific job."
 
-def get_freelancer_data(user):
+
+
+def get_freelancer_data(user, job_description=None):
     """
     Retrieve and format freelancer profile data, projects, and experience
     
+    Served from the versioned snapshot in proposals/context.py; it is only
+    rebuilt after the profile, projects or experience change. When a job
+    description is given, only the most relevant projects and experience that
+    fit the token budget are included (see proposals/context_selection.py).
+    
     Args:
         user: The user object to retrieve data for
+        job_description: (optional) The job the context is being built for
         
     Returns:
         str: Formatted string with freelancer data or None if profile doesn't exist
     """
     try:
-        # Get freelancer profile
-        try:
-            freelance_obj = FreelancerProfile.objects.get(user=user)
-        except FreelancerProfile.DoesNotExist:
-            return None
-            
-        # Get projects and experience
-        projects = Projects.objects.filter(user=user)
-        experiences = Experience.objects.filter(user=user)
+        snapshot = get_context_snapshot(user, build_freelancer_data)
+        if snapshot.data is None or not job_description:
+            return snapshot.context
+        return select_freelancer_context(snapshot, job_description, format_freelancer_data)['context']
+    except Exception as e:
+        print(f"Error in get_freelancer_data: {str(e)}")
+        return None
+
+
+def get_freelancer_context(user, job_description):
+    """
+    Like get_freelancer_data, but also reports how many tokens the selection saved
+    
+    Returns:
+        dict: context, tokens_full, tokens_used, tokens_saved, selected, total;
+              or None if profile doesn't exist
+    """
+    snapshot = get_context_snapshot(user, build_freelancer_data)
+    if snapshot.data is None:
+        return None
+    return select_freelancer_context(snapshot, job_description, format_freelancer_data)
+
+
+def collect_freelancer_data(user):
+    """
+    Load the freelancer profile, projects and experience (three queries)
+    
+    Args:
+        user: The user object to retrieve data for
+        
+    Returns:
+        dict: JSON-serializable profile, projects and experiences, or None if profile doesn't exist
+    """
+    # Get freelancer profile
+    try:
+        freelance_obj = FreelancerProfile.objects.get(user=user)
+    except FreelancerProfile.DoesNotExist:
+        return None
+    
+    # Get projects and experience
+    projects = Projects.objects.filter(user=user)
+    experiences = Experience.objects.filter(user=user)
+    
+    return {
+        'profile': {
+            'full_name': freelance_obj.full_name,
+            'tagline': freelance_obj.tagline,
+            'portfolio': freelance_obj.portfolio,
+            'about': freelance_obj.about,
+            'skills': freelance_obj.skills,
+        },
+        'projects': [
+            {
+                'title': project.title,
+                'description': project.description,
+                'summary': project.summary,
+                'budget': project.budget,
+                'platform': project.platform,
+                'status': project.status,
+                'start_date': str(project.start_date),
+                'end_date': str(project.end_date),
+            }
+            for project in projects
+        ],
+        'experiences': [
+            {
+                'company': exp.company,
+                'title': exp.title,
+                'location': exp.location,
+                'start_date': str(exp.start_date),
+                'end_date': str(exp.end_date),
+                'description': exp.description,
+            }
+            for exp in experiences
+        ],
+    }
+
+
+def format_freelancer_data(data, projects=None, experiences=None):
+    """
+    Format collected freelancer data for a prompt
+    
+    Args:
+        data: Output of collect_freelancer_data
+        projects: (optional) Subset of data['projects'] to include, defaults to all
+        experiences: (optional) Subset of data['experiences'] to include, defaults to all
         
-        # Format basic profile information
-        to_string = f"""
+    Returns:
+        str: Formatted string with freelancer data
+    """
+    profile = data['profile']
+    if projects is None:
+        projects = data['projects']
+    if experiences is None:
+        experiences = data['experiences']
+    
+    # Format basic profile information
+    to_string = f"""
         # FREELANCER PROFILE
-        Name: {freelance_obj.full_name}
-        TagLine: {freelance_obj.tagline}
-        Portfolio: {freelance_obj.portfolio}
-        About: {freelance_obj.about}
-        Skills: {freelance_obj.skills}
+        Name: {profile['full_name']}
+        TagLine: {profile['tagline']}
+        Portfolio: {profile['portfolio']}
+        About: {profile['about']}
+        Skills: {profile['skills']}
         """
 
-        # Add projects information if available
-        if projects:
-            to_string += "\n# PROJECTS\n"
-            for i, project in enumerate(projects, 1):
-                to_string += f"""
+    # Add projects information if available
+    if projects:
+        to_string += "\n# PROJECTS\n"
+        for i, project in enumerate(projects, 1):
+            to_string += f"""
                 Project {i}:
-                - Title: {project.title}
-                - Description: {project.description}
-                - Budget: {project.budget}
-                - Platform: {project.platform}
-                - Status: {project.status}
-                - Timeline: {project.start_date} to {project.end_date}
+                - Title: {project['title']}
+                - Description: {project['description']}
+                - Budget: {project['budget']}
+                - Platform: {project['platform']}
+                - Status: {project['status']}
+                - Timeline: {project['start_date']} to {project['end_date']}
                 """
 
-        # Add experience information if available
-        if experiences:
-            to_string += "\n# WORK EXPERIENCE\n"
-            for i, exp in enumerate(experiences, 1):
-                to_string += f"""
+    # Add experience information if available
+    if experiences:
+        to_string += "\n# WORK EXPERIENCE\n"
+        for i, exp in enumerate(experiences, 1):
+            to_string += f"""
                 Experience {i}:
-                - Company: {exp.company}
-                - Title: {exp.title}
-                - Location: {exp.location}
-                - Period: {exp.start_date} to {exp.end_date}
-                - Description: {exp.description}
+                - Company: {exp['company']}
+                - Title: {exp['title']}
+                - Location: {exp['location']}
+                - Period: {exp['start_date']} to {exp['end_date']}
+                - Description: {exp['description']}
                 """
-        
-        return to_string
-
-    except Exception as e:
-        print(f"Error in get_freelancer_data: {str(e)}")
-        return None
-
+    
+    return to_string
 
 
-def analyze_client_pain_points(job_description):
+def build_freelancer_data(user):
     """
-    Analyze the job description to identify client pain points and needs
+    Snapshot builder for get_context_snapshot
+    
+    Errors propagate so a failed build is never stored as the snapshot.
     
-    Args:
-        job_description: The job description text
-        
     Returns:
-        dict: Identified pain points, needs, and goals of the client
+        tuple: (formatted context, collected data), or None if profile doesn't exist
     """
-    try:
-        # Format the prompt for pain point analysis
-        prompt = f"""
+    data = collect_freelancer_data(user)
+    if data is None:
+        return None
+    return format_freelancer_data(data), data
+
+
+def build_pain_points_messages(job_description):
+    """Build the chat messages for the pain point analysis of a job description"""
+    prompt = f"""
         # CLIENT PAIN POINT ANALYSIS
         
         ## Job Description
@@ -106,28 +205,128 @@ def analyze_client_pain_points(job_description):
         Format your response as a JSON object with a single field 'pain_points' containing an array of 3 pain points.
         Example: {{'pain_points': ['Pain point 1', 'Pain point 2', 'Pain point 3']}}
         """
+    return [
+        {"role": "system", "content": "You are an expert business analyst who specializes in identifying the most critical pain points from job descriptions. Focus on extracting the 3 most important problems or needs that a proposal should address."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _find_shared_pain_points(job_description):
+    """(canonical job, pain points someone already got for it or None); lookup errors are not fatal"""
+    try:
+        canonical = get_canonical_job(job_description)
+        return canonical, get_shared_pain_points(canonical)
+    except Exception as e:
+        print(f"Error looking up canonical job: {str(e)}")
+        return None, None
+
+
+def analyze_client_pain_points(job_description):
+    """
+    Analyze the job description to identify client pain points and needs
+    
+    The result depends only on the job, so it is shared across users through
+    the canonical job record: near-duplicate postings pasted by anyone reuse
+    the first analysis (see proposals/job_fingerprint.py).
+    
+    Args:
+        job_description: The job description text
         
-        # Call OpenAI API for pain point analysis
-        response = client.chat.completions.create(
-            model="gpt-4o",
+    Returns:
+        dict: Identified pain points, needs, and goals of the client
+    """
+    try:
+        # Reuse the analysis of this posting (or a near-duplicate) if anyone already ran it
+        canonical, shared = _find_shared_pain_points(job_description)
+        if shared is not None:
+            return shared
+        
+        # Call OpenAI API for pain point analysis (cached: depends only on the job description)
+        content = cached_completion(
+            task="pain_points",
             temperature=0.5,
             response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": "You are an expert business analyst who specializes in identifying the most critical pain points from job descriptions. Focus on extracting the 3 most important problems or needs that a proposal should address."},
-                {"role": "user", "content": prompt}
-            ]
+            messages=build_pain_points_messages(job_description)
         )
         
         # Parse and return the analysis
-        analysis = json.loads(response.choices[0].message.content)
+        analysis = json.loads(content)
+        save_shared_pain_points(canonical, analysis)
         return analysis
     
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
     except Exception as e:
         print(f"Error in analyze_client_pain_points: {str(e)}")
         return {"error": f"Error analyzing client pain points: {str(e)}"}
 
 
-def generate_targeted_proposal(user, job_description, pain_points, style="default", strategy=''):
+async def aanalyze_client_pain_points(job_description):
+    """Async variant of analyze_client_pain_points (same arguments and return value)"""
+    try:
+        canonical, shared = await sync_to_async(_find_shared_pain_points)(job_description)
+        if shared is not None:
+            return shared
+
+        content = await acached_completion(
+            task="pain_points",
+            temperature=0.5,
+            response_format={"type": "json_object"},
+            messages=build_pain_points_messages(job_description)
+        )
+
+        analysis = json.loads(content)
+        await sync_to_async(save_shared_pain_points)(canonical, analysis)
+        return analysis
+
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
+    except Exception as e:
+        print(f"Error in aanalyze_client_pain_points: {str(e)}")
+        return {"error": f"Error analyzing client pain points: {str(e)}"}
+
+
+def build_targeted_proposal_messages(user, job_description, pain_points, style="default", strategy='', freelancer_data=None):
+    """
+    Build the chat messages for a proposal that addresses the client's pain points
+    
+    Args:
+        user: The user object for whom to generate the proposal
+        job_description: The job description text
+        pain_points: The pain points analysis from analyze_client_pain_points
+        style: The style of proposal to generate
+        strategy: (optional) The winning strategy from analyze_job_match
+        freelancer_data: (optional) Pre-built output of get_freelancer_data, to avoid rebuilding it
+        
+    Returns:
+        list: Chat messages, or None if the freelancer profile doesn't exist
+    """
+    # Get freelancer data
+    if freelancer_data is None:
+        freelancer_data = get_freelancer_data(user, job_description)
+    if not freelancer_data:
+        return None
+    
+    # Get the appropriate prompt based on style
+    prompt_obj = ProposalPromptFactory.get_prompt(style)
+    
+    # Add pain points to the prompt
+    pain_points_section = "\n\n## Client Pain Points Analysis\n"
+    if isinstance(pain_points, list):
+        for i, point in enumerate(pain_points, 1):
+            pain_points_section += f"\n{i}. {point}"
+    else:
+        pain_points_section += str(pain_points)
+    
+    # Add the positioning strategy from the job match analysis, if any
+    if strategy:
+        pain_points_section += f"\n\n## Winning Strategy\n{strategy}"
+    
+    # Static instructions first, then the freelancer block, then everything job-specific
+    return prompt_obj.get_messages(freelancer_data, job_description, pain_points_section)
+
+
+def generate_targeted_proposal(user, job_description, pain_points, style="default", strategy='', freelancer_data=None):
     """
     Generate a proposal that specifically addresses the client's pain points
     
@@ -137,65 +336,83 @@ def generate_targeted_proposal(user, job_description, pain_points, style="defaul
         pain_points: The pain points analysis from analyze_client_pain_points
         style: The style of proposal to generate
         strategy: The strategy to use for proposal generation
+        freelancer_data: (optional) Pre-built output of get_freelancer_data, to avoid rebuilding it
         
     Returns:
         str: The generated proposal text or None if an error occurred
     """
     try:
-        # Get freelancer data
-        freelancer_data = get_freelancer_data(user)
-        if not freelancer_data:
+        messages = build_targeted_proposal_messages(user, job_description, pain_points, style, strategy, freelancer_data)
+        if not messages:
             return None
         
-        # Import the ProposalPromptFactory
-        from proposals.prompts import ProposalPromptFactory
-        
-        # Get the appropriate prompt based on style
-        prompt_obj = ProposalPromptFactory.get_prompt(style)
-        
-        # Get the base prompt from the prompt object
-        base_prompt = prompt_obj.get_prompt(freelancer_data, job_description)
-        
-        # Add pain points to the prompt
-        pain_points_section = "\n\n## Client Pain Points Analysis\n"
-        if isinstance(pain_points, list):
-            for i, point in enumerate(pain_points, 1):
-                pain_points_section += f"\n{i}. {point}"
-        else:
-            pain_points_section += str(pain_points)
-        
-        # Combine the base prompt with pain points
-        prompt = base_prompt + pain_points_section
-        
         # Call OpenAI API for targeted proposal generation
-        response = client.chat.completions.create(
-            model="gpt-4o",
+        response = routed_completion(
+            "generate",
             temperature=0.7,
-            messages=[
-                {"role": "system", "content": prompt},
-            ]
+            call_site="targeted_proposal",
+            messages=messages
         )
         
         return response.choices[0].message.content
     
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
     except Exception as e:
         print(f"Error in generate_targeted_proposal: {str(e)}")
         return f"Error generating targeted proposal: {str(e)}"
 
 
-def humanize_proposal(proposal_text):
+async def agenerate_targeted_proposal(user, job_description, pain_points, style="default", strategy='', freelancer_data=None):
+    """Async variant of generate_targeted_proposal (same arguments and return value)"""
+    try:
+        messages = await sync_to_async(build_targeted_proposal_messages)(
+            user, job_description, pain_points, style, strategy, freelancer_data
+        )
+        if not messages:
+            return None
+
+        response = await arouted_completion(
+            "generate",
+            temperature=0.7,
+            call_site="targeted_proposal",
+            messages=messages
+        )
+
+        return response.choices[0].message.content
+
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
+    except Exception as e:
+        print(f"Error in agenerate_targeted_proposal: {str(e)}")
+        return f"Error generating targeted proposal: {str(e)}"
+
+
+def stream_targeted_proposal(user, job_description, pain_points, style="default", strategy=''):
     """
-    Make the proposal sound more human and natural
+    Streaming variant of generate_targeted_proposal
+    
+    Returns:
+        generator: Yields text deltas as they arrive, or None if the freelancer profile doesn't exist
+    """
+    messages = build_targeted_proposal_messages(user, job_description, pain_points, style, strategy)
+    if not messages:
+        return None
+    return routed_stream("generate", temperature=0.7, call_site="targeted_proposal", messages=messages)
+
+
+def build_humanize_messages(proposal_text):
+    """
+    Build the chat messages for humanizing a proposal
     
     Args:
         proposal_text: The generated proposal text
         
     Returns:
-        str: The humanized proposal text
+        list: Chat messages
     """
-    try:
-        # Format the prompt for humanizing the proposal
-        prompt = f"""
+    # Format the prompt for humanizing the proposal
+    prompt = f"""
         # HUMANIZE PROPOSAL
         
         ##Original Proposal
@@ -223,24 +440,91 @@ def humanize_proposal(proposal_text):
         
         The goal is to make this sound like it was written by a real person while preserving the exact structure of the original proposal.
         """
+    
+    return [
+        {"role": "system", "content": HUMANIZE_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def humanize_proposal(proposal_text):
+    """
+    Make the proposal sound more human and natural
+    
+    Args:
+        proposal_text: The generated proposal text
         
+    Returns:
+        str: The humanized proposal text
+    """
+    try:
         # Call OpenAI API for humanizing the proposal
-        response = client.chat.completions.create(
-            model="gpt-4o",
+        response = routed_completion(
+            "humanize",
             temperature=0.8,  # Higher temperature for more creative, human-like text
-            messages=[
-                {"role": "system", "content": "You are an expert proposal writer who specializes in making professional proposals sound naturally human-written. Your goal is to maintain the exact structure, format, and organization of the proposal while adding warmth and personality. Never change section headings, bullet points, or the overall format of the document."},
-                {"role": "user", "content": prompt}
-            ]
+            messages=build_humanize_messages(proposal_text)
         )
         
         return response.choices[0].message.content
     
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
     except Exception as e:
         print(f"Error in humanize_proposal: {str(e)}")
         return proposal_text  # Return original if humanizing fails
 
 
+async def ahumanize_proposal(proposal_text):
+    """Async variant of humanize_proposal (same arguments and return value)"""
+    try:
+        response = await arouted_completion(
+            "humanize",
+            temperature=0.8,
+            messages=build_humanize_messages(proposal_text)
+        )
+
+        return response.choices[0].message.content
+
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
+    except Exception as e:
+        print(f"Error in ahumanize_proposal: {str(e)}")
+        return proposal_text
+
+
+def stream_humanized_proposal(proposal_text):
+    """
+    Streaming variant of humanize_proposal
+    
+    Returns:
+        generator: Yields text deltas as they arrive
+    """
+    return routed_stream(
+        "humanize",
+        temperature=0.8,
+        messages=build_humanize_messages(proposal_text)
+    )
+
+
+def build_proposal_messages(user, job_description, style="default"):
+    """
+    Build the chat messages for the legacy single-step proposal generation
+    
+    Returns:
+        list: Chat messages, or None if the freelancer profile doesn't exist
+    """
+    # Get freelancer data
+    freelancer_data = get_freelancer_data(user, job_description)
+    if not freelancer_data:
+        return None
+        
+    # Get the appropriate prompt based on style
+    prompt_instance = ProposalPromptFactory.get_prompt(style)
+    
+    # The writing voice stays a system message; being static, it keeps the prefix cacheable
+    return prompt_instance.get_messages(freelancer_data, job_description, system_prompt=PROPOSAL_SYSTEM_PROMPT)
+
+
 def generate_proposal(user, job_description, style="default"):
     """
     Generate a proposal based on user data, job description and selected style
@@ -255,26 +539,56 @@ def generate_proposal(user, job_description, style="default"):
         str: The generated proposal text or None if an error occurred
     """
     try:
-        # Get freelancer data
-        freelancer_data = get_freelancer_data(user)
-        if not freelancer_data:
+        messages = build_proposal_messages(user, job_description, style)
+        if not messages:
             return None
-            
-        # Get the appropriate prompt based on style
-        prompt_instance = ProposalPromptFactory.get_prompt(style)
-        formatted_prompt = prompt_instance.get_prompt(freelancer_data, job_description)
         
         # Call OpenAI API with the formatted prompt and enhanced system message
-        response = client.chat.completions.create(
-            model="gpt-4o",
+        response = routed_completion(
+            "generate",
             temperature=0.7,  # Slightly higher temperature for more natural language
-            messages=[
-                {"role": "system", "content": "You are writing as the freelancer themselves. Use a natural, conversational tone that avoids AI-generated patterns. Write in first person and make the proposal sound personally written with the freelancer's unique voice. Keep it concise and focused on the most relevant qualifications for this specific job."},
-                {"role": "user", "content": formatted_prompt}
-            ]
+            call_site="generate_proposal",
+            messages=messages
         )
         
         return response.choices[0].message.content
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
     except Exception as e:
         print(f"Error in generate_proposal: {str(e)}")
-        return f"Error generating proposal: {str(e)}"
\ No newline at end of file
+        return f"Error generating proposal: {str(e)}"
+
+
+async def agenerate_proposal(user, job_description, style="default"):
+    """Async variant of generate_proposal (same arguments and return value)"""
+    try:
+        messages = await sync_to_async(build_proposal_messages)(user, job_description, style)
+        if not messages:
+            return None
+
+        response = await arouted_completion(
+            "generate",
+            temperature=0.7,
+            call_site="generate_proposal",
+            messages=messages
+        )
+
+        return response.choices[0].message.content
+    except (LLMRateLimitError, LLMUnavailableError):
+        raise
+    except Exception as e:
+        print(f"Error in agenerate_proposal: {str(e)}")
+        return f"Error generating proposal: {str(e)}"
+
+
+def stream_proposal(user, job_description, style="default"):
+    """
+    Streaming variant of generate_proposal
+    
+    Returns:
+        generator: Yields text deltas as they arrive, or None if the freelancer profile doesn't exist
+    """
+    messages = build_proposal_messages(user, job_description, style)
+    if not messages:
+        return None
+    return routed_stream("generate", temperature=0.7, call_site="generate_proposal", messages=messages)
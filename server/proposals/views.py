@@ -2,9 +2,13 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from core.circuit_breaker import LLMUnavailableError, unavailable_response
+from core.rate_limit import LLMRateLimitError, throttled_response
 from django.shortcuts import get_object_or_404
 from .models import Proposal
-from .serializer import ProposalSerializer, ProposalUpdateSerializer
+from .listing import ListingError, list_proposals
+from .search import search_proposals as run_search
+from .serializer import ProposalListSerializer, ProposalSearchResultSerializer, ProposalSerializer, ProposalUpdateSerializer
 from .utils import generate_proposal
 from .job_match import analyze_job_match
 import json
@@ -58,6 +62,11 @@ def create_proposal(request):
             'proposal': serializer.data
         }, status=status.HTTP_201_CREATED)
         
+    except LLMRateLimitError as e:
+        return throttled_response(e)
+        
+    except LLMUnavailableError as e:
+        return unavailable_response(e)
     except Exception as e:
         return Response({
             'status': 'error',
@@ -69,18 +78,36 @@ def create_proposal(request):
 @permission_classes([IsAuthenticated])
 def get_proposals(request):
     """
-    Get all proposals for the authenticated user
+    Get the authenticated user's proposals, newest first, one page at a time
+
+    Query parameters:
+        cursor: (optional) next_cursor of the previous page
+        limit: (optional) Page size (default 20, at most 100)
+        status: (optional) Status, or a comma-separated list of statuses
+        style: (optional) Style, or a comma-separated list of styles
+        created_after: (optional) Only proposals created on/after this date (YYYY-MM-DD or ISO datetime)
+        created_before: (optional) Only proposals created on/before this date
+
+    List items carry previews of the job description and proposal text;
+    get_proposal returns the full proposal.
     """
     try:
-        # Get all proposals for the current user
-        proposals = Proposal.objects.filter(user=request.user).order_by('-created_at')
-        
+        try:
+            page = list_proposals(request.user, request.query_params)
+        except ListingError as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         # Serialize and return response
-        serializer = ProposalSerializer(proposals, many=True)
+        serializer = ProposalListSerializer(page['proposals'], many=True)
         return Response({
             'status': 'success',
             'count': len(serializer.data),
-            'proposals': serializer.data
+            'proposals': serializer.data,
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more']
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
@@ -90,6 +117,53 @@ def get_proposals(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_proposals(request):
+    """
+    Full-text search over the authenticated user's proposals, best match first
+
+    Query parameters:
+        q: Search text; every word must appear in the job description, proposal text or feedback
+        page: (optional) Page number, from 1
+        limit: (optional) Results per page (default 20, at most 50)
+
+    Each result is a list item plus its rank and a snippet with the matched
+    words wrapped in <mark> (the rest of the snippet is HTML-escaped).
+    """
+    try:
+        try:
+            page_number = int(request.query_params.get('page', 1))
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            return Response({
+                'status': 'error',
+                'message': 'page and limit must be numbers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        found = run_search(request.user, request.query_params.get('q', ''), page_number, limit)
+        results = []
+        for proposal, rank, snippet in found['results']:
+            proposal.rank = rank
+            proposal.snippet = snippet
+            results.append(proposal)
+
+        serializer = ProposalSearchResultSerializer(results, many=True)
+        return Response({
+            'status': 'success',
+            'count': len(serializer.data),
+            'page': max(page_number, 1),
+            'proposals': serializer.data,
+            'has_more': found['has_more']
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_proposal(request, proposal_id):
@@ -101,7 +175,7 @@ def get_proposal(request, proposal_id):
     """
     try:
         # Get the proposal, ensuring it belongs to the current user
-        proposal = get_object_or_404(Proposal, id=proposal_id, user=request.user)
+        proposal = get_object_or_404(Proposal.objects.select_related('job'), id=proposal_id, user=request.user)
         
         # Serialize and return response
         serializer = ProposalSerializer(proposal)
@@ -130,7 +204,7 @@ def update_proposal(request, proposal_id):
     """
     try:
         # Get the proposal, ensuring it belongs to the current user
-        proposal = get_object_or_404(Proposal, id=proposal_id, user=request.user)
+        proposal = get_object_or_404(Proposal.objects.select_related('job'), id=proposal_id, user=request.user)
         
         # Get data from request
         data = request.data
@@ -191,7 +265,7 @@ def delete_proposal(request, proposal_id):
     """
     try:
         # Get the proposal, ensuring it belongs to the current user
-        proposal = get_object_or_404(Proposal, id=proposal_id, user=request.user)
+        proposal = get_object_or_404(Proposal.objects.select_related('job'), id=proposal_id, user=request.user)
         
         # Delete the proposal
         proposal.delete()
@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -155,6 +159,142 @@ SIMPLE_JWT = {
 }
 
 
+# Shared OpenAI gateway (core/openai_service.py)
+LLM_CLIENT = {
+    'BASE_URL': os.getenv('OPENAI_BASE_URL'),
+    'TIMEOUT': float(os.getenv('LLM_TIMEOUT', 60)),
+    'CONNECT_TIMEOUT': 5.0,
+    'MAX_RETRIES': int(os.getenv('LLM_MAX_RETRIES', 2)),
+    'RETRY_BASE_DELAY': 0.5,
+    'RETRY_MAX_DELAY': 8.0,
+    'MAX_CONNECTIONS': int(os.getenv('LLM_MAX_CONNECTIONS', 20)),
+    'MAX_KEEPALIVE_CONNECTIONS': int(os.getenv('LLM_MAX_KEEPALIVE_CONNECTIONS', 10)),
+    'KEEPALIVE_EXPIRY': 30.0,
+    # Dotted path to an httpx transport (or factory), e.g. for a local stand-in server
+    'TRANSPORT': os.getenv('LLM_TRANSPORT'),
+}
+
+# Model per task (core/model_routing.py). Only overrides go here: each task's
+# dict is merged over DEFAULT_POLICIES, e.g. 'generate': {'MODEL': 'gpt-4.1'}.
+# HEDGE sends a second request for short analyses slower than their p95.
+LLM_ROUTING = {
+    'job_match': {'HEDGE': os.getenv('LLM_HEDGE_ANALYSES', 'false').lower() == 'true'},
+    'pain_points': {'HEDGE': os.getenv('LLM_HEDGE_ANALYSES', 'false').lower() == 'true'},
+}
+
+# Fail fast while OpenAI keeps failing (core/circuit_breaker.py)
+LLM_CIRCUIT_BREAKER = {
+    'ENABLED': True,
+    'FAILURE_THRESHOLD': int(os.getenv('LLM_CIRCUIT_FAILURE_THRESHOLD', 5)),
+    'RESET_TIMEOUT': int(os.getenv('LLM_CIRCUIT_RESET_TIMEOUT', 30)),
+    # Successful calls using more than this share of their timeout count as failures
+    'SLOW_CALL_FRACTION': float(os.getenv('LLM_CIRCUIT_SLOW_CALL_FRACTION', 0.9)),
+}
+
+# Shared RPM/TPM budget per model across all processes (core/rate_limit.py)
+LLM_RATE_LIMIT = {
+    'ENABLED': os.getenv('LLM_RATE_LIMIT_ENABLED', 'true').lower() == 'true',
+    'LIMITS': {
+        'gpt-4o': {
+            'RPM': int(os.getenv('LLM_RATE_LIMIT_GPT4O_RPM', 500)),
+            'TPM': int(os.getenv('LLM_RATE_LIMIT_GPT4O_TPM', 30000)),
+        },
+        'gpt-4o-mini': {
+            'RPM': int(os.getenv('LLM_RATE_LIMIT_GPT4O_MINI_RPM', 500)),
+            'TPM': int(os.getenv('LLM_RATE_LIMIT_GPT4O_MINI_TPM', 200000)),
+        },
+    },
+    'MAX_WAIT': float(os.getenv('LLM_RATE_LIMIT_MAX_WAIT', 5)),
+}
+
+# Response cache for deterministic analyses (core/llm_cache.py)
+LLM_CACHE = {
+    'ENABLED': os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true',
+    'TTL': int(os.getenv('LLM_CACHE_TTL', 60 * 60 * 24 * 7)),
+    'MEMORY_MAX_ENTRIES': 512,
+    'DB_MAX_ENTRIES': 20000,
+    'PRUNE_EVERY': 100,
+}
+
+# Coalescing of identical in-flight cached LLM requests (core/single_flight.py)
+LLM_SINGLE_FLIGHT = {
+    'ENABLED': True,
+    'CROSS_PROCESS': True,
+    'LOCK_TTL': 120,
+    'WAIT_TIMEOUT': 90,
+    'POLL_INTERVAL': 0.25,
+}
+
+# Freelancer prompt context snapshot (proposals/context.py)
+FREELANCER_CONTEXT = {
+    'CACHE_TTL': 300,
+    # Relevance-ranked selection of projects/experience (proposals/context_selection.py)
+    'SELECTION_ENABLED': os.getenv('FREELANCER_CONTEXT_SELECTION', 'true').lower() == 'true',
+    'TOKEN_BUDGET': int(os.getenv('FREELANCER_CONTEXT_TOKEN_BUDGET', 1500)),
+}
+
+# Resume / profile import (core/profile_import.py)
+PROFILE_IMPORT = {
+    'SUMMARY_CONCURRENCY': int(os.getenv('PROFILE_IMPORT_SUMMARY_CONCURRENCY', 4)),
+}
+
+# Background LLM task queue (core/task_queue.py, `manage.py run_llm_worker`)
+LLM_TASKS = {
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 2,
+    'VISIBILITY_TIMEOUT': 600,
+    'RETRY_BASE_DELAY': 5,
+    'RETRY_MAX_DELAY': 300,
+}
+
+# Batch job match endpoint (proposals/job_match_batch.py)
+JOB_MATCH_BATCH = {
+    'MAX_JOBS': 25,
+    'CONCURRENCY': int(os.getenv('JOB_MATCH_BATCH_CONCURRENCY', 4)),
+}
+
+# Local job match pre-filter (proposals/match_prefilter.py)
+MATCH_PREFILTER = {
+    'ENABLED': os.getenv('MATCH_PREFILTER_ENABLED', 'true').lower() == 'true',
+    'ESCALATE_THRESHOLD': int(os.getenv('MATCH_PREFILTER_THRESHOLD', 20)),
+}
+
+# Cross-user near-duplicate job detection (proposals/job_fingerprint.py)
+JOB_FINGERPRINT = {
+    'ENABLED': os.getenv('JOB_FINGERPRINT_ENABLED', 'true').lower() == 'true',
+    'MIN_SIMILARITY': 0.75,
+}
+
+# Dashboard stats from incrementally maintained per-user rows (core/dashboard_stats.py)
+DASHBOARD_STATS = {
+    'INCREMENTAL': os.getenv('DASHBOARD_STATS_INCREMENTAL', 'true').lower() == 'true',
+}
+
+# Per-user versioned dashboard response cache with ETags (core/response_cache.py)
+RESPONSE_CACHE = {
+    'ENABLED': os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true',
+    'TTL': int(os.getenv('RESPONSE_CACHE_TTL', 300)),
+}
+
+# Compression of large text columns at rest (proposals/fields.py)
+TEXT_STORAGE = {
+    'COMPRESS_MIN_BYTES': int(os.getenv('TEXT_COMPRESS_MIN_BYTES', 256)),
+    'LEVEL': 6,
+}
+
+# Cursor-paginated proposal list (proposals/listing.py)
+PROPOSAL_LIST = {
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 100,
+    'PREVIEW_CHARS': 200,
+}
+
+# Prometheus metrics for LLM calls (core/metrics.py, served at /metrics)
+METRICS = {
+    'TOKEN': os.getenv('METRICS_TOKEN'),
+}
+
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_HEADERS = [
@@ -162,7 +302,10 @@ CORS_ALLOW_HEADERS = [
     "authorization",
     "x-csrftoken",
     "x-requested-with",
+    "if-none-match",
 ]
+# Lets the client revalidate cached dashboard responses (core/response_cache.py)
+CORS_EXPOSE_HEADERS = ["etag"]
 CORS_ALLOW_METHODS = [
     "DELETE",
     "GET",
@@ -20,6 +20,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from core.metrics_views import prometheus_metrics
 
 urlpatterns = [
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -28,5 +29,6 @@ urlpatterns = [
     path('api/auth/', include('users.urls')),
     path('api/proposals/', include('proposals.urls')),
     path('api/', include('core.urls')),
+    path('metrics', prometheus_metrics, name='prometheus_metrics'),
 ]
 